@@ -4,58 +4,27 @@
 Script simplificado de análise para os resultados da Atividade 2
 """
 
-import json
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from pathlib import Path
 import sys
 
+from catalog import load_catalog
+
 # Configurações de estilo
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
 def load_results(timestamp="20250801_022946"):
     """Carrega os resultados dos testes"""
-    results_dir = Path("/results/atv2/results/raw")
-    
     print(f"Carregando resultados com timestamp: {timestamp}")
     
-    data = []
-    for result_file in results_dir.glob(f"{timestamp}_*.json"):
-        if 'system_config' in str(result_file):
-            continue
-            
-        try:
-            with open(result_file, 'r') as f:
-                result = json.load(f)
-            
-            # Extrair informações do nome
-            parts = result_file.stem.split('_')
-            if len(parts) >= 3:
-                scenario = '_'.join(parts[2:-1])
-                rep = int(parts[-1].replace('rep', ''))
-                
-                # Extrair métricas
-                if 'end' in result and 'sum_sent' in result['end']:
-                    throughput_bps = result['end']['sum_sent']['bits_per_second']
-                    throughput_mbps = throughput_bps / 1e6
-                    
-                    retransmits = result['end']['sum_sent'].get('retransmits', 0)
-                    
-                    data.append({
-                        'scenario': scenario,
-                        'repetition': rep,
-                        'throughput_mbps': throughput_mbps,
-                        'retransmits': retransmits
-                    })
-                    
-        except Exception as e:
-            print(f"Erro ao processar {result_file}: {e}")
-    
-    df = pd.DataFrame(data)
-    return df
+    catalog = load_catalog(Path("/results/atv2/results/raw"), timestamp)
+    for failed in catalog.errors():
+        print(f"Erro ao processar {failed['path']}: {failed['error']}")
+    
+    return catalog.dataframe(columns=['scenario', 'repetition', 'throughput_mbps', 'retransmits'])
 
 def analyze_results(df):
     """Analisa e imprime resultados"""
@@ -5,23 +5,44 @@ Script de análise específico para a Atividade 2
 Gera análises comparativas dos 6 cenários com justificativas teóricas
 """
 
+import argparse
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-from pathlib import Path
+import os
 import sys
+import time
+from contextlib import redirect_stdout
 from datetime import datetime
-from scipy import stats
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configurações de estilo
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 12
+# Partida para o orçamento do modo só de estatísticas (antes das importações pesadas)
+_STARTED = time.perf_counter()
+
+import pandas as pd
+import numpy as np
+
+from catalog import latest_timestamp as latest_on_disk
+from manifest import latest as manifest_latest
+from run_index import latest_timestamp, query_runs, sync_index
+from results_store import sync_store
+from stats_engine import grouped_stats
+from bootstrap import RESAMPLES, bootstrap_ci, ci_errors
+from significance import against_baseline, format_table, ranked, verdict
+from robust import MIN_DEVIATION, THRESHOLD, quarantine, robust_stats
+from plotting import PackedFrame, check_stats_budget, load_plotting, render, style_signature
+from artifact_cache import ArtifactCache, default_cache_path
+
+# matplotlib e seaborn só são importados ao gerar gráficos (use_plotting)
+plt = sns = None
+
+# Parâmetros das figuras (também entram na chave do cache)
+RC = {'figure.figsize': (12, 8), 'font.size': 12}
+
+def use_plotting():
+    """Importa as bibliotecas de gráficos e aplica o estilo"""
+    global plt, sns
+    plt, sns = load_plotting(RC)
 
 def load_scenario_configs():
     """Carrega as configurações dos cenários"""
@@ -36,109 +57,103 @@ def load_scenario_configs():
     return scenarios
 
 def load_test_results(timestamp=None):
-    """Carrega os resultados dos testes da Atividade 2"""
+    """Carrega os resultados dos testes da Atividade 2 pelo índice de execuções"""
     results_dir = Path("/docs/atv2/results/raw")
     
-    if timestamp:
-        pattern = f"{timestamp}_*.json"
-    else:
-        # Pegar o timestamp mais recente
-        files = list(results_dir.glob("*_*.json"))
-        if not files:
+    if not timestamp:
+        # Ponteiro do manifesto, salvo se houver JSONs mais novos gravados sem manifesto
+        pointer = manifest_latest(results_dir)
+        if pointer and latest_on_disk(results_dir) == pointer:
+            timestamp = pointer
+    db = sync_index(results_dir, scenarios_dir=Path("/docs/atv2/scenarios"), timestamp=timestamp)
+    
+    if not timestamp:
+        # Bateria mais recente com os cenários definidos (scenario_N_*)
+        timestamp = latest_timestamp(db, scenario__like='scenario%') or latest_timestamp(db)
+        if not timestamp:
             print("Nenhum resultado encontrado!")
             sys.exit(1)
-        
-        # Extrair timestamps únicos
-        timestamps = set()
-        for f in files:
-            parts = f.stem.split('_')
-            if len(parts) >= 2:
-                timestamps.add(f"{parts[0]}_{parts[1]}")
-        
-        timestamp = max(timestamps)
-        pattern = f"{timestamp}_*.json"
     
     print(f"Carregando resultados com timestamp: {timestamp}")
     
-    # Carregar dados
-    data = []
-    for result_file in results_dir.glob(pattern):
-        if 'system_config' in str(result_file):
-            continue
-            
-        try:
-            with open(result_file, 'r') as f:
-                result = json.load(f)
-                
-            # Extrair informações do nome do arquivo
-            parts = result_file.stem.split('_')
-            scenario_name = '_'.join(parts[2:-1])  # Remove timestamp e rep
-            rep_num = int(parts[-1].replace('rep', ''))
-            
-            # Extrair métricas
-            if 'end' in result:
-                throughput_bps = result['end']['sum_sent']['bits_per_second']
-                throughput_mbps = throughput_bps / 1e6
-                
-                retransmits = result['end']['sum_sent'].get('retransmits', 0)
-                
-                # CPU usage
-                cpu_sender = result['end']['cpu_utilization_percent'].get('host_total', 0)
-                cpu_receiver = result['end']['cpu_utilization_percent'].get('remote_total', 0)
-                
-                # RTT (se disponível)
-                rtt_ms = 0
-                if 'streams' in result['end']:
-                    for stream in result['end']['streams']:
-                        if 'rtt' in stream:
-                            rtt_ms = stream['rtt'] / 1000  # converter para ms
-                            break
-                
-                data.append({
-                    'timestamp': timestamp,
-                    'scenario': scenario_name,
-                    'repetition': rep_num,
-                    'throughput_mbps': throughput_mbps,
-                    'retransmits': retransmits,
-                    'cpu_sender': cpu_sender,
-                    'cpu_receiver': cpu_receiver,
-                    'rtt_ms': rtt_ms
-                })
-                
-        except Exception as e:
-            print(f"Erro ao processar {result_file}: {e}")
-    
-    df = pd.DataFrame(data)
+    failed = query_runs(db, include_errors=True, error__like='%', timestamp=timestamp)
+    for run in failed:
+        print(f"Teste com erro ignorado {run['path']}: {run['error']}")
+    errors = pd.DataFrame({'scenario': [run['scenario'] for run in failed],
+                           'repetition': [run['repetition'] for run in failed],
+                           'reason': [f"erro do iperf3: {run['error']}" for run in failed]})
+    
+    columns = ['timestamp', 'scenario', 'repetition', 'throughput_mbps', 'retransmits',
+               'cpu_sender', 'cpu_receiver', 'rtt_ms']
+    df = pd.DataFrame(query_runs(db, columns=columns, timestamp=timestamp), columns=columns)
     print(f"Carregados {len(df)} resultados de teste")
     
-    return df, timestamp
+    return df, timestamp, errors
+
+def quarantine_runs(df, errors):
+    """Separa as repetições atípicas de cada cenário (escore z modificado)
+
+    Retorna as execuções mantidas e a quarentena (cenário, repetição e
+    motivo), que inclui também as execuções com erro do iperf3.
+    """
+    kept, outliers = quarantine(df, 'scenario')
+    excluded = pd.concat([errors, outliers[['scenario', 'repetition', 'reason']]], ignore_index=True)
+    for _, row in outliers.iterrows():
+        print(f"Repetição em quarentena {row['scenario']} rep{row['repetition']}: {row['reason']}")
+    return kept, excluded.sort_values(['scenario', 'repetition'], kind='stable').reset_index(drop=True)
 
 def calculate_statistics(df, scenarios):
     """Calcula estatísticas detalhadas por cenário"""
-    stats_data = []
-    
-    for scenario_name in df['scenario'].unique():
-        scenario_data = df[df['scenario'] == scenario_name]
-        scenario_config = scenarios.get(scenario_name, {})
-        
-        stats_data.append({
-            'scenario': scenario_name,
-            'description': scenario_config.get('description', scenario_name),
-            'samples': len(scenario_data),
-            'throughput_mean': scenario_data['throughput_mbps'].mean(),
-            'throughput_std': scenario_data['throughput_mbps'].std(),
-            'throughput_min': scenario_data['throughput_mbps'].min(),
-            'throughput_max': scenario_data['throughput_mbps'].max(),
-            'throughput_p95': scenario_data['throughput_mbps'].quantile(0.95),
-            'retransmits_mean': scenario_data['retransmits'].mean(),
-            'retransmits_total': scenario_data['retransmits'].sum(),
-            'cpu_sender_mean': scenario_data['cpu_sender'].mean(),
-            'cpu_receiver_mean': scenario_data['cpu_receiver'].mean(),
-            'rtt_mean': scenario_data['rtt_ms'].mean() if scenario_data['rtt_ms'].sum() > 0 else 0,
-            'cv': scenario_data['throughput_mbps'].std() / scenario_data['throughput_mbps'].mean() * 100  # Coeficiente de variação
-        })
-    
-    return pd.DataFrame(stats_data)
+    grouped = grouped_stats(df, 'scenario', {
+        'throughput_mbps': ('mean', 'std', 'min', 'max', 'p95', 'cv'),
+        'retransmits': ('mean', 'sum'),
+        'cpu_sender': ('mean',),
+        'cpu_receiver': ('mean',),
+        'rtt_ms': ('mean', 'sum'),
+    }, sort=False)
+    # Intervalos de confiança bootstrap (95%) de média, mediana e p95
+    ci = bootstrap_ci(df, 'scenario', sort=False)
+    # Estimadores robustos: média aparada, Hodges–Lehmann, MAD e CV robusto
+    robust = robust_stats(df, 'scenario', sort=False)
+    
+    stats_df = pd.DataFrame({
+        'scenario': grouped.index,
+        'description': [scenarios.get(name, {}).get('description', name) for name in grouped.index],
+        'samples': grouped['samples'].to_numpy(),
+        'throughput_mean': grouped['throughput_mbps_mean'].to_numpy(),
+        'throughput_std': grouped['throughput_mbps_std'].to_numpy(),
+        'throughput_min': grouped['throughput_mbps_min'].to_numpy(),
+        'throughput_max': grouped['throughput_mbps_max'].to_numpy(),
+        'throughput_p95': grouped['throughput_mbps_p95'].to_numpy(),
+        'throughput_ci_low': ci['throughput_mbps_mean_low'].to_numpy(),
+        'throughput_ci_high': ci['throughput_mbps_mean_high'].to_numpy(),
+        'throughput_median': ci['throughput_mbps_median'].to_numpy(),
+        'throughput_median_ci_low': ci['throughput_mbps_median_low'].to_numpy(),
+        'throughput_median_ci_high': ci['throughput_mbps_median_high'].to_numpy(),
+        'throughput_p95_ci_low': ci['throughput_mbps_p95_low'].to_numpy(),
+        'throughput_p95_ci_high': ci['throughput_mbps_p95_high'].to_numpy(),
+        'throughput_trimmed': robust['throughput_mbps_trimmed'].to_numpy(),
+        'throughput_hl': robust['throughput_mbps_hl'].to_numpy(),
+        'throughput_mad': robust['throughput_mbps_mad'].to_numpy(),
+        'retransmits_mean': grouped['retransmits_mean'].to_numpy(),
+        'retransmits_total': grouped['retransmits_sum'].to_numpy(),
+        'retransmits_ci_low': ci['retransmits_mean_low'].to_numpy(),
+        'retransmits_ci_high': ci['retransmits_mean_high'].to_numpy(),
+        'cpu_sender_mean': grouped['cpu_sender_mean'].to_numpy(),
+        'cpu_receiver_mean': grouped['cpu_receiver_mean'].to_numpy(),
+        'rtt_mean': np.where(grouped['rtt_ms_sum'] > 0, grouped['rtt_ms_mean'], 0),
+        'cv': grouped['throughput_mbps_cv'].to_numpy(),  # Coeficiente de variação
+        'robust_cv': robust['throughput_mbps_rcv'].to_numpy()  # MAD / mediana
+    })
+    
+    return stats_df
+
+def calculate_significance(df):
+    """Cada cenário contra o cenário baseline (Welch e Mann–Whitney, correção de Holm)"""
+    baseline = next((name for name in df['scenario'].unique() if 'baseline' in name), None)
+    if baseline is None:
+        return pd.DataFrame()
+    return ranked(against_baseline(df, 'scenario', (df['scenario'] == baseline).to_numpy()))
 
 def plot_scenario_comparison(stats_df, output_dir):
     """Gráfico comparativo principal dos cenários"""
@@ -148,15 +163,16 @@ def plot_scenario_comparison(stats_df, output_dir):
     scenarios = stats_df.sort_values('throughput_mean', ascending=False)
     x = range(len(scenarios))
     
-    # Barras com erro
+    # Barras com intervalo de confiança bootstrap (95%) da média
     bars = ax.bar(x, scenarios['throughput_mean'], 
-                   yerr=scenarios['throughput_std'],
+                   yerr=ci_errors(scenarios['throughput_mean'], scenarios['throughput_ci_low'],
+                                  scenarios['throughput_ci_high']),
                    capsize=5, alpha=0.8,
                    color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b'])
     
     # Adicionar valores nas barras
     for i, (idx, row) in enumerate(scenarios.iterrows()):
-        ax.text(i, row['throughput_mean'] + row['throughput_std'] + 50,
+        ax.text(i, row['throughput_ci_high'] + 50,
                 f'{row["throughput_mean"]:.0f}', 
                 ha='center', va='bottom', fontsize=10)
     
@@ -181,7 +197,7 @@ def plot_detailed_metrics(df, stats_df, output_dir):
     
     # 1. Box plot de throughput por cenário
     ax1 = axes[0, 0]
-    scenario_order = stats_df.sort_values('throughput_mean', ascending=False)['scenario'].tolist()
+    scenario_order = stats_df.sort_values('throughput_hl', ascending=False)['scenario'].tolist()
     df_ordered = df.copy()
     df_ordered['scenario_clean'] = df_ordered['scenario'].map(lambda x: x.replace('scenario_', '').replace('_', ' ').title())
     
@@ -224,15 +240,15 @@ def plot_detailed_metrics(df, stats_df, output_dir):
                          for s in cpu_data['scenario']], rotation=45, ha='right')
     ax3.legend()
     
-    # 4. Coeficiente de Variação (estabilidade)
+    # 4. Coeficiente de Variação robusto (estabilidade, MAD / mediana)
     ax4 = axes[1, 1]
-    cv_data = stats_df.sort_values('cv')
+    cv_data = stats_df.sort_values('robust_cv')
     x = range(len(cv_data))
-    colors = ['green' if cv < 5 else 'orange' if cv < 10 else 'red' for cv in cv_data['cv']]
+    colors = ['green' if cv < 5 else 'orange' if cv < 10 else 'red' for cv in cv_data['robust_cv']]
     
-    ax4.bar(x, cv_data['cv'], alpha=0.8, color=colors)
+    ax4.bar(x, cv_data['robust_cv'], alpha=0.8, color=colors)
     ax4.set_xlabel('Cenário')
-    ax4.set_ylabel('Coeficiente de Variação (%)')
+    ax4.set_ylabel('CV Robusto - MAD / Mediana (%)')
     ax4.set_title('Estabilidade do Throughput (menor = mais estável)')
     ax4.set_xticks(x)
     ax4.set_xticklabels([s.replace('scenario_', '').replace('_', '\n').title() 
@@ -250,16 +266,17 @@ def plot_network_conditions_impact(df, scenarios, output_dir):
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     
     # Preparar dados com condições de rede
+    throughput = grouped_stats(df, 'scenario', {'throughput_mbps': ('mean', 'std')})
     conditions_data = []
     for scenario_name, config in scenarios.items():
-        if scenario_name in df['scenario'].unique():
-            scenario_stats = df[df['scenario'] == scenario_name]['throughput_mbps'].agg(['mean', 'std'])
+        if scenario_name in throughput.index:
+            scenario_stats = throughput.loc[scenario_name]
             conditions = config['network_conditions']
             
             conditions_data.append({
                 'scenario': config['description'],
-                'throughput_mean': scenario_stats['mean'],
-                'throughput_std': scenario_stats['std'],
+                'throughput_mean': scenario_stats['throughput_mbps_mean'],
+                'throughput_std': scenario_stats['throughput_mbps_std'],
                 'latency': conditions.get('latency_ms', 0) or 0,
                 'bandwidth': conditions.get('bandwidth_mbps', 0) or 0,
                 'loss': conditions.get('packet_loss_percent', 0) or 0,
@@ -345,29 +362,60 @@ def plot_network_conditions_impact(df, scenarios, output_dir):
     plt.savefig(output_dir / 'atv2_network_conditions_impact.png', dpi=300, bbox_inches='tight')
     plt.close()
 
-def generate_comparison_table(stats_df, scenarios, output_file):
+def generate_comparison_table(stats_df, scenarios, output_file, significance=None, quarantined=None):
     """Gera tabela comparativa detalhada em formato markdown"""
     
-    # Ordenar por throughput médio
-    stats_df = stats_df.sort_values('throughput_mean', ascending=False)
+    # Ordenar pelo estimador de Hodges–Lehmann (robusto a uma repetição ruim)
+    stats_df = stats_df.sort_values('throughput_hl', ascending=False)
     
     with open(output_file, 'w') as f:
         f.write("# Tabela Comparativa de Cenários - Atividade 2\n\n")
         f.write("## Resumo Estatístico\n\n")
         
         # Tabela principal
-        f.write("| Cenário | Descrição | Throughput (Mbps) | Desvio Padrão | CV (%) | Retrans. | CPU Send (%) | Amostras |\n")
-        f.write("|---------|-----------|-------------------|---------------|--------|----------|--------------|----------|\n")
+        f.write("| Cenário | Descrição | Throughput (Mbps) | IC 95% (Mbps) | HL (Mbps) | Mediana [IC 95%] | p95 [IC 95%] | CV rob. (%) | Retrans. [IC 95%] | CPU Send (%) | Amostras |\n")
+        f.write("|---------|-----------|-------------------|---------------|-----------|------------------|--------------|-------------|-------------------|--------------|----------|\n")
         
         for _, row in stats_df.iterrows():
             scenario_config = scenarios.get(row['scenario'], {})
             desc = scenario_config.get('description', row['scenario'])
             
             f.write(f"| {row['scenario'].replace('scenario_', '')} | {desc} | "
-                   f"{row['throughput_mean']:.1f} | {row['throughput_std']:.1f} | "
-                   f"{row['cv']:.1f} | {row['retransmits_mean']:.0f} | "
+                   f"{row['throughput_mean']:.1f} | "
+                   f"[{row['throughput_ci_low']:.1f}, {row['throughput_ci_high']:.1f}] | "
+                   f"{row['throughput_hl']:.1f} | "
+                   f"{row['throughput_median']:.1f} [{row['throughput_median_ci_low']:.1f}, {row['throughput_median_ci_high']:.1f}] | "
+                   f"{row['throughput_p95']:.1f} [{row['throughput_p95_ci_low']:.1f}, {row['throughput_p95_ci_high']:.1f}] | "
+                   f"{row['robust_cv']:.1f} | "
+                   f"{row['retransmits_mean']:.0f} [{row['retransmits_ci_low']:.0f}, {row['retransmits_ci_high']:.0f}] | "
                    f"{row['cpu_sender_mean']:.1f} | {row['samples']} |\n")
         
+        f.write(f"\nIntervalos de confiança de 95% por bootstrap (método dos percentis, "
+                f"{RESAMPLES} reamostragens das repetições de cada cenário). Cenários ordenados "
+                f"pelo estimador de Hodges–Lehmann; CV robusto = MAD / mediana.\n")
+        
+        if quarantined is not None and not quarantined.empty:
+            f.write("\n## Repetições em Quarentena\n\n")
+            f.write("| Cenário | Repetição | Motivo |\n")
+            f.write("|---------|-----------|--------|\n")
+            for _, row in quarantined.iterrows():
+                f.write(f"| {row['scenario'].replace('scenario_', '')} | {row['repetition']} | {row['reason']} |\n")
+            f.write(f"\nExcluídas de todas as estatísticas: execuções com erro do iperf3 e repetições "
+                    f"com escore z modificado acima de {THRESHOLD:g} e a mais de "
+                    f"{MIN_DEVIATION * 100:g}% da mediana do cenário.\n")
+        
+        if significance is not None and not significance.empty:
+            f.write("\n## Significância vs Baseline\n\n")
+            f.write("| Cenário | Δ Throughput | p Welch (Holm) | p Mann–Whitney | g de Hedges | δ de Cliff | Conclusão |\n")
+            f.write("|---------|--------------|----------------|----------------|-------------|------------|-----------|\n")
+            for _, row in significance.iterrows():
+                f.write(f"| {row['group'].replace('scenario_', '')} | {row['diff_pct']:+.1f}% | "
+                       f"{row['p_welch_holm']:.4f} | {row['p_mw']:.3f} | "
+                       f"{row['hedges_g']:.2f} | {row['cliffs_delta']:+.2f} | {verdict(row)} |\n")
+            f.write("\nTeste t de Welch com correção de Holm para as comparações múltiplas (α = 0,05); "
+                    "Mann–Whitney e tamanhos de efeito como verificação. Com 3 repetições, o "
+                    "Mann–Whitney bilateral exato não fica abaixo de 0,1.\n")
+        
         f.write("\n## Configurações dos Cenários\n\n")
         
         # Tabela de configurações
@@ -393,15 +441,15 @@ def generate_comparison_table(stats_df, scenarios, output_file):
         best = stats_df.iloc[0]
         worst = stats_df.iloc[-1]
         
-        f.write(f"- **Melhor Desempenho**: {scenarios[best['scenario']]['description']} "
-               f"({best['throughput_mean']:.1f} Mbps)\n")
-        f.write(f"- **Pior Desempenho**: {scenarios[worst['scenario']]['description']} "
-               f"({worst['throughput_mean']:.1f} Mbps)\n")
-        f.write(f"- **Diferença**: {((best['throughput_mean'] - worst['throughput_mean']) / worst['throughput_mean'] * 100):.1f}%\n")
-        f.write(f"- **Cenário Mais Estável**: {stats_df.loc[stats_df['cv'].idxmin(), 'scenario']} "
-               f"(CV = {stats_df['cv'].min():.1f}%)\n")
-        f.write(f"- **Cenário Menos Estável**: {stats_df.loc[stats_df['cv'].idxmax(), 'scenario']} "
-               f"(CV = {stats_df['cv'].max():.1f}%)\n")
+        f.write(f"- **Melhor Desempenho**: {scenarios.get(best['scenario'], {}).get('description', best['scenario'])} "
+               f"({best['throughput_hl']:.1f} Mbps)\n")
+        f.write(f"- **Pior Desempenho**: {scenarios.get(worst['scenario'], {}).get('description', worst['scenario'])} "
+               f"({worst['throughput_hl']:.1f} Mbps)\n")
+        f.write(f"- **Diferença**: {((best['throughput_hl'] - worst['throughput_hl']) / worst['throughput_hl'] * 100):.1f}%\n")
+        f.write(f"- **Cenário Mais Estável**: {stats_df.loc[stats_df['robust_cv'].idxmin(), 'scenario']} "
+               f"(CV robusto = {stats_df['robust_cv'].min():.1f}%)\n")
+        f.write(f"- **Cenário Menos Estável**: {stats_df.loc[stats_df['robust_cv'].idxmax(), 'scenario']} "
+               f"(CV robusto = {stats_df['robust_cv'].max():.1f}%)\n")
 
 def generate_theoretical_analysis(scenarios, stats_df, output_file):
     """Gera análise teórica dos resultados"""
@@ -409,7 +457,7 @@ def generate_theoretical_analysis(scenarios, stats_df, output_file):
     with open(output_file, 'w') as f:
         f.write("# Análise Teórica dos Resultados - Atividade 2\n\n")
         
-        for _, row in stats_df.sort_values('throughput_mean', ascending=False).iterrows():
+        for _, row in stats_df.sort_values('throughput_hl', ascending=False).iterrows():
             scenario = row['scenario']
             config = scenarios.get(scenario, {})
             
@@ -436,7 +484,8 @@ def generate_theoretical_analysis(scenarios, stats_df, output_file):
             
             f.write("\n### Resultados Observados\n")
             f.write(f"- Throughput Médio: {row['throughput_mean']:.1f} Mbps\n")
-            f.write(f"- Desvio Padrão: {row['throughput_std']:.1f} Mbps\n")
+            f.write(f"- IC 95% da Média (bootstrap): [{row['throughput_ci_low']:.1f}, "
+                    f"{row['throughput_ci_high']:.1f}] Mbps\n")
             f.write(f"- Coeficiente de Variação: {row['cv']:.1f}%\n")
             f.write(f"- Retransmissões Médias: {row['retransmits_mean']:.0f}\n")
             
@@ -482,8 +531,60 @@ def generate_theoretical_analysis(scenarios, stats_df, output_file):
             
             f.write("\n---\n\n")
 
+def statistics_only(timestamp=None, as_json=False):
+    """Estatísticas e significância sem gráficos nem arquivos
+
+    Com `as_json`, a saída padrão recebe só o JSON (progresso no stderr).
+    """
+    with redirect_stdout(sys.stderr if as_json else sys.stdout):
+        scenarios = load_scenario_configs()
+        df, timestamp, errors = load_test_results(timestamp)
+        if df.empty:
+            print("Nenhum resultado válido encontrado!")
+            sys.exit(1)
+        df, quarantined = quarantine_runs(df, errors)
+        stats_df = calculate_statistics(df, scenarios)
+        significance = calculate_significance(df)
+    
+    if as_json:
+        print(json.dumps({
+            'timestamp': timestamp,
+            'samples': len(df),
+            'statistics': json.loads(stats_df.to_json(orient='records')),
+            'significance': json.loads(significance.to_json(orient='records')),
+            'quarantine': json.loads(quarantined.to_json(orient='records')),
+        }, indent=2, ensure_ascii=False))
+        return
+    
+    print(f"\n{'cenário':<36} {'n':>3} {'throughput (Mbps)':>18} {'IC 95%':>21} {'HL':>12} {'CV rob. %':>9}")
+    for _, row in stats_df.sort_values('throughput_hl', ascending=False).iterrows():
+        print(f"{row['scenario']:<36} {row['samples']:>3} {row['throughput_mean']:>18.2f} "
+              f"{row['throughput_ci_low']:>10.2f}-{row['throughput_ci_high']:<10.2f} "
+              f"{row['throughput_hl']:>12.2f} {row['robust_cv']:>9.1f}")
+    print(f"\n{len(quarantined)} execução(ões) em quarentena")
+    if not significance.empty:
+        print()
+        print(format_table(significance))
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Análise dos cenários da Atividade 2")
+    parser.add_argument('timestamp', nargs='?', help="Bateria analisada (padrão: a mais recente)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos de renderização das figuras (padrão: todos os núcleos)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Gera todas as figuras e tabelas, mesmo as que não mudaram")
+    parser.add_argument('--stats-only', action='store_true',
+                        help="Só estatísticas, sem gráficos nem arquivos (não importa matplotlib/seaborn)")
+    parser.add_argument('--json', action='store_true',
+                        help="Estatísticas em JSON na saída padrão (implica --stats-only)")
+    args = parser.parse_args()
+    
+    if args.stats_only or args.json:
+        statistics_only(args.timestamp, args.json)
+        check_stats_budget(_STARTED)
+        return
+    
     print("=== Análise de Resultados - Atividade 2 ===\n")
     
     # Criar diretórios de saída
@@ -500,40 +601,65 @@ def main():
     
     # Carregar resultados
     print("\nCarregando resultados dos testes...")
-    df, timestamp = load_test_results()
+    df, timestamp, errors = load_test_results(args.timestamp)
     
     if df.empty:
         print("Nenhum resultado válido encontrado!")
         sys.exit(1)
     
+    # Quarentena das repetições atípicas (e das execuções com erro), com o motivo
+    df, quarantined = quarantine_runs(df, errors)
+    
     # Calcular estatísticas
     print("\nCalculando estatísticas...")
     stats_df = calculate_statistics(df, scenarios)
+    significance = calculate_significance(df)
     
-    # Salvar dados processados
-    df.to_csv(processed_dir / f"{timestamp}_raw_data.csv", index=False)
-    stats_df.to_csv(processed_dir / f"{timestamp}_statistics.csv", index=False)
+    # Salvar dados processados (execuções no armazenamento colunar, estatísticas em Parquet)
+    raw_dir = Path("/docs/atv2/results/raw")
+    sync_store(raw_dir, raw_dir.parent / "store", timestamp)
+    stats_df.to_parquet(processed_dir / f"{timestamp}_statistics.parquet", index=False)
+    quarantined.to_csv(processed_dir / f"{timestamp}_quarantine.csv", index=False)
     
     # Gerar visualizações
     print("\nGerando visualizações...")
-    plot_scenario_comparison(stats_df, output_dir)
-    plot_detailed_metrics(df, stats_df, output_dir)
-    plot_network_conditions_impact(df, scenarios, output_dir)
+    # Só figuras e tabelas cujos dados, código ou estilo mudaram são geradas de novo
+    cache = ArtifactCache(default_cache_path(output_dir))
+    runs, summary = PackedFrame(df), PackedFrame(stats_df)
+    jobs = [
+        (plot_detailed_metrics, (runs, summary, output_dir), [output_dir / 'atv2_detailed_metrics.png']),
+        (plot_network_conditions_impact, (runs, scenarios, output_dir),
+         [output_dir / 'atv2_network_conditions_impact.png']),
+        (plot_scenario_comparison, (summary, output_dir), [output_dir / 'atv2_scenario_comparison.png']),
+    ]
+    rendered = render(jobs, args.workers, initializer=use_plotting, cache=cache, style=style_signature(RC),
+                      rebuild=args.rebuild)
+    print(f"Figuras: {len(rendered)} renderizadas, {len(jobs) - len(rendered)} do cache")
     
     # Gerar tabelas e análises
     print("\nGerando tabelas e análises...")
-    generate_comparison_table(stats_df, scenarios, 
-                            processed_dir / f"{timestamp}_comparison_table.md")
-    generate_theoretical_analysis(scenarios, stats_df, 
-                                processed_dir / f"{timestamp}_theoretical_analysis.md")
+    comparison_file = processed_dir / f"{timestamp}_comparison_table.md"
+    analysis_file = processed_dir / f"{timestamp}_theoretical_analysis.md"
+    tables = [
+        (generate_comparison_table, (stats_df, scenarios, comparison_file, significance, quarantined),
+         comparison_file),
+        (generate_theoretical_analysis, (scenarios, stats_df, analysis_file), analysis_file),
+    ]
+    for function, table_args, output in tables:
+        if not cache.build(function, table_args, [output], rebuild=args.rebuild):
+            print(f"Tabela em cache: {output.name}")
+    cache.save()
     
     # Resumo final
     print("\n=== Resumo da Análise ===")
     print(f"Timestamp: {timestamp}")
     print(f"Total de cenários analisados: {len(stats_df)}")
     print(f"Total de amostras: {len(df)}")
-    print(f"\nMelhor desempenho: {stats_df.iloc[0]['description']}")
-    print(f"Throughput: {stats_df.iloc[0]['throughput_mean']:.1f} ± {stats_df.iloc[0]['throughput_std']:.1f} Mbps")
+    print(f"Execuções em quarentena: {len(quarantined)}")
+    best = stats_df.loc[stats_df['throughput_hl'].idxmax()]
+    print(f"\nMelhor desempenho: {best['description']}")
+    print(f"Throughput: {best['throughput_mean']:.1f} ± {best['throughput_std']:.1f} Mbps "
+          f"(Hodges–Lehmann {best['throughput_hl']:.1f} Mbps)")
     print(f"\nArquivos gerados em:")
     print(f"- Gráficos: {output_dir}")
     print(f"- Dados processados: {processed_dir}")
@@ -4,85 +4,64 @@
 Análise completa dos resultados da Atividade 2
 """
 
-import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from pathlib import Path
-import sys
+import argparse
+
+from run_index import latest_timestamp, query_runs, sync_index
+from significance import ALPHA, against_baseline, format_table, pairwise, ranked
+from stats_engine import grouped_stats
 
 # Configurações
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
-def load_results(timestamp="20250801_044307"):
-    """Carrega todos os resultados do timestamp"""
-    results_dir = Path("/results/atv2/results/raw")
-    data = []
-    
-    for result_file in results_dir.glob(f"{timestamp}_*.json"):
-        if 'system_config' in str(result_file):
-            continue
-            
-        try:
-            with open(result_file, 'r') as f:
-                result = json.load(f)
-            
-            # Extrair nome do teste
-            filename = result_file.stem
-            parts = filename.split('_')
-            
-            # Identificar tipo de teste
-            if 'baseline' in filename:
-                test_type = 'baseline'
-                algorithm = parts[2]
-                condition = 'none'
-            elif 'latency' in filename:
-                test_type = 'latency'
-                algorithm = parts[2]
-                condition = parts[3]
-            elif 'band' in filename:
-                test_type = 'bandwidth'
-                algorithm = parts[2]
-                condition = parts[3]
-            elif 'loss' in filename:
-                test_type = 'loss'
-                algorithm = parts[2]
-                condition = parts[3]
-            elif 'streams' in filename:
-                test_type = 'streams'
-                algorithm = parts[2]
-                condition = parts[3]
-            else:
-                continue
-            
-            # Extrair métricas
-            if 'end' in result and 'sum_sent' in result['end']:
-                throughput_bps = result['end']['sum_sent']['bits_per_second']
-                throughput_mbps = throughput_bps / 1e6
-                
-                retransmits = result['end']['sum_sent'].get('retransmits', 0)
-                
-                # Streams info
-                streams = result['end'].get('streams', [])
-                num_streams = len(streams)
-                
-                data.append({
-                    'timestamp': timestamp,
-                    'algorithm': algorithm,
-                    'test_type': test_type,
-                    'condition': condition,
-                    'throughput_mbps': throughput_mbps,
-                    'retransmits': retransmits,
-                    'num_streams': num_streams if num_streams > 1 else 1
-                })
-                
-        except Exception as e:
-            print(f"Erro ao processar {result_file}: {e}")
-    
-    df = pd.DataFrame(data)
-    print(f"Carregados {len(df)} resultados")
+# Parâmetros que definem uma configuração ao juntar baterias
+CONFIG_COLUMNS = ['window_kb', 'streams', 'latency_ms', 'bandwidth_mbit', 'loss_pct']
+
+def same_configuration(df):
+    """Execuções de cada (algoritmo, tipo de teste) com os mesmos parâmetros
+
+    Mantém, por grupo, só a configuração da bateria mais recente: cenários
+    diferentes com o mesmo tipo de teste (ex.: reno_loss0.5 e
+    scenario_4_lossy_reno) não são misturados.
+    """
+    key = df[CONFIG_COLUMNS].astype(object).where(df[CONFIG_COLUMNS].notna(), None).apply(tuple, axis=1)
+    df = df.assign(config=key)
+    latest = df.sort_values('timestamp').groupby(['algorithm', 'test_type'])['config'].last()
+    keep = [latest[(a, t)] == c for a, t, c in zip(df['algorithm'], df['test_type'], df['config'])]
+    return df[keep].drop(columns='config')
+
+def load_results(timestamp=None, all_batteries=False):
+    """Carrega os resultados das comparações de algoritmos pelo índice de execuções
+
+    Sem `timestamp`, usa a bateria mais recente com os tipos de teste
+    analisados. Com `all_batteries`, junta as baterias, mas só as execuções
+    com o mesmo conjunto de parâmetros (same_configuration).
+    """
+    db = sync_index(Path("/results/atv2/results/raw"))
+    filters = {'test_type': ('baseline', 'latency', 'bandwidth', 'loss', 'streams')}
+    if timestamp:
+        filters['timestamp'] = timestamp
+    elif not all_batteries:
+        filters['timestamp'] = latest_timestamp(db, **filters)
+    
+    for failed in query_runs(db, include_errors=True, error__like='%', **filters):
+        print(f"Teste com erro ignorado {failed['path']}: {failed['error']}")
+    
+    columns = ['timestamp', 'algorithm', 'test_type', 'condition',
+               'throughput_mbps', 'retransmits'] + CONFIG_COLUMNS
+    df = pd.DataFrame(query_runs(db, columns=columns, **filters), columns=columns)
+    if all_batteries and not timestamp and not df.empty:
+        df = same_configuration(df)
+    df = df.drop(columns=[c for c in CONFIG_COLUMNS if c != 'streams'])
+    df = df.rename(columns={'streams': 'num_streams'})
+    if not df.empty:
+        df['num_streams'] = df['num_streams'].fillna(1).clip(lower=1)
+    print(f"Carregados {len(df)} resultados de {df['timestamp'].nunique()} bateria(s)")
     return df
 
 def analyze_algorithms(df):
@@ -95,51 +74,60 @@ def analyze_algorithms(df):
     print("Desempenho Baseline (sem limitações):")
     print("-" * 60)
     
-    for algo in baseline_df['algorithm'].unique():
-        algo_data = baseline_df[baseline_df['algorithm'] == algo]
-        mean_tp = algo_data['throughput_mbps'].mean()
-        std_tp = algo_data['throughput_mbps'].std()
-        mean_ret = algo_data['retransmits'].mean()
-        
-        print(f"{algo.upper():8} | Throughput: {mean_tp:>8.1f} ± {std_tp:>6.1f} Mbps | Retrans: {mean_ret:>6.0f}")
+    summary = grouped_stats(baseline_df, 'algorithm', {
+        'throughput_mbps': ('mean', 'std', 'count'),
+        'retransmits': ('mean',),
+    }, sort=False)
     
-    return baseline_df.groupby('algorithm')['throughput_mbps'].agg(['mean', 'std', 'count'])
+    for algo, row in summary.iterrows():
+        print(f"{algo.upper():8} | Throughput: {row['throughput_mbps_mean']:>8.1f} ± "
+              f"{row['throughput_mbps_std']:>6.1f} Mbps | Retrans: {row['retransmits_mean']:>6.0f}")
+    
+    summary = summary[['throughput_mbps_mean', 'throughput_mbps_std', 'throughput_mbps_count']]
+    summary.columns = ['mean', 'std', 'count']
+    return summary.sort_index()
 
 def analyze_conditions(df):
     """Análise do impacto das condições de rede"""
     print("\n=== Impacto das Condições de Rede ===\n")
     
     conditions_impact = []
+    means = grouped_stats(df, ['algorithm', 'test_type'], {'throughput_mbps': ('mean',)})['throughput_mbps_mean']
+    # Welch (Holm) de cada tipo de teste contra o baseline do mesmo algoritmo
+    tests = against_baseline(df, 'test_type', (df['test_type'] == 'baseline').to_numpy(), within='algorithm')
+    tests = tests.set_index(['context', 'group'])
     
     # Para cada algoritmo que temos dados completos
     for algo in ['cubic', 'bbr', 'reno']:
-        baseline = df[(df['algorithm'] == algo) & (df['test_type'] == 'baseline')]['throughput_mbps'].mean()
+        baseline = means.get((algo, 'baseline'), np.nan)
         
         if baseline > 0:
             # Latência
-            latency_data = df[(df['algorithm'] == algo) & (df['test_type'] == 'latency')]
-            if not latency_data.empty:
-                latency_tp = latency_data['throughput_mbps'].mean()
+            if (algo, 'latency') in means.index:
+                latency_tp = means[(algo, 'latency')]
                 impact = (latency_tp - baseline) / baseline * 100
                 conditions_impact.append({
                     'algorithm': algo,
                     'condition': 'latency',
                     'baseline_mbps': baseline,
                     'condition_mbps': latency_tp,
-                    'impact_percent': impact
+                    'impact_percent': impact,
+                    'p_value': tests.loc[(algo, 'latency'), 'p_welch_holm'],
+                    'significant': tests.loc[(algo, 'latency'), 'significant'],
                 })
             
             # Perda
-            loss_data = df[(df['algorithm'] == algo) & (df['test_type'] == 'loss')]
-            if not loss_data.empty:
-                loss_tp = loss_data['throughput_mbps'].mean()
+            if (algo, 'loss') in means.index:
+                loss_tp = means[(algo, 'loss')]
                 impact = (loss_tp - baseline) / baseline * 100
                 conditions_impact.append({
                     'algorithm': algo,
                     'condition': 'loss_0.5%',
                     'baseline_mbps': baseline,
                     'condition_mbps': loss_tp,
-                    'impact_percent': impact
+                    'impact_percent': impact,
+                    'p_value': tests.loc[(algo, 'loss'), 'p_welch_holm'],
+                    'significant': tests.loc[(algo, 'loss'), 'significant'],
                 })
     
     impact_df = pd.DataFrame(conditions_impact)
@@ -151,10 +139,25 @@ def analyze_conditions(df):
             print(f"{row['algorithm'].upper():8} | {row['condition']:12} | "
                   f"Baseline: {row['baseline_mbps']:>8.1f} | "
                   f"Com condição: {row['condition_mbps']:>8.1f} | "
-                  f"Impacto: {row['impact_percent']:>+6.1f}%")
+                  f"Impacto: {row['impact_percent']:>+6.1f}% | "
+                  f"p (Holm): {row['p_value']:.4f}{'' if row['significant'] else ' (n.s.)'}")
     
     return impact_df
 
+def analyze_significance(df):
+    """Algoritmos comparados par a par em cada tipo de teste (Welch, Holm)"""
+    print("\n=== Significância entre Algoritmos ===\n")
+    
+    table = ranked(pairwise(df, 'algorithm', within='test_type'))
+    if table.empty:
+        print("Nenhum par de algoritmos com o mesmo tipo de teste")
+        return table
+    
+    print(format_table(table, context=True))
+    adopted = table[table['significant']]
+    print(f"\n{len(adopted)} de {len(table)} diferenças significativas (α = {ALPHA}, Holm)")
+    return table
+
 def create_visualizations(df, output_dir):
     """Cria gráficos comparativos"""
     output_dir = Path(output_dir)
@@ -312,17 +315,23 @@ def generate_report_data(df):
     }
     
     # Algoritmo mais estável (menor desvio padrão)
-    stability = df.groupby('algorithm')['throughput_mbps'].std()
+    stability = grouped_stats(df, 'algorithm', {'throughput_mbps': ('std',)})['throughput_mbps_std']
     most_stable = stability.idxmin()
     report['most_stable'] = most_stable
     
     return report
 
 def main():
+    parser = argparse.ArgumentParser(description="Análise completa dos resultados da Atividade 2")
+    parser.add_argument('timestamp', nargs='?', help="Bateria analisada (padrão: a mais recente)")
+    parser.add_argument('--all-batteries', action='store_true',
+                        help="Junta todas as baterias (só execuções com os mesmos parâmetros)")
+    args = parser.parse_args()
+    
     print("=== Análise Completa - Atividade 2 ===\n")
     
     # Carregar dados
-    df = load_results()
+    df = load_results(args.timestamp, args.all_batteries)
     
     if df.empty:
         print("Nenhum resultado encontrado!")
@@ -331,6 +340,7 @@ def main():
     # Análises
     algo_stats = analyze_algorithms(df)
     impact_stats = analyze_conditions(df)
+    significance = analyze_significance(df)
     
     # Visualizações
     output_dir = Path("/results/atv2/results/plots")
@@ -344,6 +354,8 @@ def main():
     algo_stats.to_csv(processed_dir / "algorithm_stats.csv")
     if not impact_stats.empty:
         impact_stats.to_csv(processed_dir / "impact_analysis.csv", index=False)
+    if not significance.empty:
+        significance.to_csv(processed_dir / "algorithm_significance.csv", index=False)
     
     # Gerar dados do relatório
     report_data = generate_report_data(df)
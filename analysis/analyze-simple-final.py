@@ -4,68 +4,23 @@
 Análise simplificada dos resultados - sem dependências externas
 """
 
-import json
 from pathlib import Path
 import statistics
 
+from catalog import load_catalog
+
 def load_results(timestamp="20250801_044307"):
     """Carrega todos os resultados"""
-    results_dir = Path("/results/atv2/results/raw")
-    data = []
+    catalog = load_catalog(Path("/results/atv2/results/raw"), timestamp)
     
-    for result_file in results_dir.glob(f"{timestamp}_*.json"):
-        if 'system_config' in str(result_file):
-            continue
-            
-        try:
-            with open(result_file, 'r') as f:
-                result = json.load(f)
-            
-            filename = result_file.stem
-            parts = filename.split('_')
-            
-            # Identificar teste
-            if 'baseline' in filename:
-                test_type = 'baseline'
-                algorithm = parts[2]
-                condition = 'none'
-            elif 'latency' in filename:
-                test_type = 'latency'
-                algorithm = parts[2]
-                condition = 'high'
-            elif 'band' in filename:
-                test_type = 'bandwidth'
-                algorithm = parts[2]
-                condition = '10mbps'
-            elif 'loss' in filename:
-                test_type = 'loss'
-                algorithm = parts[2]
-                condition = '0.5%'
-            elif 'streams' in filename:
-                test_type = 'streams'
-                algorithm = parts[2]
-                condition = 'multiple'
-            else:
-                continue
-            
-            # Extrair métricas
-            if 'end' in result and 'sum_sent' in result['end']:
-                throughput_bps = result['end']['sum_sent']['bits_per_second']
-                throughput_mbps = throughput_bps / 1e6
-                retransmits = result['end']['sum_sent'].get('retransmits', 0)
-                
-                data.append({
-                    'algorithm': algorithm,
-                    'test_type': test_type,
-                    'condition': condition,
-                    'throughput_mbps': throughput_mbps,
-                    'retransmits': retransmits
-                })
-                
-        except Exception as e:
-            print(f"Erro: {e}")
-    
-    return data
+    for failed in catalog.errors():
+        print(f"Erro: {failed['path']}: {failed['error']}")
+    
+    fields = ('algorithm', 'test_type', 'condition', 'throughput_mbps', 'retransmits')
+    return [
+        {field: record[field] for field in fields}
+        for record in catalog.query(test_type=('baseline', 'latency', 'bandwidth', 'loss', 'streams'))
+    ]
 
 def analyze_by_algorithm(data):
     """Agrupa e analisa por algoritmo"""
@@ -77,6 +32,7 @@ def analyze_by_algorithm(data):
             algorithms[algo] = {
                 'baseline': [],
                 'latency': [],
+                'bandwidth': [],
                 'loss': [],
                 'streams': [],
                 'all_throughputs': [],
@@ -5,39 +5,59 @@ Script de análise e visualização dos resultados dos testes de desempenho TCP
 Gera gráficos comparativos e identifica a configuração ótima
 """
 
+import argparse
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-from pathlib import Path
+import os
 import sys
+import time
+from contextlib import redirect_stdout
 from datetime import datetime
+from pathlib import Path
+
+# Partida para o orçamento do modo só de estatísticas (antes das importações pesadas)
+_STARTED = time.perf_counter()
+
+import pandas as pd
+import numpy as np
+
+from catalog import latest_timestamp
+from results_store import STORE_DIR, read_store, sync_store
+from intervals import load_intervals
+from downsample import plot_series
+from stats_engine import grouped_stats
+from bootstrap import bootstrap_ci, ci_errors
+from pareto import OBJECTIVES, best, format_table, pareto_table, parse_constraint, summarize_configurations
+from plotting import PackedFrame, check_stats_budget, load_plotting, render, style_signature
+from artifact_cache import ArtifactCache, default_cache_path
 
-# Configurações de estilo
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# matplotlib e seaborn só são importados ao gerar figuras (use_plotting)
+plt = sns = None
+
+def use_plotting():
+    """Importa as bibliotecas de gráficos e aplica o estilo"""
+    global plt, sns
+    plt, sns = load_plotting()
 
 def load_results(timestamp=None):
-    """Carrega os resultados processados do CSV"""
-    processed_dir = Path("/results/processed")
+    """Carrega os resultados do armazenamento colunar (só as colunas usadas)"""
+    raw_dir = Path("/results/raw")
     
-    if timestamp:
-        csv_file = processed_dir / f"{timestamp}_results.csv"
-    else:
-        # Pegar o arquivo mais recente
-        csv_files = list(processed_dir.glob("*_results.csv"))
-        if not csv_files:
+    if not timestamp:
+        # Pegar a bateria mais recente
+        timestamp = latest_timestamp(raw_dir)
+        if not timestamp:
             print("Nenhum arquivo de resultados encontrado!")
             sys.exit(1)
-        csv_file = max(csv_files, key=lambda x: x.stat().st_mtime)
     
-    print(f"Carregando resultados de: {csv_file}")
-    df = pd.read_csv(csv_file)
+    print(f"Carregando resultados de: {raw_dir} (timestamp {timestamp})")
+    sync_store(raw_dir, STORE_DIR, timestamp)
     
-    # Filtrar erros
-    df = df[df['throughput_mbps'] != 'ERROR']
-    df['throughput_mbps'] = pd.to_numeric(df['throughput_mbps'])
+    df = read_store(STORE_DIR, columns=['scenario', 'repetition', 'throughput_mbps', 'retransmits',
+                                        'cpu_sender', 'cpu_receiver', 'rtt_ms', 'sock_bufsize', 'num_streams',
+                                        'path'],
+                    timestamp=timestamp)
+    df = df.rename(columns={'scenario': 'test_name', 'sock_bufsize': 'window_size',
+                            'num_streams': 'streams'})
     
     return df
 
@@ -61,8 +81,11 @@ def plot_throughput_comparison(df, output_dir):
     """Gráfico comparativo de throughput por categoria"""
     fig, ax = plt.subplots(figsize=(12, 8))
     
-    # Agrupar por teste e calcular média e desvio padrão
-    summary = df.groupby(['category', 'test_name'])['throughput_mbps'].agg(['mean', 'std']).reset_index()
+    # Agrupar por teste: média e intervalo de confiança bootstrap (95%)
+    summary = bootstrap_ci(df, ['category', 'test_name'], columns=('throughput_mbps',), statistics=('mean',))
+    summary = summary.reset_index().rename(columns={'throughput_mbps_mean': 'mean',
+                                                    'throughput_mbps_mean_low': 'low',
+                                                    'throughput_mbps_mean_high': 'high'})
     
     # Plotar por categoria
     categories = summary['category'].unique()
@@ -74,7 +97,7 @@ def plot_throughput_comparison(df, output_dir):
         cat_data = summary[summary['category'] == cat]
         positions = range(x_pos, x_pos + len(cat_data))
         
-        ax.bar(positions, cat_data['mean'], yerr=cat_data['std'], 
+        ax.bar(positions, cat_data['mean'], yerr=ci_errors(cat_data['mean'], cat_data['low'], cat_data['high']), 
                capsize=5, alpha=0.7, label=cat.replace('_', ' ').title())
         
         x_ticks.extend(positions)
@@ -104,9 +127,12 @@ def plot_window_size_analysis(df, output_dir):
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
-    # Throughput vs Window Size
-    summary = window_data.groupby('window_kb')['throughput_mbps'].agg(['mean', 'std']).reset_index()
-    ax1.errorbar(summary['window_kb'], summary['mean'], yerr=summary['std'], 
+    summary = bootstrap_ci(window_data, 'window_kb', statistics=('mean',)).reset_index()
+    
+    # Throughput vs Window Size (barras: IC 95% bootstrap da média)
+    ax1.errorbar(summary['window_kb'], summary['throughput_mbps_mean'],
+                 yerr=ci_errors(summary['throughput_mbps_mean'], summary['throughput_mbps_mean_low'],
+                                summary['throughput_mbps_mean_high']),
                  marker='o', markersize=8, capsize=5, linewidth=2)
     ax1.set_xlabel('Tamanho da Janela TCP (KB)')
     ax1.set_ylabel('Throughput (Mbps)')
@@ -114,8 +140,7 @@ def plot_window_size_analysis(df, output_dir):
     ax1.grid(True, alpha=0.3)
     
     # Retransmissões vs Window Size
-    retrans = window_data.groupby('window_kb')['retransmits'].mean().reset_index()
-    ax2.bar(retrans['window_kb'], retrans['retransmits'], alpha=0.7, color='orange')
+    ax2.bar(summary['window_kb'], summary['retransmits_mean'], alpha=0.7, color='orange')
     ax2.set_xlabel('Tamanho da Janela TCP (KB)')
     ax2.set_ylabel('Retransmissões Médias')
     ax2.set_title('Retransmissões por Tamanho de Janela')
@@ -136,9 +161,16 @@ def plot_parallel_streams_analysis(df, output_dir):
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
-    # Throughput vs Streams
-    summary = streams_data.groupby('num_streams')['throughput_mbps'].agg(['mean', 'std']).reset_index()
-    ax1.errorbar(summary['num_streams'], summary['mean'], yerr=summary['std'], 
+    summary = grouped_stats(streams_data, 'num_streams', {
+        'cpu_sender': ('mean',),
+        'cpu_receiver': ('mean',),
+    }).join(bootstrap_ci(streams_data, 'num_streams', columns=('throughput_mbps',),
+                         statistics=('mean',)).drop(columns='samples')).reset_index()
+    
+    # Throughput vs Streams (barras: IC 95% bootstrap da média)
+    ax1.errorbar(summary['num_streams'], summary['throughput_mbps_mean'],
+                 yerr=ci_errors(summary['throughput_mbps_mean'], summary['throughput_mbps_mean_low'],
+                                summary['throughput_mbps_mean_high']),
                  marker='s', markersize=8, capsize=5, linewidth=2, color='green')
     ax1.set_xlabel('Número de Fluxos Paralelos')
     ax1.set_ylabel('Throughput (Mbps)')
@@ -147,23 +179,53 @@ def plot_parallel_streams_analysis(df, output_dir):
     ax1.grid(True, alpha=0.3)
     
     # CPU Usage vs Streams
-    cpu_data = streams_data.groupby('num_streams')[['cpu_sender', 'cpu_receiver']].mean().reset_index()
-    x = np.arange(len(cpu_data))
+    x = np.arange(len(summary))
     width = 0.35
     
-    ax2.bar(x - width/2, cpu_data['cpu_sender'], width, label='CPU Sender', alpha=0.7)
-    ax2.bar(x + width/2, cpu_data['cpu_receiver'], width, label='CPU Receiver', alpha=0.7)
+    ax2.bar(x - width/2, summary['cpu_sender_mean'], width, label='CPU Sender', alpha=0.7)
+    ax2.bar(x + width/2, summary['cpu_receiver_mean'], width, label='CPU Receiver', alpha=0.7)
     ax2.set_xlabel('Número de Fluxos Paralelos')
     ax2.set_ylabel('Uso de CPU (%)')
     ax2.set_title('Uso de CPU por Número de Fluxos')
     ax2.set_xticks(x)
-    ax2.set_xticklabels(cpu_data['num_streams'])
+    ax2.set_xticklabels(summary['num_streams'])
     ax2.legend()
     
     plt.tight_layout()
     plt.savefig(output_dir / 'parallel_streams_analysis.png', dpi=300)
     plt.close()
 
+def plot_interval_evolution(df, output_dir):
+    """Evolução por intervalo (throughput, cwnd e RTT) da primeira repetição de cada teste"""
+    first_runs = df.sort_values('repetition').drop_duplicates('test_name').sort_values('test_name')
+    
+    if first_runs.empty:
+        return
+    
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
+    
+    for _, row in first_runs.iterrows():
+        run = load_intervals(row['path'])
+        if run.num_intervals == 0:
+            continue
+        # Séries longas (soak) são reduzidas à largura do eixo, com a faixa mín/máx
+        plot_series(ax1, run.time, run.total('throughput_mbps'), linewidth=1, label=row['test_name'])
+        plot_series(ax2, run.time, run.mean('snd_cwnd') / 1024, linewidth=1)
+        plot_series(ax3, run.time, run.mean('rtt_ms'), linewidth=1)
+    
+    ax1.set_ylabel('Throughput (Mbps)')
+    ax1.set_title('Evolução por Intervalo (1ª repetição de cada teste)')
+    ax1.legend(bbox_to_anchor=(1.01, 1), loc='upper left', fontsize=8)
+    ax2.set_ylabel('cwnd médio (KB)')
+    ax3.set_ylabel('RTT médio (ms)')
+    ax3.set_xlabel('Tempo (s)')
+    for ax in (ax1, ax2, ax3):
+        ax.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(output_dir / 'interval_evolution.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
 def plot_congestion_control_comparison(df, output_dir):
     """Comparação entre algoritmos de controle de congestionamento"""
     cc_data = df[df['category'] == 'congestion_control'].copy()
@@ -198,11 +260,19 @@ def plot_network_conditions_impact(df, output_dir):
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     axes = axes.ravel()
     
+    # Médias por teste e por categoria em uma passada cada
+    by_test = grouped_stats(df, ['category', 'test_name'], {'throughput_mbps': ('mean',)})
+    by_category = grouped_stats(df, 'category', {'throughput_mbps': ('mean',)})['throughput_mbps_mean']
+    
+    def category_summary(category):
+        if category not in by_test.index.get_level_values('category'):
+            return None
+        return by_test.loc[category].reset_index()
+    
     # 1. Impacto da latência
-    latency_data = df[df['category'] == 'network_latency']
-    if not latency_data.empty:
-        lat_summary = latency_data.groupby('test_name')['throughput_mbps'].mean().reset_index()
-        axes[0].bar(range(len(lat_summary)), lat_summary['throughput_mbps'], alpha=0.7)
+    lat_summary = category_summary('network_latency')
+    if lat_summary is not None:
+        axes[0].bar(range(len(lat_summary)), lat_summary['throughput_mbps_mean'], alpha=0.7)
         axes[0].set_xticks(range(len(lat_summary)))
         axes[0].set_xticklabels([x.replace('latency_', '') for x in lat_summary['test_name']])
         axes[0].set_xlabel('Latência Adicionada')
@@ -210,10 +280,9 @@ def plot_network_conditions_impact(df, output_dir):
         axes[0].set_title('Impacto da Latência')
     
     # 2. Impacto da limitação de banda
-    bw_data = df[df['category'] == 'bandwidth_limit']
-    if not bw_data.empty:
-        bw_summary = bw_data.groupby('test_name')['throughput_mbps'].mean().reset_index()
-        axes[1].bar(range(len(bw_summary)), bw_summary['throughput_mbps'], alpha=0.7, color='orange')
+    bw_summary = category_summary('bandwidth_limit')
+    if bw_summary is not None:
+        axes[1].bar(range(len(bw_summary)), bw_summary['throughput_mbps_mean'], alpha=0.7, color='orange')
         axes[1].set_xticks(range(len(bw_summary)))
         axes[1].set_xticklabels([x.replace('bandwidth_', '') for x in bw_summary['test_name']])
         axes[1].set_xlabel('Limite de Banda')
@@ -221,10 +290,9 @@ def plot_network_conditions_impact(df, output_dir):
         axes[1].set_title('Impacto da Limitação de Banda')
     
     # 3. Impacto da perda de pacotes
-    loss_data = df[df['category'] == 'packet_loss']
-    if not loss_data.empty:
-        loss_summary = loss_data.groupby('test_name')['throughput_mbps'].mean().reset_index()
-        axes[2].bar(range(len(loss_summary)), loss_summary['throughput_mbps'], alpha=0.7, color='red')
+    loss_summary = category_summary('packet_loss')
+    if loss_summary is not None:
+        axes[2].bar(range(len(loss_summary)), loss_summary['throughput_mbps_mean'], alpha=0.7, color='red')
         axes[2].set_xticks(range(len(loss_summary)))
         axes[2].set_xticklabels([x.replace('packet_loss_', '') for x in loss_summary['test_name']])
         axes[2].set_xlabel('Perda de Pacotes')
@@ -232,13 +300,8 @@ def plot_network_conditions_impact(df, output_dir):
         axes[2].set_title('Impacto da Perda de Pacotes')
     
     # 4. Comparação geral
-    baseline_throughput = df[df['category'] == 'baseline']['throughput_mbps'].mean()
     categories = ['baseline', 'network_latency', 'bandwidth_limit', 'packet_loss']
-    avg_throughputs = []
-    
-    for cat in categories:
-        cat_data = df[df['category'] == cat]
-        avg_throughputs.append(cat_data['throughput_mbps'].mean() if not cat_data.empty else 0)
+    avg_throughputs = [by_category.get(cat, 0) for cat in categories]
     
     axes[3].bar(categories, avg_throughputs, alpha=0.7, color='green')
     axes[3].set_xlabel('Categoria')
@@ -250,59 +313,61 @@ def plot_network_conditions_impact(df, output_dir):
     plt.savefig(output_dir / 'network_conditions_impact.png', dpi=300)
     plt.close()
 
-def identify_optimal_configuration(df):
-    """Identifica a configuração ótima baseada em múltiplas métricas"""
-    # Calcular score composto
-    summary = df.groupby('test_name').agg({
-        'throughput_mbps': 'mean',
-        'retransmits': 'mean',
-        'cpu_sender': 'mean',
-        'cpu_receiver': 'mean',
-        'rtt_ms': 'mean'
-    }).reset_index()
-    
-    # Normalizar métricas (0-1)
-    from sklearn.preprocessing import MinMaxScaler
-    scaler = MinMaxScaler()
-    
-    # Métricas onde maior é melhor
-    summary['throughput_norm'] = scaler.fit_transform(summary[['throughput_mbps']])
-    
-    # Métricas onde menor é melhor (inverter)
-    if summary['retransmits'].max() > 0:
-        summary['retransmits_norm'] = 1 - scaler.fit_transform(summary[['retransmits']])
-    else:
-        summary['retransmits_norm'] = 1
-    
-    summary['cpu_norm'] = 1 - scaler.fit_transform(summary[['cpu_sender']])
-    
-    if summary['rtt_ms'].max() > 0:
-        summary['rtt_norm'] = 1 - scaler.fit_transform(summary[['rtt_ms']])
-    else:
-        summary['rtt_norm'] = 1
-    
-    # Score composto (pesos podem ser ajustados)
-    weights = {
-        'throughput': 0.5,
-        'retransmits': 0.2,
-        'cpu': 0.2,
-        'rtt': 0.1
+def identify_optimal_configuration(df, constraints=()):
+    """Fronteira de Pareto das configurações (throughput, retransmissões, CPU, RTT)
+
+    Retorna a configuração da fronteira com maior throughput (None se as
+    restrições eliminarem todas) e a tabela completa, com a frente de cada
+    configuração e quem domina as demais.
+    """
+    summary = summarize_configurations(df, 'test_name')
+    table = pareto_table(summary, constraints=constraints)
+    return best(table), table
+
+def compute_statistics(df, constraints=()):
+    """Estatísticas sem gráficos: resumo por teste e fronteira de Pareto
+
+    Retorna um dicionário serializável em JSON com o resumo de cada teste
+    (throughput com intervalo de confiança bootstrap de 95%), a tabela da
+    fronteira de Pareto e a configuração ótima.
+    """
+    df = categorize_tests(df)
+    summary = grouped_stats(df, ['category', 'test_name'], {
+        'throughput_mbps': ('mean', 'std', 'cv'),
+        'retransmits': ('mean',),
+        'cpu_sender': ('mean',),
+        'rtt_ms': ('mean',),
+    })
+    ci = bootstrap_ci(df, ['category', 'test_name'], columns=('throughput_mbps',), statistics=('mean',))
+    summary['throughput_mbps_mean_low'] = ci['throughput_mbps_mean_low'].to_numpy()
+    summary['throughput_mbps_mean_high'] = ci['throughput_mbps_mean_high'].to_numpy()
+
+    optimal, table = identify_optimal_configuration(df, constraints)
+    return {
+        'constraints': list(constraints),
+        'samples': len(df),
+        'tests': json.loads(summary.reset_index().to_json(orient='records')),
+        'pareto': json.loads(table.to_json(orient='records')),
+        'optimal': None if optimal is None else optimal['test_name'],
     }
-    
-    summary['score'] = (
-        weights['throughput'] * summary['throughput_norm'] +
-        weights['retransmits'] * summary['retransmits_norm'] +
-        weights['cpu'] * summary['cpu_norm'] +
-        weights['rtt'] * summary['rtt_norm']
-    )
-    
-    # Encontrar configuração ótima
-    optimal = summary.loc[summary['score'].idxmax()]
-    
-    return optimal, summary
 
-def generate_report_figures(df, output_dir):
-    """Gera todas as figuras para o relatório"""
+def print_statistics(stats):
+    """Resumo das estatísticas em texto"""
+    print(f"{'teste':<36} {'n':>3} {'throughput (Mbps)':>18} {'IC 95%':>21} {'CV %':>6}")
+    for test in stats['tests']:
+        print(f"{test['test_name']:<36} {test['samples']:>3} {test['throughput_mbps_mean']:>18.2f} "
+              f"{test['throughput_mbps_mean_low']:>10.2f}-{test['throughput_mbps_mean_high']:<10.2f} "
+              f"{test['throughput_mbps_cv']:>6.1f}")
+    print()
+    print(format_table(pd.DataFrame(stats['pareto'])))
+    print(f"\nConfiguração ótima: {stats['optimal'] or 'nenhuma satisfaz as restrições'}")
+
+def generate_report_figures(df, output_dir, constraints=(), workers=1, rebuild=False):
+    """Gera todas as figuras para o relatório (em `workers` processos)
+
+    Só as figuras cujos dados, código ou estilo mudaram são renderizadas de
+    novo, a menos que `rebuild` seja verdadeiro.
+    """
     print("Gerando visualizações...")
     
     # Criar diretório de saída
@@ -312,44 +377,102 @@ def generate_report_figures(df, output_dir):
     # Categorizar testes
     df = categorize_tests(df)
     
-    # Gerar gráficos
-    plot_throughput_comparison(df, output_dir)
-    plot_window_size_analysis(df, output_dir)
-    plot_parallel_streams_analysis(df, output_dir)
-    plot_congestion_control_comparison(df, output_dir)
-    plot_network_conditions_impact(df, output_dir)
-    
-    # Identificar configuração ótima
-    optimal, scores = identify_optimal_configuration(df)
+    # Gerar gráficos: trabalhos independentes, com os dados só como arrays
+    data = PackedFrame(df)
+    jobs = [(plot, (data, output_dir), [output_dir / name]) for plot, name in (
+        (plot_interval_evolution, 'interval_evolution.png'),
+        (plot_network_conditions_impact, 'network_conditions_impact.png'),
+        (plot_throughput_comparison, 'throughput_comparison.png'),
+        (plot_window_size_analysis, 'window_size_analysis.png'),
+        (plot_parallel_streams_analysis, 'parallel_streams_analysis.png'),
+        (plot_congestion_control_comparison, 'congestion_control_comparison.png'),
+    )]
+    cache = ArtifactCache(default_cache_path(output_dir))
+    rendered = render(jobs, workers, initializer=use_plotting, cache=cache, style=style_signature(),
+                      rebuild=rebuild)
+    cache.save()
+    print(f"Figuras: {len(rendered)} renderizadas, {len(jobs) - len(rendered)} do cache")
+    
+    # Identificar configuração ótima (fronteira de Pareto)
+    optimal, table = identify_optimal_configuration(df, constraints)
     
     # Salvar análise da configuração ótima
     with open(output_dir / 'optimal_configuration.txt', 'w') as f:
         f.write("=== CONFIGURAÇÃO ÓTIMA IDENTIFICADA ===\n\n")
-        f.write(f"Teste: {optimal['test_name']}\n")
-        f.write(f"Throughput médio: {optimal['throughput_mbps']:.2f} Mbps\n")
-        f.write(f"Retransmissões médias: {optimal['retransmits']:.0f}\n")
-        f.write(f"CPU Sender: {optimal['cpu_sender']:.2f}%\n")
-        f.write(f"RTT médio: {optimal['rtt_ms']:.2f} ms\n")
-        f.write(f"Score composto: {optimal['score']:.3f}\n\n")
+        if constraints:
+            f.write(f"Restrições: {', '.join(constraints)}\n\n")
+        if optimal is None:
+            f.write("Nenhuma configuração satisfaz as restrições\n\n")
+        else:
+            f.write(f"Teste: {optimal['test_name']}\n")
+            f.write(f"Throughput médio: {optimal['throughput_mbps']:.2f} Mbps\n")
+            f.write(f"Retransmissões médias: {optimal['retransmits']:.0f}\n")
+            f.write(f"CPU Sender: {optimal['cpu_sender']:.2f}%\n")
+            f.write(f"RTT médio: {optimal['rtt_ms']:.2f} ms\n")
+            f.write("(maior throughput entre as configurações não dominadas)\n\n")
         
-        f.write("=== TOP 5 CONFIGURAÇÕES ===\n")
-        top5 = scores.nlargest(5, 'score')[['test_name', 'throughput_mbps', 'score']]
-        f.write(top5.to_string(index=False))
+        f.write("=== FRONTEIRA DE PARETO E CONFIGURAÇÕES DOMINADAS ===\n")
+        f.write(format_table(table))
+        f.write("\n")
     
+    frontier = (table['front'] == 1).sum()
     print(f"Visualizações salvas em: {output_dir}")
-    print(f"Configuração ótima: {optimal['test_name']} (Score: {optimal['score']:.3f})")
+    if optimal is None:
+        print("Nenhuma configuração satisfaz as restrições")
+    else:
+        print(f"Configuração ótima: {optimal['test_name']} "
+              f"({frontier} na fronteira de Pareto, {table['dominated'].sum()} dominadas)")
 
 def main():
     """Função principal"""
-    # Verificar argumentos
-    timestamp = sys.argv[1] if len(sys.argv) > 1 else None
+    parser = argparse.ArgumentParser(description="Análise e visualização dos testes de desempenho TCP")
+    parser.add_argument('timestamp', nargs='?', help="Bateria analisada (padrão: a mais recente)")
+    parser.add_argument('--constraint', '-c', action='append', default=[],
+                        help="Restrição da configuração ótima, ex.: 'cpu_sender<50' ou 'retransmits=0'")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos de renderização das figuras (padrão: todos os núcleos)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Renderiza todas as figuras, mesmo as que não mudaram")
+    parser.add_argument('--stats-only', action='store_true',
+                        help="Só estatísticas, sem gráficos (não importa matplotlib/seaborn)")
+    parser.add_argument('--json', action='store_true',
+                        help="Estatísticas em JSON na saída padrão (implica --stats-only)")
+    args = parser.parse_args()
+    # Restrições só sobre as métricas da tabela de configurações
+    constrained = []
+    for constraint in args.constraint:
+        try:
+            column, _, _ = parse_constraint(constraint)
+        except ValueError as e:
+            parser.error(str(e))
+        if column not in OBJECTIVES:
+            parser.error(f"Coluna desconhecida na restrição: {column} (use {', '.join(OBJECTIVES)})")
+        constrained.append(column)
+
+    def check_columns(df):
+        """Erro de uso se uma métrica restrita não existe nos resultados"""
+        missing = [column for column in constrained if column not in df.columns]
+        if missing:
+            parser.error(f"Métrica sem dados nos resultados: {', '.join(missing)}")
+        return df
+    
+    if args.stats_only or args.json:
+        # Com --json, as mensagens de progresso vão para o stderr
+        with redirect_stdout(sys.stderr if args.json else sys.stdout):
+            stats = compute_statistics(check_columns(load_results(args.timestamp)), args.constraint)
+        if args.json:
+            print(json.dumps(stats, indent=2, ensure_ascii=False))
+        else:
+            print_statistics(stats)
+        check_stats_budget(_STARTED)
+        return
     
     # Carregar dados
-    df = load_results(timestamp)
+    df = check_columns(load_results(args.timestamp))
     
     # Gerar análises
     output_dir = Path("/results/plots")
-    generate_report_figures(df, output_dir)
+    generate_report_figures(df, output_dir, args.constraint, args.workers, args.rebuild)
     
     print("\nAnálise concluída com sucesso!")
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""
+Cache endereçado por conteúdo das figuras e tabelas do relatório
+Cada artefato (PNG ou Markdown) é identificado por uma chave: o hash dos
+dados que a função recebe (colunas, tipos e valores), do código-fonte do
+módulo que a define e dos módulos locais que ele importa (os mesmos de
+pipeline.local_modules) e dos parâmetros de estilo (estilo, paleta,
+rcParams e versões do matplotlib/seaborn). Se a chave não mudou e as saídas
+continuam no disco com o mesmo tamanho e mtime, o artefato não é gerado de
+novo. Alterar um gráfico ou uma função auxiliar invalida as figuras do
+script que os usa.
+
+O manifesto fica em <pai do diretório de saída>/cache/artifact_manifest.json
+(por exemplo /results/cache para /results/plots) e é gravado de forma
+atômica. Os JSONs brutos são imutáveis (nomeados por timestamp), então as
+funções que os leem entram na chave pelos caminhos.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from pipeline import local_modules
+
+# Incrementar quando a forma de calcular as chaves mudar
+CACHE_VERSION = 2
+
+MANIFEST_NAME = "artifact_manifest.json"
+
+def default_cache_path(output_dir):
+    """Manifesto padrão para os artefatos de um diretório de saída"""
+    return Path(output_dir).resolve().parent / "cache" / MANIFEST_NAME
+
+def _update(h, value):
+    """Acrescenta um valor ao hash, com marcação de tipo"""
+    if hasattr(value, 'columns') and isinstance(value.columns, dict):
+        # PackedFrame (plotting): colunas já como arrays
+        value = value.columns
+    elif hasattr(value, 'to_numpy') and hasattr(value, 'columns'):
+        # DataFrame: nomes, tipos e valores de cada coluna
+        value = {str(column): value[column].to_numpy() for column in value.columns}
+
+    if isinstance(value, np.ndarray):
+        h.update(f"array:{value.dtype}:{value.shape}".encode())
+        if value.dtype == object:
+            h.update('\x1f'.join(map(repr, value.ravel())).encode())
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(f"dict:{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}:{len(value)}".encode())
+        for item in value:
+            _update(h, item)
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+    h.update(b'\x1e')
+
+@lru_cache(maxsize=None)
+def _source_digest(module_file):
+    """Hash do código do módulo e dos módulos locais que ele importa"""
+    h = hashlib.blake2b(digest_size=16)
+    for path in local_modules(module_file):
+        h.update(f"{path.name}:".encode())
+        h.update(path.read_bytes())
+    return h.digest()
+
+def artifact_key(function, args, style=None):
+    """Chave de um artefato: dados, código do módulo (com importações locais) e estilo"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_VERSION}:{function.__module__}.{function.__qualname__}".encode())
+    try:
+        h.update(_source_digest(Path(inspect.getsourcefile(function)).resolve()))
+    except (OSError, TypeError):
+        h.update(function.__code__.co_code)
+    _update(h, list(args))
+    _update(h, style or {})
+    return h.hexdigest()
+
+def _stat(path):
+    """(tamanho, mtime_ns) de uma saída, ou None se não existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+class ArtifactCache:
+    """Manifesto {saída: chave, tamanho, mtime} dos artefatos gerados"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == CACHE_VERSION:
+            self.entries = data.get('artifacts', {})
+
+    def fresh(self, key, outputs):
+        """Se todas as saídas foram geradas com `key` e não mudaram desde então
+
+        Saídas que a função não gerou (ex.: gráfico sem dados) contam como
+        atualizadas se também não foram geradas da última vez.
+        """
+        if not outputs:
+            self.misses += 1
+            return False
+        for output in outputs:
+            entry = self.entries.get(str(output))
+            if not entry or entry['key'] != key or entry['stat'] != _stat(output):
+                self.misses += 1
+                return False
+        self.hits += 1
+        return True
+
+    def record(self, key, outputs):
+        """Registra as saídas geradas (ou não) com `key`"""
+        for output in outputs:
+            self.entries[str(output)] = {'key': key, 'stat': _stat(output)}
+        self._dirty = True
+
+    def build(self, function, args, outputs, style=None, rebuild=False):
+        """Executa function(*args) só se o artefato estiver desatualizado
+
+        Com `rebuild`, executa sempre (e atualiza o manifesto). Retorna se a
+        função foi executada.
+        """
+        key = artifact_key(function, args, style)
+        if not rebuild and self.fresh(key, outputs):
+            return False
+        function(*args)
+        self.record(key, outputs)
+        return True
+
+    def save(self):
+        """Grava o manifesto se houve alteração (falha de escrita não é fatal)"""
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'artifacts': self.entries}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o cache de artefatos {self.path}: {e}",
+                  file=sys.stderr)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
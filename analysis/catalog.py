@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+"""
+Catálogo indexado dos resultados do iperf3
+Cada execução é lida uma única vez e indexada por timestamp, cenário,
+algoritmo, tipo de teste, condição e repetição. Todos os scripts de análise
+consultam este índice em vez de varrer diretórios com heurísticas próprias.
+
+Usa apenas a biblioteca padrão (pandas só é importado em `dataframe`).
+"""
+
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import manifest
+from ingest_cache import IngestCache, default_cache_path
+from iperf_stream import read_summary
+
+# <timestamp>_<cenário>_rep<n>.json
+RUN_NAME_RE = re.compile(r'^(\d{8}_\d{6})_(.+)_rep(\d+)$')
+
+KNOWN_ALGORITHMS = (
+    'cubic', 'reno', 'bbr', 'vegas', 'westwood', 'illinois', 'htcp',
+    'dctcp', 'hybla', 'bic', 'highspeed', 'scalable', 'veno', 'yeah',
+)
+
+# Palavra-chave no nome do teste -> tipo de teste (a ordem define a prioridade)
+TEST_TYPES = (
+    ('baseline', 'baseline'),
+    ('combined', 'combined'),
+    ('latency', 'latency'),
+    ('band', 'bandwidth'),
+    ('loss', 'loss'),
+    ('streams', 'streams'),
+    ('window', 'window'),
+)
+
+INDEX_FIELDS = ('timestamp', 'scenario', 'algorithm', 'test_type', 'condition', 'repetition')
+
+def parse_run_name(stem):
+    """Separa timestamp, cenário e repetição do nome de um arquivo de resultado"""
+    match = RUN_NAME_RE.match(stem)
+    if not match:
+        return None
+    return {
+        'timestamp': match.group(1),
+        'scenario': match.group(2),
+        'repetition': int(match.group(3)),
+    }
+
+def classify(scenario):
+    """Deriva (algoritmo, tipo de teste, condição) do nome do cenário
+
+    O algoritmo é o primeiro token conhecido do nome (None se não houver).
+    A condição é o token que identificou o tipo de teste, por exemplo
+    'latency50ms' ou 'band10mbps'; em nomes como 'latency_50ms' o valor do
+    token seguinte é incluído ('latency_50ms').
+    """
+    tokens = scenario.lower().split('_')
+    algorithm = next((t for t in tokens if t in KNOWN_ALGORITHMS), None)
+
+    for keyword, test_type in TEST_TYPES:
+        for i, token in enumerate(tokens):
+            if keyword not in token:
+                continue
+            if test_type == 'baseline':
+                return algorithm, test_type, 'none'
+            if token == keyword and i + 1 < len(tokens):
+                return algorithm, test_type, f"{token}_{tokens[i + 1]}"
+            return algorithm, test_type, token
+
+    return algorithm, None, None
+
+def extract_metrics(summary):
+    """Extrai as métricas principais de `start`/`end` de um resultado"""
+    start = summary.get('start', {})
+    end = summary.get('end', {})
+    sum_sent = end.get('sum_sent', {})
+    cpu = end.get('cpu_utilization_percent', {})
+    streams = end.get('streams', [])
+
+    # RTT médio dos fluxos emissores (iperf3 reporta em µs)
+    rtts = [s['sender']['mean_rtt'] for s in streams if 'mean_rtt' in s.get('sender', {})]
+
+    return {
+        'throughput_mbps': sum_sent.get('bits_per_second', 0) / 1e6,
+        'retransmits': sum_sent.get('retransmits', 0),
+        'cpu_sender': cpu.get('host_total', 0),
+        'cpu_receiver': cpu.get('remote_total', 0),
+        'rtt_ms': sum(rtts) / len(rtts) / 1000 if rtts else 0,
+        'num_streams': len(streams),
+        'congestion': end.get('sender_tcp_congestion'),
+        'sock_bufsize': start.get('sock_bufsize', 0),
+        'duration': start.get('test_start', {}).get('duration'),
+    }
+
+def _base_record(path):
+    """Registro sem métricas (campos derivados do nome), ou None"""
+    record = parse_run_name(path.stem)
+    if record is None:
+        return None
+
+    algorithm, test_type, condition = classify(record['scenario'])
+    record.update({
+        'path': str(path),
+        'algorithm': algorithm,
+        'test_type': test_type,
+        'condition': condition,
+        'error': None,
+    })
+    return record
+
+def failed_record(path, error):
+    """Registro de uma execução com falha conhecida, sem abrir o arquivo"""
+    record = _base_record(Path(path))
+    if record is not None:
+        record['error'] = error
+    return record
+
+def load_record(path):
+    """Lê um arquivo de resultado e retorna o registro do catálogo
+
+    Retorna None para arquivos fora do padrão de nomes das baterias. Execuções
+    com falha (mensagem de erro do iperf3 ou sem `end.sum_sent`) são mantidas
+    com o campo `error` preenchido e sem métricas.
+    """
+    path = Path(path)
+    record = _base_record(path)
+    if record is None:
+        return None
+
+    try:
+        summary = read_summary(path)
+    except Exception as e:
+        record['error'] = str(e)
+        return record
+
+    if 'error' in summary:
+        record['error'] = summary['error']
+    elif 'sum_sent' not in summary.get('end', {}):
+        record['error'] = "resultado sem end.sum_sent"
+    else:
+        record.update(extract_metrics(summary))
+        if record['algorithm'] is None:
+            record['algorithm'] = record['congestion']
+
+    return record
+
+class Catalog:
+    """Conjunto de execuções com índices invertidos pelos campos de INDEX_FIELDS"""
+
+    def __init__(self, records):
+        self.records = list(records)
+        # (registros vindos do cache, arquivos lidos), quando há cache
+        self.cache_stats = None
+        self._index = {field: defaultdict(list) for field in INDEX_FIELDS}
+        for i, record in enumerate(self.records):
+            for field in INDEX_FIELDS:
+                self._index[field][record.get(field)].append(i)
+
+    def __len__(self):
+        return len(self.records)
+
+    def values(self, field, include_errors=False):
+        """Valores distintos de um campo indexado, em ordem"""
+        return sorted(
+            value for value, ids in self._index[field].items()
+            if value is not None and (include_errors or any(self.records[i]['error'] is None for i in ids))
+        )
+
+    def timestamps(self):
+        return self.values('timestamp')
+
+    def latest_timestamp(self):
+        timestamps = self.timestamps()
+        return timestamps[-1] if timestamps else None
+
+    def query(self, include_errors=False, **criteria):
+        """Retorna os registros que atendem aos critérios
+
+        Cada critério é um campo de INDEX_FIELDS com um valor ou uma coleção
+        de valores aceitos, por exemplo query(timestamp='20250801_044307',
+        test_type=('latency', 'loss')). O resultado mantém a ordem do catálogo.
+        """
+        selected = None
+        for field, wanted in criteria.items():
+            if field not in self._index:
+                raise ValueError(f"Campo não indexado: {field}")
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                ids = set()
+                for value in wanted:
+                    ids.update(self._index[field].get(value, ()))
+            else:
+                ids = set(self._index[field].get(wanted, ()))
+            selected = ids if selected is None else selected & ids
+
+        if selected is None:
+            selected = range(len(self.records))
+
+        return [
+            self.records[i] for i in sorted(selected)
+            if include_errors or self.records[i]['error'] is None
+        ]
+
+    def errors(self, **criteria):
+        """Registros com falha que atendem aos critérios"""
+        return [r for r in self.query(include_errors=True, **criteria) if r['error']]
+
+    def dataframe(self, columns=None, include_errors=False, **criteria):
+        """Resultado de `query` como DataFrame do pandas"""
+        import pandas as pd
+
+        df = pd.DataFrame(self.query(include_errors=include_errors, **criteria))
+        if columns is not None:
+            df = df.reindex(columns=list(columns))
+        return df
+
+def build_catalog(paths, cache=None, failures=None):
+    """Cria um catálogo a partir de uma lista de arquivos
+
+    Com `cache` (IngestCache), apenas arquivos novos ou com tamanho/mtime
+    diferentes dos do cache são lidos. `failures` mapeia caminhos de
+    execuções que sabidamente falharam para a mensagem de erro; esses
+    arquivos não são abertos.
+    """
+    failures = failures or {}
+    records = []
+    for path in sorted(Path(p) for p in paths):
+        if parse_run_name(path.stem) is None:
+            continue
+        if str(path) in failures:
+            record = failed_record(path, failures[str(path)])
+        elif not path.exists():
+            record = failed_record(path, "arquivo de saída ausente")
+        elif cache is None:
+            record = load_record(path)
+        else:
+            stat = path.stat()
+            record = cache.get(path, stat)
+            if record is None:
+                record = load_record(path)
+                cache.put(path, stat, record)
+        if record is not None:
+            records.append(record)
+    return Catalog(records)
+
+def latest_timestamp(raw_dir):
+    """Timestamp mais recente de um diretório
+
+    O mais novo entre o ponteiro `latest` do manifesto e o maior timestamp
+    nos nomes dos arquivos: uma bateria gravada por um script sem manifesto
+    não fica escondida atrás de um ponteiro antigo.
+    """
+    parsed = (parse_run_name(p.stem) for p in Path(raw_dir).glob('*.json'))
+    candidates = [r['timestamp'] for r in parsed if r]
+    pointer = manifest.latest(raw_dir)
+    if pointer:
+        candidates.append(pointer)
+    # YYYYMMDD_HHMMSS: a ordem das strings é a ordem cronológica
+    return max(candidates, default=None)
+
+_catalogs = {}
+
+def load_catalog(raw_dir, timestamp=None, use_cache=True):
+    """Catálogo dos JSONs de um diretório, construído uma vez por processo
+
+    Com `timestamp`, apenas os arquivos daquela bateria são considerados;
+    se a bateria tem manifesto (manifest.py), os arquivos vêm dele, sem
+    listar o diretório, e as execuções com status de saída diferente de zero
+    não são abertas. Os registros já extraídos em execuções anteriores vêm
+    do cache de ingestão (ver ingest_cache.py); `use_cache=False` força a
+    releitura.
+    """
+    key = (Path(raw_dir).resolve(), timestamp)
+    if key not in _catalogs:
+        pattern = f"{timestamp}_*.json" if timestamp else '*.json'
+        cache = IngestCache(default_cache_path(key[0])) if use_cache else None
+        entries = manifest.read_manifest(key[0], timestamp) if timestamp else None
+        if entries is not None:
+            paths = [entry['output'] for entry in entries]
+            failures = {e['output']: manifest.failure(e) for e in entries if manifest.failure(e)}
+        else:
+            paths, failures = key[0].glob(pattern), None
+        _catalogs[key] = build_catalog(paths, cache, failures)
+        if cache is not None:
+            if entries is None:
+                cache.prune(key[0], pattern)
+            cache.save()
+            _catalogs[key].cache_stats = (cache.hits, cache.misses)
+    return _catalogs[key]
+
+def main():
+    """Lista as execuções de um diretório agrupadas pelo índice"""
+    args = [a for a in sys.argv[1:] if a != '--no-cache']
+    raw_dir = Path(args[0]) if args else Path("/results/raw")
+    catalog = load_catalog(raw_dir, use_cache='--no-cache' not in sys.argv[1:])
+
+    failed = len(catalog.query(include_errors=True)) - len(catalog.query())
+    print(f"Catálogo de {raw_dir}: {len(catalog)} execuções ({failed} com erro)")
+    if catalog.cache_stats:
+        hits, misses = catalog.cache_stats
+        print(f"  cache: {hits} reaproveitados, {misses} lidos")
+    for field in INDEX_FIELDS:
+        print(f"  {field}: {', '.join(str(v) for v in catalog.values(field))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Painel HTML estático e offline das execuções
+Gera um único arquivo HTML, sem servidor nem rede, com os dados das
+execuções embutidos como arrays tipados compactos (base64 de buffers
+little-endian):
+- parâmetros e métricas de cada execução do índice (run_index), com as
+  colunas categóricas codificadas por dicionário (Uint16) e as numéricas em
+  Float32 (NaN para ausentes);
+- séries por intervalo de throughput, cwnd e RTT (do interval_store),
+  reduzidas por LTTB a POINTS pontos e quantizadas em Uint16 com escala por
+  execução, cerca de 5 KB por execução, o que mantém meses de baterias em
+  poucas dezenas de MB.
+
+No navegador, as execuções são filtradas por algoritmo, janela, fluxos,
+condição de rede e bateria; os agregados por grupo (n, média, desvio,
+mediana, CV) são recalculados a cada filtro, e as séries do grupo escolhido
+aparecem em um gráfico com zoom (arrastar, roda do mouse, duplo clique
+volta ao todo). O modelo da página fica em dashboard_template.html.
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from downsample import finite_points, lttb
+from interval_store import end_times, open_run, store_path, sync
+from run_index import query_runs, sync_index
+
+TEMPLATE = Path(__file__).resolve().parent / "dashboard_template.html"
+
+# Colunas categóricas (dicionário + códigos) e numéricas das execuções
+CATEGORIES = ('timestamp', 'scenario', 'algorithm', 'test_type', 'condition')
+NUMERIC = ('repetition', 'window_kb', 'streams', 'latency_ms', 'bandwidth_mbit', 'loss_pct',
+           'throughput_mbps', 'retransmits', 'cpu_sender', 'cpu_receiver', 'rtt_ms')
+
+# Filtros oferecidos na página (coluna -> rótulo)
+FILTERS = {
+    'algorithm': 'Algoritmo',
+    'window_kb': 'Janela (KB)',
+    'streams': 'Fluxos',
+    'condition': 'Condição de rede',
+    'timestamp': 'Bateria',
+}
+
+# Séries por intervalo (campo -> rótulo)
+SERIES = {
+    'throughput_mbps': 'Throughput (Mbps)',
+    'snd_cwnd': 'cwnd médio (KB)',
+    'rtt_ms': 'RTT médio (ms)',
+}
+
+# Pontos por série e execução depois do LTTB
+POINTS = 400
+
+QUANT_MAX = np.iinfo(np.uint16).max
+
+def _encode(array, dtype):
+    """Array como base64 dos bytes little-endian em `dtype`"""
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+def encode_runs(runs):
+    """Colunas das execuções: categóricas como dicionário + códigos, numéricas em Float32"""
+    columns = {}
+    for column in CATEGORIES:
+        values = np.array(['' if run[column] is None else str(run[column]) for run in runs], dtype=object)
+        dictionary, codes = np.unique(values, return_inverse=True) if len(values) else ([], [])
+        columns[column] = {'dictionary': list(dictionary), 'codes': _encode(codes, '<u2')}
+    for column in NUMERIC:
+        values = np.array([np.nan if run[column] is None else run[column] for run in runs], dtype=np.float64)
+        columns[column] = {'values': _encode(values, '<f4')}
+    return columns
+
+def interval_series(npy_path):
+    """Tempo e séries {campo: valores} de um arquivo do interval_store"""
+    run = open_run(npy_path)
+    # Sem intervalos ou com intervalos sem fluxos
+    if run.size == 0:
+        return None
+    with warnings.catch_warnings():
+        # Intervalos sem RTT em nenhum fluxo resultam em NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        series = {
+            'throughput_mbps': run['throughput_mbps'].sum(axis=1, dtype=np.float64),
+            'snd_cwnd': run['snd_cwnd'].mean(axis=1) / 1024,
+            'rtt_ms': np.nanmean(run['rtt_ms'], axis=1),
+        }
+    return end_times(run), series
+
+def _quantize(values, low, span):
+    """Valores em [low, low + span] como Uint16"""
+    if span <= 0:
+        return np.zeros(len(values), dtype=np.uint16)
+    return np.rint((values - low) / span * QUANT_MAX).astype(np.uint16)
+
+def encode_series(runs, intervals_dir, points=POINTS):
+    """Séries de cada execução reduzidas por LTTB e quantizadas
+
+    Por campo: `offsets` (Uint32, n + 1), tempo e valor concatenados
+    (Uint16) e `scale` (Float32, n × 4: t_min, t_span, y_min, y_span).
+    Execuções sem intervalos convertidos ficam com série vazia.
+    """
+    parts = {field: {'offsets': [0], 't': [], 'y': [], 'scale': []} for field in SERIES}
+    for run in runs:
+        loaded = None
+        npy_path = store_path(run['path'], intervals_dir)
+        if npy_path.exists():
+            try:
+                loaded = interval_series(npy_path)
+            except (OSError, ValueError):
+                loaded = None
+
+        for field, part in parts.items():
+            t, y = (np.empty(0), np.empty(0)) if loaded is None else finite_points(loaded[0], loaded[1][field])
+            selected = lttb(t, y, points)
+            t, y = t[selected], y[selected]
+            t_min, y_min = (float(t.min()), float(y.min())) if len(t) else (0.0, 0.0)
+            t_span, y_span = (float(t.max()) - t_min, float(y.max()) - y_min) if len(t) else (0.0, 0.0)
+            part['t'].append(_quantize(t, t_min, t_span))
+            part['y'].append(_quantize(y, y_min, y_span))
+            part['scale'] += [t_min, t_span, y_min, y_span]
+            part['offsets'].append(part['offsets'][-1] + len(t))
+
+    encoded = {}
+    for field, part in parts.items():
+        encoded[field] = {
+            'label': SERIES[field],
+            'offsets': _encode(part['offsets'], '<u4'),
+            't': _encode(np.concatenate(part['t']) if part['t'] else [], '<u2'),
+            'y': _encode(np.concatenate(part['y']) if part['y'] else [], '<u2'),
+            'scale': _encode(part['scale'], '<f4'),
+        }
+    return encoded
+
+def build_dashboard(raw_dir, output, intervals_dir=None, scenarios_dir=None, points=POINTS, workers=1):
+    """Gera o painel HTML de todas as execuções válidas de `raw_dir`
+
+    Retorna o número de execuções embutidas.
+    """
+    raw_dir = Path(raw_dir)
+    intervals_dir = Path(intervals_dir) if intervals_dir else raw_dir.parent / "intervals"
+
+    db = sync_index(raw_dir, scenarios_dir=scenarios_dir)
+    runs = query_runs(db, columns=['path'] + list(CATEGORIES) + list(NUMERIC))
+    runs.sort(key=lambda run: (run['timestamp'] or '', run['scenario'] or '', run['repetition'] or 0))
+
+    # Só os JSONs novos ou alterados são convertidos
+    for json_path, _, error in sync(raw_dir, intervals_dir, workers=workers):
+        if error:
+            print(f"Aviso: intervalos não convertidos de {json_path}: {error}", file=sys.stderr)
+
+    data = {
+        'generated': time.strftime('%Y-%m-%d %H:%M'),
+        'source': str(raw_dir),
+        'count': len(runs),
+        'filters': FILTERS,
+        'columns': encode_runs(runs),
+        'series': encode_series(runs, intervals_dir, points),
+    }
+    # "</" fechariam o <script> que contém o JSON
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    tmp.write_text(TEMPLATE.read_text().replace('__DATA__', payload), encoding='utf-8')
+    os.replace(tmp, output)
+    return len(runs)
+
+def main():
+    """Gera o painel HTML offline de um diretório de resultados"""
+    parser = argparse.ArgumentParser(description="Painel HTML estático e offline das execuções")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--output', '-o', type=Path,
+                        help="Arquivo HTML (padrão: <pai do raw_dir>/dashboard.html)")
+    parser.add_argument('--intervals-dir', type=Path,
+                        help="Intervalos convertidos (padrão: <pai do raw_dir>/intervals)")
+    parser.add_argument('--scenarios-dir', type=Path, help="Configurações dos cenários (Atividade 2)")
+    parser.add_argument('--points', type=int, default=POINTS,
+                        help=f"Pontos por série e execução (padrão: {POINTS})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos da conversão dos intervalos (padrão: núcleos disponíveis)")
+    args = parser.parse_args()
+
+    output = args.output or args.raw_dir.parent / "dashboard.html"
+    start = time.perf_counter()
+    count = build_dashboard(args.raw_dir, output, args.intervals_dir, args.scenarios_dir,
+                            args.points, args.workers)
+    if not count:
+        print(f"Nenhuma execução válida em {args.raw_dir}")
+        sys.exit(1)
+    print(f"Painel com {count} execuções em {output} ({output.stat().st_size / 1e6:.1f} MB, "
+          f"{time.perf_counter() - start:.2f}s)")
+
+if __name__ == "__main__":
+    main()
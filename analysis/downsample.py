@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""
+Redução de séries temporais longas à largura em pixels da figura
+Em testes de longa duração (soak), as séries por intervalo de throughput,
+cwnd e RTT chegam a milhões de pontos por figura, mas um eixo de 14
+polegadas a 300 dpi tem poucos milhares de colunas de pixels. Antes de
+desenhar, cada série é reduzida a um ponto por coluna:
+- a linha usa Largest-Triangle-Three-Buckets (Steinarsson, 2013), que
+  escolhe em cada balde o ponto que forma o maior triângulo com o ponto
+  escolhido no balde anterior e a média do seguinte, preservando a forma;
+- uma faixa com o mínimo e o máximo de cada balde (envelope) mantém picos e
+  travamentos visíveis mesmo quando a linha não passa por eles.
+
+Séries que já cabem na largura são desenhadas sem alteração. Médias dos
+baldes e envelopes são calculados de uma vez com somas acumuladas e
+reduceat; só a escolha do LTTB, que depende do balde anterior, percorre os
+baldes. Não importa matplotlib: plot_series() recebe o eixo pronto.
+"""
+
+import numpy as np
+
+# Resolução dos savefig das figuras do relatório
+DPI = 300
+# Opacidade da faixa mínimo/máximo
+ENVELOPE_ALPHA = 0.2
+
+def finite_points(x, y):
+    """x e y como float64, sem os pontos com NaN ou infinito"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    return (x, y) if keep.all() else (x[keep], y[keep])
+
+def _edges(start, end, buckets):
+    """Limites de `buckets` baldes contíguos e não vazios em [start, end)"""
+    return np.linspace(start, end, buckets + 1).astype(np.int64)
+
+def lttb(x, y, threshold):
+    """Índices dos `threshold` pontos escolhidos pelo LTTB (x crescente)
+
+    O primeiro e o último ponto são mantidos; os demais são divididos em
+    threshold - 2 baldes. Com threshold >= len(x), retorna todos.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = _edges(1, n - 1, threshold - 2)
+    counts = np.diff(edges)
+    # Média de cada balde pelas somas acumuladas; o último balde usa o ponto final
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    mean_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])
+    mean_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for k in range(threshold - 2):
+        lo, hi = edges[k], edges[k + 1]
+        ax, ay = x[a], y[a]
+        nx, ny = mean_x[k + 1], mean_y[k + 1]
+        # Dobro da área do triângulo (a, candidato, média do próximo balde)
+        area = np.abs((ax - nx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (ny - ay))
+        a = lo + int(np.argmax(area))
+        selected[k + 1] = a
+    return selected
+
+def envelope(x, y, buckets):
+    """Centro, mínimo e máximo de cada um de `buckets` baldes da série"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = min(buckets, len(x))
+    starts = _edges(0, len(x), buckets)[:-1]
+    ends = np.append(starts[1:], len(x)) - 1
+    return ((x[starts] + x[ends]) / 2, np.minimum.reduceat(y, starts),
+            np.maximum.reduceat(y, starts))
+
+def downsample(x, y, width):
+    """Série reduzida a `width` pontos: (x, y) do LTTB e (x, mín, máx) do envelope
+
+    O envelope é None quando a série já cabe na largura.
+    """
+    x, y = finite_points(x, y)
+    if len(x) <= width:
+        return (x, y), None
+    selected = lttb(x, y, width)
+    return (x[selected], y[selected]), envelope(x, y, width)
+
+def pixel_width(ax, dpi=DPI):
+    """Colunas de pixels ocupadas pelo eixo na figura salva com `dpi`"""
+    return max(3, int(ax.get_position().width * ax.figure.get_figwidth() * dpi))
+
+def plot_series(ax, x, y, dpi=DPI, alpha=ENVELOPE_ALPHA, **kwargs):
+    """ax.plot() de uma série reduzida à largura do eixo, com a faixa mín/máx
+
+    Séries que cabem na largura são desenhadas como estão (a figura não
+    muda). Os argumentos extras vão para ax.plot(). Retorna a linha.
+    """
+    if len(x) <= pixel_width(ax, dpi):
+        return ax.plot(x, y, **kwargs)[0]
+
+    (line_x, line_y), bands = downsample(x, y, pixel_width(ax, dpi))
+    line = ax.plot(line_x, line_y, **kwargs)[0]
+    if bands is not None:
+        ax.fill_between(*bands, color=line.get_color(), alpha=alpha, linewidth=0)
+    return line
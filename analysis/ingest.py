@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+"""
+Ingestão paralela dos resultados do iperf3
+Lê os JSONs de um timestamp em um pool de processos (apenas os que não estão
+no cache de ingestão), grava as partições do armazenamento colunar, atualiza
+o índice SQLite das execuções e gera o resumo e a tabela Markdown do timestamp
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bootstrap import bootstrap_ci
+from catalog import failed_record, latest_timestamp, load_record
+from ingest_cache import IngestCache, default_cache_path
+from manifest import failure, read_manifest, read_stopping
+from results_store import STORE_DIR, read_store, write_partitions
+from run_index import connect, default_index_path, index_records
+from stats_engine import grouped_stats
+
+RAW_DIR = Path("/results/raw")
+PROCESSED_DIR = Path("/results/processed")
+
+# Motivos de parada das repetições adaptativas (scripts/adaptive.sh)
+STOP_REASONS = {
+    'ci': "IC atingiu o alvo",
+    'failed': "nenhuma execução válida",
+    'max': "limite de repetições",
+}
+
+def ingest(json_files, workers, cache=None):
+    """Extrai os registros em paralelo preservando a ordem de entrada
+
+    Com `cache`, apenas os arquivos novos ou modificados vão para o pool.
+    Retorna (registros, quantidade de arquivos lidos).
+    """
+    records = [None] * len(json_files)
+    pending = []
+    for i, json_file in enumerate(json_files):
+        stat = json_file.stat()
+        cached = cache.get(json_file, stat) if cache is not None else None
+        if cached is not None:
+            records[i] = cached
+        else:
+            pending.append((i, json_file, stat))
+
+    if pending:
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = executor.map(load_record, [p for _, p, _ in pending], chunksize=chunksize)
+            for (i, json_file, stat), record in zip(pending, parsed):
+                records[i] = record
+                if cache is not None and record is not None:
+                    cache.put(json_file, stat, record)
+
+    return [r for r in records if r is not None], len(pending)
+
+def load_frame(store_dir, timestamp, columns):
+    """Execuções válidas do timestamp lidas do armazenamento colunar"""
+    df = read_store(store_dir, columns=['scenario'] + columns, timestamp=timestamp)
+    return df.rename(columns={'scenario': 'test_name'})
+
+def write_summary(store_dir, summary_file, timestamp, stopping=None):
+    """Gera o resumo estatístico a partir do armazenamento
+
+    `stopping` são as decisões das repetições adaptativas (read_stopping).
+    """
+    df = load_frame(store_dir, timestamp, ['throughput_mbps', 'retransmits', 'cpu_sender',
+                                           'cpu_receiver', 'rtt_ms'])
+
+    # Agrupar por teste e calcular estatísticas
+    summary = grouped_stats(df, 'test_name', {
+        'throughput_mbps': ('mean', 'std', 'min', 'max', 'p95', 'cv'),
+        'retransmits': ('mean', 'sum'),
+        'cpu_sender': ('mean',),
+        'cpu_receiver': ('mean',),
+        'rtt_ms': ('mean',),
+    }).round(2)
+
+    with open(summary_file, 'w') as f:
+        f.write("=== RESUMO DOS TESTES DE DESEMPENHO TCP ===\n")
+        f.write(f"Timestamp: {timestamp}\n")
+        f.write(f"Total de testes: {len(df)}\n\n")
+        f.write(summary.to_string())
+
+        # Identificar melhor configuração
+        f.write("\n\n=== MELHOR CONFIGURAÇÃO ===\n")
+        means = summary['throughput_mbps_mean']
+        f.write(f"Teste: {means.idxmax()}\n")
+        f.write(f"Throughput médio: {means.max():.2f} Mbps\n")
+
+        if stopping:
+            f.write("\n=== REPETIÇÕES ADAPTATIVAS ===\n")
+            for test_name, decision in sorted(stopping.items()):
+                half_width = decision['half_width_pct']
+                interval = f"±{half_width:.2f}%" if half_width is not None else "indefinido"
+                reason = STOP_REASONS.get(decision['reason'], "limite de repetições")
+                f.write(f"{test_name}: {decision['repetitions']} repetições, IC 95% {interval} "
+                        f"(alvo ±{decision['target_pct']}%) - {reason}\n")
+            f.write(f"Total de repetições: {sum(d['repetitions'] for d in stopping.values())}\n")
+
+    print(f"Resumo salvo em: {summary_file}")
+
+def write_table(store_dir, table_file, timestamp):
+    """Gera a tabela Markdown resumida para o relatório"""
+    df = load_frame(store_dir, timestamp, ['throughput_mbps', 'retransmits', 'cpu_sender', 'rtt_ms'])
+
+    summary = grouped_stats(df, 'test_name', {
+        'throughput_mbps': ('mean',),
+        'retransmits': ('mean',),
+        'cpu_sender': ('mean',),
+        'rtt_ms': ('mean',),
+    }).drop(columns='samples').round(2)
+    ci = bootstrap_ci(df, 'test_name', columns=('throughput_mbps',), statistics=('mean',))
+    summary.insert(1, 'ci', [f"[{low:.2f}, {high:.2f}]" for low, high in
+                             zip(ci['throughput_mbps_mean_low'], ci['throughput_mbps_mean_high'])])
+
+    summary = summary.reset_index()
+    summary.columns = ['Cenário', 'Throughput (Mbps)', 'IC 95% (Mbps)', 'Retransmissões',
+                       'CPU Sender (%)', 'RTT (ms)']
+
+    with open(table_file, 'w') as f:
+        f.write("## Tabela de Resultados dos Testes\n\n")
+        f.write(summary.to_markdown(index=False))
+        f.write("\n")
+
+    print(f"Tabela salva em: {table_file}")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Ingestão paralela dos JSONs do iperf3")
+    parser.add_argument('timestamp', nargs='?', help="Timestamp da bateria (padrão: mais recente)")
+    parser.add_argument('--raw-dir', type=Path, default=RAW_DIR)
+    parser.add_argument('--processed-dir', type=Path, default=PROCESSED_DIR)
+    parser.add_argument('--store-dir', type=Path, default=STORE_DIR,
+                        help="Armazenamento colunar particionado (padrão: /results/store)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Número de processos do pool (padrão: núcleos disponíveis)")
+    args = parser.parse_args()
+    # Caminhos absolutos e sem links, como no sync_index (evita linhas duplicadas no índice)
+    args.raw_dir = args.raw_dir.resolve()
+
+    timestamp = args.timestamp or latest_timestamp(args.raw_dir)
+    if not timestamp:
+        print(f"Nenhum resultado encontrado em {args.raw_dir}!")
+        sys.exit(1)
+
+    args.processed_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Processando arquivos do timestamp: {timestamp}")
+
+    # Com manifesto, os arquivos vêm dele e as execuções com falha não são abertas
+    entries = read_manifest(args.raw_dir, timestamp)
+    if entries is not None:
+        failed = [failed_record(e['output'], failure(e)) for e in entries if failure(e)]
+        outputs = [Path(e['output']) for e in entries if not failure(e)]
+        failed += [failed_record(p, "arquivo de saída ausente") for p in outputs if not p.exists()]
+        json_files = sorted(p for p in outputs if p.exists())
+    else:
+        failed = []
+        json_files = sorted(args.raw_dir.glob(f"{timestamp}_*.json"))
+    cache = IngestCache(default_cache_path(args.raw_dir))
+
+    start = time.perf_counter()
+    records, parsed = ingest(json_files, args.workers, cache)
+    elapsed = time.perf_counter() - start
+    cache.save()
+
+    records = sorted(records + [r for r in failed if r is not None], key=lambda r: r['path'])
+
+    for record in records:
+        if record['error']:
+            print(f"Erro ao processar {record['path']}: {record['error']}", file=sys.stderr)
+
+    rate = parsed / elapsed if elapsed > 0 else 0
+    print(f"Processados {len(json_files)} arquivos em {elapsed:.2f}s "
+          f"({parsed} lidos, {rate:.0f} arquivos/s, {args.workers} processos)")
+
+    write_partitions(records, args.store_dir)
+    index_records(connect(default_index_path(args.raw_dir)), records)
+
+    write_summary(args.store_dir, args.processed_dir / f"{timestamp}_summary.txt", timestamp,
+                  read_stopping(args.raw_dir, timestamp))
+    write_table(args.store_dir, args.processed_dir / f"{timestamp}_table.md", timestamp)
+
+    print(f"Partições salvas em: {args.store_dir / f'timestamp={timestamp}'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Cache persistente da ingestão dos resultados do iperf3
+Guarda, para cada JSON já lido, o registro extraído pelo catálogo junto com
+o tamanho e o mtime do arquivo. Nas execuções seguintes apenas arquivos novos
+ou modificados são lidos novamente; o restante vem do manifesto.
+
+O manifesto fica em <diretório dos resultados>/../cache/ingest_manifest.json
+(por exemplo /results/cache para /results/raw) e é gravado de forma atômica.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Incrementar quando o formato dos registros do catálogo mudar
+CACHE_VERSION = 1
+
+MANIFEST_NAME = "ingest_manifest.json"
+
+def default_cache_path(raw_dir):
+    """Manifesto padrão de um diretório de resultados brutos"""
+    return Path(raw_dir).resolve().parent / "cache" / MANIFEST_NAME
+
+class IngestCache:
+    """Manifesto {caminho: (tamanho, mtime_ns, registro)} de um diretório"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == CACHE_VERSION:
+            self.entries = data.get('files', {})
+
+    def get(self, path, stat):
+        """Registro em cache de `path`, ou None se o arquivo mudou ou é novo"""
+        entry = self.entries.get(str(path))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            self.hits += 1
+            return entry['record']
+        self.misses += 1
+        return None
+
+    def put(self, path, stat, record):
+        self.entries[str(path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'record': record,
+        }
+        self._dirty = True
+
+    def prune(self, directory, pattern='*.json'):
+        """Remove entradas de arquivos de `directory` que não existem mais"""
+        directory = Path(directory)
+        existing = {str(p) for p in directory.glob(pattern)}
+        stale = [
+            key for key in self.entries
+            if Path(key).parent == directory and Path(key).match(pattern) and key not in existing
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+
+    def save(self):
+        """Grava o manifesto se houve alteração (falha de escrita não é fatal)"""
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'files': self.entries}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o cache de ingestão {self.path}: {e}",
+                  file=sys.stderr)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+Armazenamento binário dos intervalos do iperf3 (memory-mapped)
+Cada JSON é convertido uma única vez em um arquivo .npy com registros de
+tamanho fixo, forma (intervalo, fluxo). Os leitores abrem o arquivo com
+np.load(mmap_mode='r'): fatiar por fluxo ou por janela de tempo devolve
+visões sobre o mapeamento, sem cópia e sem carregar o arquivo na memória,
+o que permite analisar testes de horas com -P 128 dentro dos 4 GB do
+container tcp-analyzer.
+
+A conversão é feita em blocos: a memória usada não depende da duração
+do teste.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from catalog import parse_run_name
+from iperf_stream import parse
+
+STORE_DIR = Path("/results/intervals")
+
+# Registro por (intervalo, fluxo), sem alinhamento: 31 bytes
+RECORD = np.dtype([
+    ('end', '<f8'),               # fim do intervalo (s desde o início do teste)
+    ('throughput_mbps', '<f4'),
+    ('snd_cwnd', '<u4'),          # bytes
+    ('rtt_ms', '<f4'),
+    ('rttvar_ms', '<f4'),
+    ('retransmits', '<u4'),
+    ('pmtu', '<u2'),
+    ('omitted', 'u1'),
+])
+
+# Cabeçalho .npy de tamanho fixo, reescrito com a forma final ao término
+HEADER_SIZE = 256
+# Registros acumulados antes de cada escrita (limita a memória da conversão)
+BATCH_RECORDS = 1 << 16
+
+def store_path(json_path, store_dir=STORE_DIR):
+    return Path(store_dir) / f"{Path(json_path).stem}.npy"
+
+def _header(shape):
+    """Cabeçalho .npy versão 1.0 ocupando exatamente HEADER_SIZE bytes"""
+    fields = {
+        'descr': np.lib.format.dtype_to_descr(RECORD),
+        'fortran_order': False,
+        'shape': shape,
+    }
+    text = repr(fields)
+    body = HEADER_SIZE - 10
+    if len(text) >= body:
+        raise ValueError("Cabeçalho .npy excede o espaço reservado")
+    return b'\x93NUMPY\x01\x00' + body.to_bytes(2, 'little') + (text.ljust(body - 1) + '\n').encode('latin1')
+
+def _record(stream, omitted):
+    return (
+        stream.get('end', np.nan),
+        stream.get('bits_per_second', 0) / 1e6,
+        stream.get('snd_cwnd', 0),
+        stream.get('rtt', np.nan) / 1000,
+        stream.get('rttvar', np.nan) / 1000,
+        stream.get('retransmits', 0),
+        stream.get('pmtu', 0),
+        omitted,
+    )
+
+def convert(json_path, out_path):
+    """Converte os intervalos de um JSON em um arquivo .npy (intervalo, fluxo)
+
+    Escreve em um arquivo temporário e o renomeia ao final, de modo que
+    leitores nunca veem um arquivo parcial. Retorna a forma gravada.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+
+    state = {'intervals': 0, 'streams': None}
+    batch = []
+
+    with open(tmp, 'wb') as f:
+        f.write(b'\0' * HEADER_SIZE)
+
+        def flush():
+            if batch:
+                np.array(batch, dtype=RECORD).tofile(f)
+                batch.clear()
+
+        def collect(interval):
+            streams = interval['streams']
+            if state['streams'] is None:
+                state['streams'] = len(streams)
+            elif len(streams) != state['streams']:
+                raise ValueError(f"Número de fluxos varia entre intervalos: {json_path}")
+            omitted = interval.get('sum', {}).get('omitted', False)
+            batch.extend(_record(s, omitted) for s in streams)
+            state['intervals'] += 1
+            if len(batch) >= BATCH_RECORDS:
+                flush()
+
+        try:
+            parse(json_path, keys=(), on_interval=collect)
+            flush()
+            shape = (state['intervals'], state['streams'] or 0)
+            f.seek(0)
+            f.write(_header(shape))
+        except BaseException:
+            f.close()
+            tmp.unlink()
+            raise
+
+    os.replace(tmp, out_path)
+    return shape
+
+def open_run(path):
+    """Abre um arquivo do armazenamento como memmap (intervalo, fluxo)"""
+    return np.load(path, mmap_mode='r')
+
+def end_times(run):
+    """Fim de cada intervalo (do primeiro fluxo); vazio se a execução não tem fluxos"""
+    if run.ndim < 2 or run.shape[1] == 0:
+        return np.empty(0, dtype=np.float64)
+    return np.asarray(run['end'][:, 0], dtype=np.float64)
+
+def time_window(run, start, end):
+    """Visão dos intervalos com fim em [start, end) (sem cópia)"""
+    if run.size == 0:
+        return run[:0]
+    ends = end_times(run)
+    first, last = np.searchsorted(ends, [start, end], side='left')
+    return run[first:last]
+
+def stream(run, index):
+    """Visão de um fluxo ao longo do tempo (sem cópia)"""
+    return run[:, index]
+
+def _convert_job(job):
+    json_path, out_path = job
+    try:
+        return str(json_path), convert(json_path, out_path), None
+    except Exception as e:
+        return str(json_path), None, str(e)
+
+def sync(raw_dir, store_dir=STORE_DIR, pattern='*.json', workers=1):
+    """Converte os JSONs novos ou modificados de `raw_dir`
+
+    Retorna a lista de (json, forma, erro) dos arquivos convertidos agora.
+    """
+    jobs = []
+    for json_path in sorted(Path(raw_dir).glob(pattern)):
+        if parse_run_name(json_path.stem) is None:
+            continue
+        out_path = store_path(json_path, store_dir)
+        if out_path.exists() and out_path.stat().st_mtime_ns >= json_path.stat().st_mtime_ns:
+            continue
+        jobs.append((json_path, out_path))
+
+    if workers <= 1 or len(jobs) <= 1:
+        return [_convert_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_convert_job, jobs))
+
+def main():
+    """Converte um diretório ou mostra um resumo de um arquivo convertido"""
+    parser = argparse.ArgumentParser(description="Armazenamento memory-mapped dos intervalos do iperf3")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sync_cmd = commands.add_parser('sync', help="Converte os JSONs novos ou modificados")
+    sync_cmd.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    sync_cmd.add_argument('--store-dir', type=Path, default=STORE_DIR)
+    sync_cmd.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    show_cmd = commands.add_parser('show', help="Resumo de um arquivo convertido")
+    show_cmd.add_argument('path', type=Path)
+    show_cmd.add_argument('--stream', type=int, help="Somente este fluxo")
+    show_cmd.add_argument('--start', type=float, default=0.0, help="Início da janela (s)")
+    show_cmd.add_argument('--end', type=float, default=np.inf, help="Fim da janela (s)")
+
+    args = parser.parse_args()
+
+    if args.command == 'sync':
+        results = sync(args.raw_dir, args.store_dir, workers=args.workers)
+        for json_path, shape, error in results:
+            if error:
+                print(f"Erro ao converter {json_path}: {error}", file=sys.stderr)
+        converted = sum(1 for _, _, error in results if not error)
+        print(f"{converted} arquivo(s) convertido(s) em {args.store_dir}")
+        return
+
+    run = time_window(open_run(args.path), args.start, args.end)
+    if args.stream is not None:
+        run = stream(run, args.stream)[:, None]
+
+    print(f"{args.path}: {run.shape[0]} intervalo(s) x {run.shape[1]} fluxo(s) "
+          f"({run.nbytes / 1e6:.1f} MB mapeados)")
+    if run.size:
+        print(f"  throughput total médio: {run['throughput_mbps'].sum(axis=1).mean():.2f} Mbps")
+        print(f"  cwnd médio: {run['snd_cwnd'].mean() / 1024:.1f} KB")
+        print(f"  RTT médio: {np.nanmean(run['rtt_ms']):.3f} ms")
+        print(f"  retransmissões: {run['retransmits'].sum(dtype=np.int64)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+Séries temporais por intervalo dos resultados do iperf3
+Converte `intervals[].streams[]` (throughput, snd_cwnd, RTT, rttvar,
+retransmissões e PMTU a cada relatório) em arrays NumPy com eixos
+execução × fluxo × tempo, para que gráficos e estatísticas vejam a convergência,
+travamentos e o dente de serra do controle de congestionamento em vez de
+apenas a média do teste.
+
+Os intervalos são lidos com o parser incremental (iperf_stream), um de cada
+vez, e empilhados em um único array por execução.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from iperf_stream import parse
+
+# Campo exposto -> (chave em intervals[].streams[], fator de conversão)
+SOURCES = {
+    'throughput_mbps': ('bits_per_second', 1e-6),
+    'snd_cwnd': ('snd_cwnd', 1),          # bytes
+    'rtt_ms': ('rtt', 1e-3),              # iperf3 reporta em µs
+    'rttvar_ms': ('rttvar', 1e-3),
+    'retransmits': ('retransmits', 1),
+    'pmtu': ('pmtu', 1),
+}
+
+FIELDS = tuple(SOURCES)
+
+_KEYS = tuple(key for key, _ in SOURCES.values())
+_SCALE = np.array([scale for _, scale in SOURCES.values()], dtype=np.float64)
+
+class RunIntervals:
+    """Intervalos de uma execução: `data` tem forma (campo, fluxo, tempo)"""
+
+    def __init__(self, path, time, omitted, data):
+        self.path = str(path)
+        self.time = time
+        self.omitted = omitted
+        self.data = data
+
+    @property
+    def num_streams(self):
+        return self.data.shape[1]
+
+    @property
+    def num_intervals(self):
+        return self.data.shape[2]
+
+    def __getitem__(self, field):
+        """Array (fluxo, tempo) de um campo (visão, sem cópia)"""
+        return self.data[FIELDS.index(field)]
+
+    def total(self, field='throughput_mbps'):
+        """Soma entre fluxos a cada intervalo"""
+        return np.nansum(self[field], axis=0)
+
+    def mean(self, field):
+        """Média entre fluxos a cada intervalo"""
+        return np.nanmean(self[field], axis=0)
+
+class IntervalSet:
+    """Execuções empilhadas: `data` tem forma (campo, execução, fluxo, tempo)
+
+    Execuções com menos fluxos ou intervalos são completadas com NaN;
+    `time` é o eixo da execução mais longa.
+    """
+
+    def __init__(self, runs, records=None):
+        self.paths = [run.path for run in runs]
+        self.records = records
+        streams = max((run.num_streams for run in runs), default=0)
+        longest = max(runs, key=lambda run: run.num_intervals, default=None)
+        steps = longest.num_intervals if longest else 0
+
+        self.time = longest.time if longest else np.empty(0)
+        self.omitted = np.ones((len(runs), steps), dtype=bool)
+        self.data = np.full((len(FIELDS), len(runs), streams, steps), np.nan)
+        for i, run in enumerate(runs):
+            self.data[:, i, :run.num_streams, :run.num_intervals] = run.data
+            self.omitted[i, :run.num_intervals] = run.omitted
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, field):
+        """Array (execução, fluxo, tempo) de um campo (visão, sem cópia)"""
+        return self.data[FIELDS.index(field)]
+
+    def total(self, field='throughput_mbps'):
+        """Soma entre fluxos: (execução, tempo); NaN onde a execução terminou"""
+        values = self[field]
+        summed = np.nansum(values, axis=1)
+        summed[np.isnan(values).all(axis=1)] = np.nan
+        return summed
+
+    def mean(self, field):
+        """Média entre fluxos: (execução, tempo)"""
+        with np.errstate(invalid='ignore'):
+            return np.nanmean(self[field], axis=1)
+
+def load_intervals(path):
+    """Extrai os intervalos de um JSON do iperf3 em um RunIntervals"""
+    rows = []
+    times = []
+    omitted = []
+
+    def collect(interval):
+        streams = interval['streams']
+        rows.append([s.get(key, np.nan) for s in streams for key in _KEYS])
+        summary = interval.get('sum', streams[0] if streams else {})
+        times.append(summary.get('end', np.nan))
+        omitted.append(summary.get('omitted', False))
+
+    parse(path, keys=(), on_interval=collect)
+
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError(f"Número de fluxos varia entre intervalos: {path}")
+
+    width = len(rows[0]) // len(FIELDS) if rows else 0
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), width, len(FIELDS))
+    # (tempo, fluxo, campo) -> (campo, fluxo, tempo), já nas unidades de FIELDS
+    data = np.ascontiguousarray(values.transpose(2, 1, 0)) * _SCALE[:, None, None]
+
+    return RunIntervals(path, np.array(times, dtype=np.float64),
+                        np.array(omitted, dtype=bool), data)
+
+def stack_runs(paths):
+    """Empilha os intervalos de várias execuções em um IntervalSet"""
+    return IntervalSet([load_intervals(p) for p in paths])
+
+def load_catalog_intervals(catalog, **criteria):
+    """Intervalos das execuções válidas do catálogo que atendem aos critérios"""
+    records = catalog.query(**criteria)
+    return IntervalSet([load_intervals(r['path']) for r in records], records)
+
+def main():
+    """Mostra a evolução por intervalo de um arquivo"""
+    if len(sys.argv) < 2:
+        print("Uso: intervals.py <arquivo.json>")
+        sys.exit(1)
+
+    run = load_intervals(Path(sys.argv[1]))
+    print(f"{run.path}: {run.num_streams} fluxo(s), {run.num_intervals} intervalo(s)")
+    print(f"{'t (s)':>8} {'Mbps':>12} {'cwnd (KB)':>12} {'RTT (ms)':>10} {'retrans':>8}")
+
+    throughput = run.total('throughput_mbps')
+    cwnd = run.mean('snd_cwnd') / 1024
+    rtt = run.mean('rtt_ms')
+    retransmits = run.total('retransmits')
+    for i in range(run.num_intervals):
+        mark = ' (omitido)' if run.omitted[i] else ''
+        print(f"{run.time[i]:>8.2f} {throughput[i]:>12.2f} {cwnd[i]:>12.1f} "
+              f"{rtt[i]:>10.3f} {retransmits[i]:>8.0f}{mark}")
+
+if __name__ == "__main__":
+    main()
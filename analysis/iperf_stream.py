@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+"""
+Parser incremental para a saída JSON do iperf3
+Extrai `start`/`end` sem materializar o array `intervals`, que em testes longos
+(-t 3600 -P 64) contém centenas de milhares de registros. Também permite
+consumir os intervalos um a um com memória limitada.
+
+Usa apenas a biblioteca padrão para poder rodar também no container cliente.
+"""
+
+import json
+import re
+import sys
+
+CHUNK_SIZE = 1 << 20
+
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Tabela que mantém apenas aspas e delimitadores de contêiner
+_STRUCTURAL = {c: None for c in range(128) if chr(c) not in '"[]{}'}
+_BRACKET = re.compile(r'[\[\]{}]')
+# Par de delimitadores sem nenhum outro contêiner dentro (strings já removidas)
+_INNER_PAIR = re.compile(r'\{[^\[\]{}]*\}|\[[^\[\]{}]*\]')
+# Strings completas ou delimitadores de contêiner
+_SKIP_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+_WHITESPACE = re.compile(r'\s*')
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffer de leitura sobre um arquivo texto, recarregado sob demanda"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Lê mais um bloco, descartando a parte já consumida do buffer"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Retorna o próximo caractere não branco sem consumi-lo"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSON inválido: esperado {chars!r}, encontrado {char!r}")
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """Decodifica o próximo valor completo, recarregando o buffer se necessário"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # Um número no fim do buffer pode estar truncado
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        """Pula o próximo valor sem construir objetos Python
+
+        Para contêineres, as strings e os pares de colchetes/chaves internos
+        são removidos por expressões regulares (em C); só os delimitadores
+        restantes são percorridos em Python, de modo que o custo por bloco
+        não depende do número de intervalos.
+        """
+        if self.peek() not in '[{':
+            self.decode()
+            return
+
+        self.pos += 1
+        depth = 1
+        final = False
+        while True:
+            # JSON não admite quebra de linha crua dentro de strings: cortando
+            # o bloco na última quebra de linha nenhuma string fica pela metade
+            newline = -1 if final else self.buf.rfind('\n', self.pos)
+            if newline >= 0:
+                body = self.buf[self.pos:newline]
+                consumed = newline - self.pos
+                if '\\' not in body:
+                    # Sem escapes, as strings viram pares de aspas vazios
+                    body = body.translate(_STRUCTURAL).replace('""', '')
+                body = _STRING.sub('', body)
+            else:
+                segment = self.buf[self.pos:]
+                body = _STRING.sub('', segment)
+                quote = body.find('"')
+                if quote >= 0:
+                    # String incompleta no fim do buffer: só consumir até ela
+                    consumed = len(segment) - (len(body) - quote)
+                    body = body[:quote]
+                else:
+                    consumed = len(segment)
+
+            removed = 1
+            while removed:
+                body, removed = _INNER_PAIR.subn('', body)
+
+            level = depth
+            for match in _BRACKET.finditer(body):
+                level += 1 if match.group() in '[{' else -1
+                if level == 0:
+                    break
+
+            if level == 0:
+                self._close(depth)
+                return
+
+            depth = level
+            self.pos += consumed
+            if not self.fill():
+                if final:
+                    raise ValueError("JSON inválido: fim de arquivo inesperado")
+                final = True
+
+    def _close(self, depth):
+        """Avança até o delimitador que fecha o contêiner atual (já no buffer)"""
+        for match in _SKIP_TOKEN.finditer(self.buf, self.pos):
+            token = match.group()
+            if token in '[{':
+                depth += 1
+            elif token in ']}':
+                depth -= 1
+                if depth == 0:
+                    self.pos = match.end()
+                    return
+        raise ValueError("JSON inválido: contêiner não fechado")
+
+    def iter_array(self):
+        """Itera sobre os elementos do array seguinte, um de cada vez"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',]') == ']':
+                return
+
+
+def parse(path, keys=('start', 'end'), on_interval=None):
+    """Lê um JSON do iperf3 retornando apenas as chaves de topo pedidas
+
+    Se `on_interval` for informado, cada elemento de `intervals` é decodificado
+    e passado ao consumidor individualmente; caso contrário o array é pulado
+    sem ser decodificado. A mensagem `error` do iperf3 é sempre retornada
+    quando presente; texto após o objeto principal (stderr do iperf3
+    redirecionado para o arquivo) também é reportado em `error`.
+    """
+    wanted = set(keys) | {'error'}
+    result = {}
+
+    with open(path, 'r') as f:
+        reader = _Reader(f)
+        reader.expect('{')
+        closed = reader.peek() == '}'
+        if closed:
+            reader.pos += 1
+
+        while not closed:
+            key = reader.decode()
+            if not isinstance(key, str):
+                raise ValueError("JSON inválido: chave não textual")
+            reader.expect(':')
+
+            if key == 'intervals' and on_interval is not None:
+                for interval in reader.iter_array():
+                    on_interval(interval)
+            elif key in wanted:
+                result[key] = reader.decode()
+            else:
+                reader.skip()
+
+            if reader.expect(',}') == '}':
+                break
+
+        # Mensagens do iperf3 gravadas após o JSON (ex.: "iperf3: error - ...")
+        trailing = reader.buf[reader.pos:] + f.read()
+        if trailing.strip() and 'error' not in result:
+            result['error'] = trailing.strip()
+
+    return result
+
+
+def read_summary(path):
+    """Retorna {'start': ..., 'end': ...} sem carregar os intervalos"""
+    return parse(path)
+
+
+def iter_intervals(path):
+    """Gera os intervalos do arquivo um a um (memória limitada a um intervalo)
+
+    O gerador lê o arquivo à medida que é consumido; `start` e `end` são
+    ignorados.
+    """
+    with open(path, 'r') as f:
+        reader = _Reader(f)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            key = reader.decode()
+            reader.expect(':')
+            if key == 'intervals':
+                yield from reader.iter_array()
+                return
+            reader.skip()
+            if reader.expect(',}') == '}':
+                return
+
+
+def main():
+    """Mostra o resumo de um arquivo sem carregar os intervalos"""
+    if len(sys.argv) < 2:
+        print("Uso: iperf_stream.py <arquivo.json> [--intervals]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    if '--intervals' in sys.argv[2:]:
+        for interval in iter_intervals(path):
+            print(json.dumps(interval['sum']))
+        return
+
+    summary = read_summary(path)
+    end = summary.get('end', {})
+    print(json.dumps({
+        'bits_per_second': end.get('sum_sent', {}).get('bits_per_second'),
+        'retransmits': end.get('sum_sent', {}).get('retransmits'),
+        'streams': len(end.get('streams', [])),
+        'error': summary.get('error'),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Leitura dos manifestos de bateria gravados pelos scripts de teste
+(scripts/manifest.sh): <resultados>/manifests/<timestamp>.jsonl com uma
+linha por execução e o ponteiro <resultados>/manifests/latest.
+
+Com o manifesto, a bateria mais recente e os arquivos de cada execução são
+resolvidos sem listar o diretório, e saídas com falha (status do iperf3
+diferente de zero) são reconhecidas sem abrir o JSON. Baterias antigas, sem
+manifesto, continuam sendo lidas pela varredura do diretório.
+
+Com repetições adaptativas (scripts/adaptive.sh), a decisão de parada de
+cada cenário fica em <resultados>/manifests/<timestamp>_stopping.jsonl.
+
+Usa apenas a biblioteca padrão.
+"""
+
+import json
+from pathlib import Path
+
+def manifest_dir(raw_dir):
+    """Diretório dos manifestos de um diretório de resultados brutos"""
+    return Path(raw_dir).parent / "manifests"
+
+def latest(raw_dir):
+    """Timestamp apontado por manifests/latest, ou None"""
+    try:
+        timestamp = (manifest_dir(raw_dir) / "latest").read_text().strip()
+    except OSError:
+        return None
+    return timestamp or None
+
+def _read_lines(path):
+    """Objetos JSON de um arquivo .jsonl, ignorando linhas incompletas"""
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            # Linha incompleta (bateria interrompida durante a escrita)
+            continue
+    return entries
+
+def read_manifest(raw_dir, timestamp):
+    """Entradas do manifesto de uma bateria (None se não houver manifesto)
+
+    O campo `output` é resolvido em relação a `raw_dir`, pois o diretório
+    pode estar montado em outro caminho no container de análise.
+    """
+    path = manifest_dir(raw_dir) / f"{timestamp}.jsonl"
+    try:
+        entries = _read_lines(path)
+    except OSError:
+        return None
+
+    for entry in entries:
+        entry['output'] = str(Path(raw_dir) / Path(entry['output']).name)
+    return entries
+
+def read_stopping(raw_dir, timestamp):
+    """Decisões de parada das repetições adaptativas por teste ({} se não houver)
+
+    Cada decisão tem `repetitions`, `valid_samples`, `reason` ('ci' quando o
+    intervalo atingiu o alvo, 'failed' sem nenhuma amostra válida após o
+    mínimo de repetições, 'max' no limite de repetições), `mean_mbps`,
+    `half_width_pct` e `target_pct`.
+    """
+    path = manifest_dir(raw_dir) / f"{timestamp}_stopping.jsonl"
+    try:
+        return {entry['test_name']: entry for entry in _read_lines(path)}
+    except OSError:
+        return {}
+
+def failure(entry):
+    """Mensagem de erro de uma entrada com falha, ou None"""
+    if entry.get('exit_status', 0) != 0:
+        return f"iperf3 terminou com status {entry['exit_status']}"
+    return None
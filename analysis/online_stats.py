@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+
+"""
+Estatísticas online das baterias em andamento
+O resumo de uma bateria só saía depois do fim (collect-results.sh,
+analyze.py), relendo todas as execuções. Aqui cada cenário mantém um
+agregador de memória constante, atualizado a cada resultado e a cada
+intervalo:
+- média, variância (Welford), mínimo e máximo;
+- quantis pelo algoritmo P² (Jain & Chlamtac): exatos até 64 amostras,
+  depois aproximados por cinco marcadores, sem guardar o histórico.
+
+As execuções concluídas são descobertas seguindo os manifestos das baterias
+(<resultados>/manifests/<timestamp>.jsonl, gravados pelos scripts de teste
+após cada iperf3) a partir da última posição lida. O estado dos agregadores
+e as posições nos manifestos são gravados juntos em um checkpoint (JSON,
+substituição atômica): o acompanhamento pode ser interrompido e retomado
+sem reprocessar nem contar execuções duas vezes.
+
+Usa apenas a biblioteca padrão.
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from catalog import load_record
+from iperf_stream import iter_intervals
+from manifest import manifest_dir
+
+STATE_NAME = "online_state.json"
+
+# Quantis acompanhados (P²)
+QUANTILES = (0.5, 0.95)
+# Amostras guardadas por quantil antes de passar aos marcadores do P²
+EXACT_SAMPLES = 64
+# Métricas por execução acompanhadas por cenário
+METRICS = ('throughput_mbps', 'retransmits', 'rtt_ms')
+# Intervalo entre consultas aos manifestos no modo contínuo (s)
+POLL_INTERVAL = 10
+
+def default_state_path(raw_dir):
+    """Checkpoint do acompanhamento de um diretório de resultados brutos"""
+    return Path(raw_dir).parent / STATE_NAME
+
+
+class RunningStats:
+    """Contagem, média, variância (Welford), mínimo e máximo em O(1) de memória"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def merge(self, other):
+        """Combina outro acumulador (fórmula de Chan et al.)"""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min if self.count else None,
+                'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data['count']
+        stats.mean = data['mean']
+        stats.m2 = data['m2']
+        stats.min = math.inf if data['min'] is None else data['min']
+        stats.max = -math.inf if data['max'] is None else data['max']
+        return stats
+
+
+class P2Quantile:
+    """Quantil aproximado pelo algoritmo P² (cinco marcadores)
+
+    As primeiras EXACT_SAMPLES amostras são guardadas e o quantil é exato
+    (interpolação linear); depois, os marcadores partem das estatísticas de
+    ordem dessas amostras e são ajustados por interpolação parabólica.
+    """
+
+    def __init__(self, q):
+        self.q = q
+        self.samples = []
+        self.heights = None
+        self.positions = None
+        self.desired = None
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, x):
+        if self.heights is None:
+            self.samples.append(x)
+            if len(self.samples) > EXACT_SAMPLES:
+                self._start_markers()
+            return
+
+        heights = self.heights
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if heights[i] <= x < heights[i + 1])
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        n = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + d * (heights[i + d] - heights[i]) / (n[i + d] - n[i])
+                heights[i] = candidate
+                n[i] += d
+
+    def _start_markers(self):
+        """Marcadores nas estatísticas de ordem das amostras guardadas"""
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        self.desired = [1 + (n - 1) * p for p in self.increments]
+        positions = [1]
+        for target in self.desired[1:4]:
+            positions.append(min(max(round(target), positions[-1] + 1), n - (4 - len(positions))))
+        positions.append(n)
+        self.positions = positions
+        self.heights = [ordered[position - 1] for position in positions]
+        self.samples = []
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    @property
+    def value(self):
+        if self.heights is not None:
+            return self.heights[2]
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        position = self.q * (len(ordered) - 1)
+        lower = math.floor(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    def to_dict(self):
+        return {'q': self.q, 'samples': self.samples, 'heights': self.heights,
+                'positions': self.positions, 'desired': self.desired}
+
+    @classmethod
+    def from_dict(cls, data):
+        quantile = cls(data['q'])
+        quantile.samples = data['samples']
+        quantile.heights = data['heights']
+        quantile.positions = data['positions']
+        quantile.desired = data['desired']
+        return quantile
+
+
+class OnlineSummary:
+    """RunningStats e quantis P² de uma mesma série"""
+
+    def __init__(self, quantiles=QUANTILES):
+        self.stats = RunningStats()
+        self.quantiles = [P2Quantile(q) for q in quantiles]
+
+    def add(self, x):
+        if x is None or math.isnan(x):
+            return
+        self.stats.add(x)
+        for quantile in self.quantiles:
+            quantile.add(x)
+
+    def quantile(self, q):
+        return next((p.value for p in self.quantiles if p.q == q), math.nan)
+
+    def to_dict(self):
+        return {'stats': self.stats.to_dict(), 'quantiles': [p.to_dict() for p in self.quantiles]}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(())
+        summary.stats = RunningStats.from_dict(data['stats'])
+        summary.quantiles = [P2Quantile.from_dict(p) for p in data['quantiles']]
+        return summary
+
+
+class OnlineAggregator:
+    """Agregadores por cenário e posições lidas nos manifestos"""
+
+    def __init__(self):
+        self.scenarios = {}
+        self.cursors = {}
+        self.failures = 0
+        self.updated = None
+
+    def _scenario(self, scenario):
+        if scenario not in self.scenarios:
+            self.scenarios[scenario] = {
+                'runs': {metric: OnlineSummary() for metric in METRICS},
+                'intervals': OnlineSummary(),
+            }
+        return self.scenarios[scenario]
+
+    def add_result(self, scenario, metrics):
+        """Acrescenta as métricas finais de uma execução"""
+        runs = self._scenario(scenario)['runs']
+        for metric in METRICS:
+            runs[metric].add(metrics.get(metric))
+
+    def add_interval(self, scenario, throughput_mbps):
+        """Acrescenta o throughput de um intervalo"""
+        self._scenario(scenario)['intervals'].add(throughput_mbps)
+
+    def add_file(self, path):
+        """Processa um JSON do iperf3 concluído; retorna False se falhou"""
+        record = load_record(path)
+        if record is None:
+            return False
+        if record['error']:
+            self.failures += 1
+            return False
+
+        scenario = record['scenario']
+        self.add_result(scenario, record)
+        # Intervalos um a um (fora do período de omit), sem carregar o array
+        for interval in iter_intervals(path):
+            total = interval.get('sum', {})
+            if not total.get('omitted') and 'bits_per_second' in total:
+                self.add_interval(scenario, total['bits_per_second'] / 1e6)
+        return True
+
+    def follow(self, raw_dir):
+        """Processa as execuções registradas nos manifestos desde a última leitura
+
+        Só linhas completas (terminadas em '\\n') são consumidas; uma linha
+        em escrita é lida na próxima consulta. Retorna o número de execuções
+        novas.
+        """
+        raw_dir = Path(raw_dir)
+        processed = 0
+        for path in sorted(manifest_dir(raw_dir).glob("*.jsonl")):
+            if path.stem.endswith('_stopping'):
+                # Decisões de parada das repetições adaptativas, não execuções
+                continue
+            offset = self.cursors.get(path.name, 0)
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].decode().splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('exit_status', 0) != 0:
+                    self.failures += 1
+                    continue
+                output = raw_dir / Path(entry['output']).name
+                if output.exists() and self.add_file(output):
+                    processed += 1
+            self.cursors[path.name] = offset + end
+        if processed:
+            self.updated = datetime.now().isoformat(timespec='seconds')
+        return processed
+
+    def to_dict(self):
+        return {
+            'updated': self.updated,
+            'failures': self.failures,
+            'cursors': self.cursors,
+            'scenarios': {
+                name: {'runs': {metric: summary.to_dict() for metric, summary in entry['runs'].items()},
+                       'intervals': entry['intervals'].to_dict()}
+                for name, entry in self.scenarios.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregator = cls()
+        aggregator.updated = data.get('updated')
+        aggregator.failures = data.get('failures', 0)
+        aggregator.cursors = data.get('cursors', {})
+        for name, entry in data.get('scenarios', {}).items():
+            aggregator.scenarios[name] = {
+                'runs': {metric: OnlineSummary.from_dict(summary) for metric, summary in entry['runs'].items()},
+                'intervals': OnlineSummary.from_dict(entry['intervals']),
+            }
+        return aggregator
+
+    def save(self, path):
+        """Grava o checkpoint (substituição atômica)"""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(self.to_dict()) + "\n")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        """Checkpoint gravado por save(), ou um agregador vazio"""
+        try:
+            return cls.from_dict(json.loads(Path(path).read_text()))
+        except (OSError, ValueError):
+            return cls()
+
+def format_summary(aggregator):
+    """Tabela por cenário: execuções e intervalos"""
+    lines = [f"{'cenário':<36} {'exec.':>5} {'média':>10} {'dp':>8} {'EP %':>6} {'mín':>10} "
+             f"{'máx':>10} {'p50':>10} {'p95':>10} {'interv.':>7} {'p95 interv.':>11}"]
+    for name in sorted(aggregator.scenarios):
+        entry = aggregator.scenarios[name]
+        runs = entry['runs']['throughput_mbps']
+        stats = runs.stats
+        intervals = entry['intervals']
+        # Erro padrão relativo da média: acompanha a convergência
+        se = stats.std / math.sqrt(stats.count) / stats.mean * 100 if stats.count > 1 and stats.mean else math.nan
+        lines.append(f"{name:<36} {stats.count:>5} {stats.mean:>10.2f} {stats.std:>8.2f} {se:>6.2f} "
+                     f"{stats.min:>10.2f} {stats.max:>10.2f} {runs.quantile(0.5):>10.2f} "
+                     f"{runs.quantile(0.95):>10.2f} {intervals.stats.count:>7} "
+                     f"{intervals.quantile(0.95):>11.2f}")
+    return '\n'.join(lines)
+
+def main():
+    """Acompanha as baterias pelos manifestos e mostra o resumo por cenário"""
+    parser = argparse.ArgumentParser(description="Estatísticas online (Welford/P²) das baterias em andamento")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--state', type=Path, help=f"Checkpoint (padrão: <raw-dir>/../{STATE_NAME})")
+    parser.add_argument('--once', action='store_true', help="Uma única leitura dos manifestos")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="Segundos entre consultas no modo contínuo")
+    parser.add_argument('--reset', action='store_true', help="Descarta o checkpoint e relê os manifestos")
+    args = parser.parse_args()
+
+    state = args.state or default_state_path(args.raw_dir)
+    aggregator = OnlineAggregator() if args.reset else OnlineAggregator.load(state)
+
+    try:
+        while True:
+            processed = aggregator.follow(args.raw_dir)
+            if processed or args.once:
+                aggregator.save(state)
+                print(f"\n[{datetime.now():%H:%M:%S}] {processed} execução(ões) nova(s), "
+                      f"{aggregator.failures} com falha")
+                if aggregator.scenarios:
+                    print(format_summary(aggregator))
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print(f"\nCheckpoint salvo em: {state}")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
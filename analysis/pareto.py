@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""
+Fronteira de Pareto das configurações testadas
+Em vez de um score com pesos fixos sobre métricas normalizadas, cada
+configuração é comparada em todas as métricas ao mesmo tempo: A domina B se
+não é pior em nenhuma métrica e é melhor em pelo menos uma. A fronteira
+(frente 1) são as configurações que ninguém domina; as demais recebem a
+frente em que saem na ordenação não dominada e uma configuração da
+fronteira que as domina.
+
+Restrições como "cpu_sender<50" ou "retransmits=0" eliminam configurações
+antes da ordenação. As comparações são vetorizadas em blocos (bloco ×
+restantes × métricas), com memória limitada mesmo para varreduras com
+milhares de configurações (5000 em menos de um segundo).
+"""
+
+import argparse
+import operator
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import grouped_stats
+
+# Métrica -> sentido ('max' ou 'min'); a primeira desempata a escolha final
+OBJECTIVES = {
+    'throughput_mbps': 'max',
+    'retransmits': 'min',
+    'cpu_sender': 'min',
+    'rtt_ms': 'min',
+}
+
+# Elementos por bloco de comparações (limita a memória a ~32 MB por bloco)
+BLOCK_ELEMENTS = 1 << 22
+
+_CONSTRAINT = re.compile(r'^\s*([A-Za-z_]\w*)\s*(<=|>=|!=|==|=|<|>)\s*(-?[\d.]+(?:e-?\d+)?)\s*%?\s*$')
+_OPERATORS = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne,
+}
+
+def parse_constraint(text):
+    """'cpu_sender<50' -> ('cpu_sender', '<', 50.0)"""
+    match = _CONSTRAINT.match(text)
+    if not match:
+        raise ValueError(f"Restrição inválida: {text!r} (ex.: cpu_sender<50, retransmits=0)")
+    column, op, value = match.groups()
+    return column, op, float(value)
+
+def feasible(df, constraints=()):
+    """Máscara das configurações que satisfazem todas as restrições"""
+    mask = np.ones(len(df), dtype=bool)
+    for constraint in constraints:
+        column, op, value = parse_constraint(constraint) if isinstance(constraint, str) else constraint
+        if column not in df.columns:
+            raise ValueError(f"Coluna desconhecida na restrição: {column}")
+        mask &= _OPERATORS[op](df[column].to_numpy(dtype=np.float64), value)
+    return mask
+
+def _dominance_blocks(points, candidates):
+    """Gera (início, matriz) com matriz[i, j] = candidata j domina o ponto
+    start + i, em blocos de linhas; ambos em forma de minimização
+
+    As comparações são feitas métrica a métrica sobre matrizes 2D (reduzir
+    um eixo de poucas métricas no NumPy é bem mais lento).
+    """
+    block = max(1, BLOCK_ELEMENTS // max(len(candidates), 1))
+    for start in range(0, len(points), block):
+        chunk = points[start:start + block]
+        no_worse = np.ones((len(chunk), len(candidates)), dtype=bool)
+        better = np.zeros((len(chunk), len(candidates)), dtype=bool)
+        for k in range(points.shape[1]):
+            column, reference = chunk[:, k, None], candidates[None, :, k]
+            no_worse &= reference <= column
+            better |= reference < column
+        yield start, no_worse & better
+
+def _dominated_by_any(points, candidates):
+    """Para cada ponto, se alguma candidata o domina"""
+    result = np.zeros(len(points), dtype=bool)
+    for start, dominates in _dominance_blocks(points, candidates):
+        result[start:start + len(dominates)] = dominates.any(axis=1)
+    return result
+
+def _first_dominator(points, candidates):
+    """Índice da primeira candidata que domina cada ponto, ou -1
+
+    As candidatas são passadas na ordem de preferência.
+    """
+    result = np.full(len(points), -1, dtype=np.int64)
+    for start, dominates in _dominance_blocks(points, candidates):
+        result[start:start + len(dominates)] = np.where(dominates.any(axis=1), dominates.argmax(axis=1), -1)
+    return result
+
+def _minimized(values, senses):
+    """Métricas em forma de minimização (as de 'max' com sinal trocado)"""
+    sign = np.array([-1.0 if sense == 'max' else 1.0 for sense in senses])
+    return np.asarray(values, dtype=np.float64) * sign
+
+def _nondominated_sort(points):
+    """Frente de cada ponto (0 = com NaN) e quantos pontos cada um domina
+
+    Conta os dominadores de cada ponto uma vez; ao fechar uma frente,
+    desconta apenas os pontos dominados pelos membros dela, de modo que cada
+    par é comparado no máximo duas vezes.
+    """
+    fronts = np.zeros(len(points), dtype=np.int64)
+    counts = np.zeros(len(points), dtype=np.int64)
+
+    remaining = np.flatnonzero(~np.isnan(points).any(axis=1))
+    dominators = np.zeros(len(remaining), dtype=np.int64)
+    for start, dominates in _dominance_blocks(points[remaining], points[remaining]):
+        dominators[start:start + len(dominates)] = dominates.sum(axis=1)
+        counts[remaining] += dominates.sum(axis=0)
+
+    front = 0
+    while len(remaining):
+        front += 1
+        current = dominators == 0
+        fronts[remaining[current]] = front
+        members = points[remaining[current]]
+        remaining, dominators = remaining[~current], dominators[~current]
+        for start, dominates in _dominance_blocks(points[remaining], members):
+            dominators[start:start + len(dominates)] -= dominates.sum(axis=1)
+    return fronts, counts
+
+def pareto_fronts(values, senses):
+    """Frente de cada linha na ordenação não dominada (1 = fronteira)
+
+    `values` é (configuração, métrica); `senses` tem 'max' ou 'min' por
+    métrica. Linhas com NaN ficam fora (frente 0).
+    """
+    return _nondominated_sort(_minimized(values, senses))[0]
+
+def pareto_table(summary, objectives=None, constraints=(), label='test_name'):
+    """Fronteira de Pareto de um resumo com uma configuração por linha
+
+    Acrescenta `feasible`, `front` (1 = fronteira, 0 = inviável),
+    `dominated` (dominada por alguma configuração viável),
+    `dominated_by` (uma configuração da fronteira que a domina) e
+    `dominates` (quantas configurações viáveis ela domina). As linhas saem
+    ordenadas por frente e pela primeira métrica.
+    """
+    objectives = OBJECTIVES if objectives is None else objectives
+    objectives = {metric: sense for metric, sense in objectives.items() if metric in summary.columns}
+    metrics = list(objectives)
+    senses = [objectives[metric] for metric in metrics]
+
+    table = summary.reset_index(drop=True).copy()
+    ok = feasible(table, constraints)
+    values = table[metrics].to_numpy(dtype=np.float64)
+
+    points = _minimized(values, senses)
+    fronts = np.zeros(len(table), dtype=np.int64)
+    counts = np.zeros(len(table), dtype=np.int64)
+    fronts[ok], counts[ok] = _nondominated_sort(points[ok])
+    table['feasible'] = ok
+    table['front'] = fronts
+    table['dominated'] = fronts > 1
+    table['dominates'] = counts
+
+    # Fronteira na ordem de preferência (melhor na primeira métrica primeiro)
+    frontier = np.flatnonzero(fronts == 1)
+    frontier = frontier[np.argsort(points[frontier, 0], kind='stable')]
+    dominated = np.flatnonzero(fronts > 1)
+    first = _first_dominator(points[dominated], points[frontier])
+    table['dominated_by'] = None
+    table.loc[dominated, 'dominated_by'] = table[label].to_numpy()[frontier[first]]
+
+    order = np.lexsort((points[:, 0], np.where(fronts == 0, np.iinfo(np.int64).max, fronts)))
+    return table.iloc[order].reset_index(drop=True)
+
+def best(table):
+    """Configuração da fronteira com a melhor primeira métrica (None se vazia)"""
+    frontier = table[table['front'] == 1]
+    return frontier.iloc[0] if not frontier.empty else None
+
+def summarize_configurations(df, by='test_name', objectives=None):
+    """Médias das métricas por configuração (uma linha por configuração)"""
+    objectives = OBJECTIVES if objectives is None else objectives
+    metrics = [metric for metric in objectives if metric in df.columns]
+    summary = grouped_stats(df, by, {metric: ('mean',) for metric in metrics})
+    summary = summary.rename(columns={f"{metric}_mean": metric for metric in metrics})
+    return summary.reset_index()
+
+def format_table(table, label='test_name', objectives=None):
+    """Tabela da fronteira e das configurações dominadas em texto alinhado"""
+    objectives = OBJECTIVES if objectives is None else objectives
+    metrics = [metric for metric in objectives if metric in table.columns]
+    header = f"{'configuração':<36} {'frente':>6} " + ' '.join(f"{metric:>16}" for metric in metrics)
+    lines = [header + "  situação"]
+    for _, row in table.iterrows():
+        if not row['feasible']:
+            status = "inviável (restrições)"
+        elif not row['front']:
+            status = "sem todas as métricas"
+        elif row['dominated']:
+            status = f"dominada por {row['dominated_by']}"
+        else:
+            status = f"fronteira (domina {row['dominates']})"
+        front = row['front'] if row['front'] else '-'
+        lines.append(f"{str(row[label]):<36} {front:>6} " +
+                     ' '.join(f"{row[metric]:>16.2f}" for metric in metrics) + f"  {status}")
+    return '\n'.join(lines)
+
+def main():
+    """Fronteira de Pareto das configurações de um diretório de resultados"""
+    parser = argparse.ArgumentParser(description="Fronteira de Pareto das configurações testadas")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--timestamp', help="Somente esta bateria (padrão: todas)")
+    parser.add_argument('--constraint', '-c', action='append', default=[],
+                        help="Restrição, ex.: 'cpu_sender<50' ou 'retransmits=0' (repetível)")
+    parser.add_argument('--frontier-only', action='store_true', help="Mostra só a fronteira")
+    args = parser.parse_args()
+
+    from run_index import query_runs, sync_index
+
+    db = sync_index(args.raw_dir)
+    filters = {'timestamp': args.timestamp} if args.timestamp else {}
+    columns = ['scenario'] + list(OBJECTIVES)
+    df = pd.DataFrame(query_runs(db, columns=columns, **filters), columns=columns)
+    if df.empty:
+        print(f"Nenhuma execução válida em {args.raw_dir}")
+        sys.exit(1)
+
+    try:
+        table = pareto_table(summarize_configurations(df, 'scenario'), constraints=args.constraint,
+                             label='scenario')
+    except ValueError as e:
+        parser.error(str(e))
+
+    shown = table[table['front'] == 1] if args.frontier_only else table
+    print(format_table(shown, 'scenario'))
+    print(f"\n{(table['front'] == 1).sum()} na fronteira, {table['dominated'].sum()} dominadas, "
+          f"{(~table['feasible']).sum()} inviáveis de {len(table)} configurações")
+
+if __name__ == "__main__":
+    main()
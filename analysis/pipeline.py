@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+
+"""
+Grafo de etapas do pipeline coleta → análise → gráficos → tabelas → PDF
+(e o painel HTML)
+Cada etapa declara o comando, as entradas (padrões glob), as saídas e as
+etapas de que depende. Uma etapa só roda se a assinatura das entradas
+(caminho, tamanho e mtime de cada arquivo, mais o código do script e dos
+módulos locais que ele importa) ou o comando mudaram desde a última
+execução bem-sucedida, ou se alguma saída foi alterada ou removida.
+Etapas independentes rodam ao mesmo tempo e o tempo de cada uma é relatado.
+
+Dentro das etapas, os caches de ingestão e de artefatos continuam valendo:
+depois de uma nova execução, a coleta relê só os JSONs novos e a análise
+renderiza só as figuras cujos dados mudaram; as figuras que não mudaram
+mantêm o mtime, então o PDF só é refeito se alguma delas foi regenerada.
+
+As assinaturas ficam em /results/cache/pipeline_manifest.json (gravação
+atômica). Usa apenas a biblioteca padrão.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from catalog import latest_timestamp
+
+HERE = Path(__file__).resolve().parent
+RESULTS_DIR = Path("/results")
+ATV2_DIR = Path("/docs/atv2")
+
+# Incrementar quando a forma de calcular as assinaturas mudar
+CACHE_VERSION = 1
+
+MANIFEST_PATH = RESULTS_DIR / "cache" / "pipeline_manifest.json"
+
+# Linhas finais da saída mostradas quando uma etapa falha
+FAILURE_TAIL = 20
+
+class Stage:
+    """Etapa do pipeline: comando, entradas, saídas e dependências
+
+    `inputs` e `outputs` são caminhos ou padrões glob absolutos; o script
+    (primeiro argumento Python do comando) e os módulos locais que ele
+    importa entram nas entradas automaticamente.
+    """
+
+    __slots__ = ('name', 'command', 'inputs', 'outputs', 'deps')
+
+    def __init__(self, name, command, inputs, outputs, deps=()):
+        self.name = name
+        self.command = [str(part) for part in command]
+        self.inputs = [str(pattern) for pattern in inputs]
+        self.outputs = [str(pattern) for pattern in outputs]
+        self.deps = tuple(deps)
+
+def _python(script, *args):
+    """Comando para um script deste diretório com o interpretador atual"""
+    return [sys.executable, HERE / script, *args]
+
+# Etapas que dependem de uma bateria em /results/raw
+BATTERY_STAGES = ('collect', 'analyze', 'dashboard')
+
+def stages(timestamp=None):
+    """Etapas do pipeline para a bateria `timestamp` (padrão: a mais recente)
+
+    Retorna (etapas, timestamp). Sem bateria em /results, as etapas de
+    coleta e análise ficam de fora.
+    """
+    raw_dir = RESULTS_DIR / "raw"
+    timestamp = timestamp or latest_timestamp(raw_dir)
+    atv2 = ATV2_DIR / "results"
+
+    graph = []
+    if timestamp:
+        processed = RESULTS_DIR / "processed"
+        partition = RESULTS_DIR / "store" / f"timestamp={timestamp}"
+        plots = RESULTS_DIR / "plots"
+        graph += [
+            Stage('collect', _python('ingest.py', timestamp),
+                  inputs=[raw_dir / f"{timestamp}_*.json",
+                          RESULTS_DIR / "manifests" / f"{timestamp}*.jsonl"],
+                  outputs=[partition / "**" / "*.parquet",
+                           processed / f"{timestamp}_summary.txt",
+                           processed / f"{timestamp}_table.md"]),
+            Stage('analyze', _python('analyze.py', timestamp),
+                  inputs=[partition / "**" / "*.parquet", raw_dir / f"{timestamp}_*.json"],
+                  outputs=[plots / "*.png", plots / "optimal_configuration.txt"],
+                  deps=['collect']),
+            # Todas as baterias; depois da coleta, que também grava o índice
+            Stage('dashboard', _python('dashboard.py', raw_dir),
+                  inputs=[raw_dir / "*.json", HERE / "dashboard_template.html"],
+                  outputs=[RESULTS_DIR / "dashboard.html"],
+                  deps=['collect']),
+        ]
+
+    graph += [
+        Stage('atv2', _python('analyze-atv2.py'),
+              inputs=[atv2 / "raw" / "*.json", atv2 / "manifests" / "*.jsonl",
+                      ATV2_DIR / "scenarios" / "scenario_*.json"],
+              outputs=[atv2 / "plots" / "atv2_*.png", atv2 / "processed" / "*_statistics.parquet",
+                       atv2 / "processed" / "*_quarantine.csv", atv2 / "processed" / "*.md"]),
+        Stage('pdf', _python('generate-pdf-report.py'),
+              inputs=[ATV2_DIR / "REPORT2.md", atv2 / "plots" / "atv2_*.png"],
+              outputs=[ATV2_DIR / "REPORT2*.pdf", ATV2_DIR / "REPORT2.html"],
+              deps=['atv2']),
+    ]
+    return graph, timestamp
+
+def local_modules(script):
+    """Script e módulos deste diretório importados por ele (transitivamente)"""
+    seen, pending = set(), [Path(script)]
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+        try:
+            tree = ast.parse(path.read_text(), str(path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            pending += [path.parent / f"{name.split('.')[0]}.py" for name in names]
+    return sorted(seen)
+
+def _expand(patterns):
+    """Arquivos que casam com os padrões (caminhos absolutos), ordenados"""
+    files = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if not any(char in pattern for char in '*?['):
+            if path.is_file():
+                files.add(path)
+            continue
+        anchor = Path(path.anchor)
+        files.update(match for match in anchor.glob(str(path.relative_to(anchor))) if match.is_file())
+    return sorted(files)
+
+def _stat(path):
+    """[tamanho, mtime_ns] de um arquivo, ou None se não existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def input_signature(stage):
+    """Hash do comando e de (caminho, tamanho, mtime) de cada entrada"""
+    files = _expand(stage.inputs)
+    scripts = [Path(part) for part in stage.command[1:] if part.endswith('.py')]
+    for script in scripts[:1]:
+        files += local_modules(script)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_VERSION}\x1f{json.dumps(stage.command)}".encode())
+    for path in files:
+        h.update(f"\x1e{path}\x1f{_stat(path)}".encode())
+    return h.hexdigest(), len(files)
+
+def output_state(stage):
+    """{saída: [tamanho, mtime_ns]} das saídas existentes da etapa"""
+    return {str(path): _stat(path) for path in _expand(stage.outputs)}
+
+class StampManifest:
+    """Assinatura das entradas e estado das saídas da última execução de cada etapa"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self._dirty = False
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == CACHE_VERSION:
+            self.entries = data.get('stages', {})
+
+    def stale(self, stage, signature):
+        """Motivo para executar a etapa, ou None se está atualizada"""
+        entry = self.entries.get(stage.name)
+        if not entry:
+            return "sem execução anterior"
+        if entry['inputs'] != signature:
+            return "entradas alteradas"
+        if entry['outputs'] != output_state(stage):
+            return "saídas alteradas"
+        return None
+
+    def record(self, stage, signature):
+        """Registra uma execução bem-sucedida"""
+        self.entries[stage.name] = {'inputs': signature, 'outputs': output_state(stage)}
+        self._dirty = True
+
+    def save(self):
+        """Grava o manifesto se houve alteração (falha de escrita não é fatal)"""
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'stages': self.entries}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o manifesto do pipeline {self.path}: {e}",
+                  file=sys.stderr)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+def select(graph, targets):
+    """Etapas pedidas e todas as suas dependências, na ordem do grafo"""
+    by_name = {stage.name: stage for stage in graph}
+    unknown = [target for target in targets if target not in by_name]
+    if unknown:
+        raise ValueError(f"Etapa(s) desconhecida(s): {', '.join(unknown)} "
+                         f"(disponíveis: {', '.join(by_name)})")
+    wanted, pending = set(), list(targets or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending += [dep for dep in by_name[name].deps if dep in by_name]
+    return [stage for stage in graph if stage.name in wanted]
+
+def _execute(stage):
+    """Executa o comando da etapa: (código de saída, saída combinada, segundos)"""
+    start = time.perf_counter()
+    process = subprocess.run(stage.command, cwd=HERE, stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, text=True)
+    return process.returncode, process.stdout, time.perf_counter() - start
+
+def run(graph, manifest, jobs=1, force=False, dry_run=False, verbose=False):
+    """Executa o grafo, cada etapa assim que suas dependências terminam
+
+    Uma etapa é pulada se está atualizada (exceto com `force`) e não roda
+    se uma dependência falhou. Retorna {etapa: (situação, segundos)}.
+    """
+    names = {stage.name for stage in graph}
+    waiting = list(graph)
+    results = {}
+    running = {}
+
+    def finished(name):
+        return name in results
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while waiting or running:
+            for stage in list(waiting):
+                deps = [dep for dep in stage.deps if dep in names]
+                if not all(finished(dep) for dep in deps):
+                    continue
+                waiting.remove(stage)
+                if any(results[dep][0] in ('falhou', 'não executada') for dep in deps):
+                    results[stage.name] = ('não executada', 0.0)
+                    print(f"[{stage.name}] não executada: dependência falhou")
+                    continue
+
+                # Assinatura calculada só agora, com as saídas das dependências já gravadas
+                start = time.perf_counter()
+                signature, count = input_signature(stage)
+                reason = "forçada" if force else manifest.stale(stage, signature)
+                if dry_run and any(results[dep][0] == 'pendente' for dep in deps):
+                    reason = "dependência pendente"
+                if reason is None:
+                    results[stage.name] = ('atualizada', time.perf_counter() - start)
+                    print(f"[{stage.name}] atualizada ({count} entradas)")
+                    continue
+                if dry_run:
+                    results[stage.name] = ('pendente', 0.0)
+                    print(f"[{stage.name}] executaria: {reason}")
+                    continue
+                print(f"[{stage.name}] executando: {reason}")
+                running[executor.submit(_execute, stage)] = (stage, signature)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, signature = running.pop(future)
+                code, output, elapsed = future.result()
+                lines = output.rstrip().splitlines()
+                if code == 0:
+                    manifest.record(stage, signature)
+                    manifest.save()
+                    results[stage.name] = ('executada', elapsed)
+                    print(f"[{stage.name}] concluída em {elapsed:.2f}s")
+                    shown = lines if verbose else []
+                else:
+                    results[stage.name] = ('falhou', elapsed)
+                    print(f"[{stage.name}] falhou (código {code}) em {elapsed:.2f}s")
+                    shown = lines if verbose else lines[-FAILURE_TAIL:]
+                for line in shown:
+                    print(f"  {stage.name} | {line}")
+    return {stage.name: results[stage.name] for stage in graph}
+
+def format_timings(results):
+    """Tempo e situação de cada etapa em texto alinhado"""
+    lines = [f"{'etapa':<12} {'situação':<14} {'tempo':>9}"]
+    for name, (status, elapsed) in results.items():
+        lines.append(f"{name:<12} {status:<14} {elapsed:>8.2f}s")
+    return '\n'.join(lines)
+
+def main():
+    """Executa as etapas desatualizadas do pipeline"""
+    parser = argparse.ArgumentParser(description="Pipeline incremental coleta → análise → gráficos → tabelas → PDF")
+    parser.add_argument('targets', nargs='*',
+                        help="Etapas a atualizar, com as dependências (padrão: todas)")
+    parser.add_argument('--timestamp', help="Bateria de /results (padrão: a mais recente)")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="Etapas executadas ao mesmo tempo (padrão: núcleos disponíveis)")
+    parser.add_argument('--force', action='store_true', help="Executa as etapas mesmo se atualizadas")
+    parser.add_argument('--dry-run', '-n', action='store_true', help="Só mostra o que seria executado")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Mostra a saída de cada etapa")
+    parser.add_argument('--list', action='store_true', help="Lista as etapas com entradas e saídas")
+    args = parser.parse_args()
+
+    graph, timestamp = stages(args.timestamp)
+    missing = [target for target in args.targets if target in BATTERY_STAGES]
+    if missing and not timestamp:
+        print(f"Nenhuma bateria em {RESULTS_DIR / 'raw'} (etapas {', '.join(missing)} "
+              "precisam de resultados)")
+        sys.exit(1)
+    try:
+        graph = select(graph, args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.list:
+        for stage in graph:
+            deps = f" (depende de {', '.join(stage.deps)})" if stage.deps else ""
+            print(f"{stage.name}{deps}\n  comando: {' '.join(stage.command)}")
+            print('\n'.join(f"  entrada: {pattern}" for pattern in stage.inputs))
+            print('\n'.join(f"  saída:   {pattern}" for pattern in stage.outputs))
+        return
+
+    print(f"Bateria: {timestamp or 'nenhuma em ' + str(RESULTS_DIR / 'raw')}\n")
+    manifest = StampManifest(MANIFEST_PATH)
+    start = time.perf_counter()
+    results = run(graph, manifest, args.jobs, args.force, args.dry_run, args.verbose)
+
+    print(f"\n{format_timings(results)}")
+    print(f"Total: {time.perf_counter() - start:.2f}s")
+    if any(status in ('falhou', 'não executada') for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+"""
+Carregamento tardio de matplotlib e seaborn e renderização paralela
+Importar seaborn (que traz matplotlib) custa mais de um segundo, enquanto as
+estatísticas precisam só de NumPy e pandas. Os scripts de análise chamam
+load_plotting() apenas quando vão gerar gráficos, de modo que os modos
+--stats-only/--json nunca importam as bibliotecas de gráficos.
+
+As figuras são renderizadas no backend Agg (sem tela) como trabalhos
+independentes (função, argumentos, saídas), distribuídos por render() em um
+pool de processos; com um ArtifactCache, só os trabalhos cujos dados,
+código ou estilo mudaram são renderizados. Os DataFrames vão para os processos como PackedFrame (só as
+colunas usadas, como arrays NumPy). Cada trabalho roda dentro de um
+rc_context a partir do mesmo estilo, então a saída é idêntica byte a byte
+à renderização sequencial, qualquer que seja a ordem ou o processo.
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+STYLE = 'seaborn-v0_8-darkgrid'
+PALETTE = 'husl'
+
+_styled = False
+
+def load_plotting(rc=None):
+    """Importa matplotlib.pyplot e seaborn e aplica o estilo dos gráficos
+
+    O estilo e a paleta são aplicados só na primeira chamada; `rc` atualiza
+    os parâmetros do matplotlib. Retorna (plt, sns).
+    """
+    global _styled
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if not _styled:
+        plt.style.use(STYLE)
+        sns.set_palette(PALETTE)
+        _styled = True
+    if rc:
+        plt.rcParams.update(rc)
+    return plt, sns
+
+class PackedFrame:
+    """Colunas de um DataFrame como arrays NumPy, para enviar a outro processo
+
+    Serializa só os buffers das colunas pedidas, sem índice nem blocos do
+    pandas; unpack() reconstrói o DataFrame (com índice 0..n-1).
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, df, columns=None):
+        columns = df.columns if columns is None else columns
+        self.columns = {column: df[column].to_numpy() for column in columns}
+
+    def unpack(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+def style_signature(rc=None):
+    """Parâmetros de estilo que entram na chave do cache das figuras
+
+    As versões vêm dos metadados dos pacotes, sem importar matplotlib.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    signature = {'style': STYLE, 'palette': PALETTE, 'rc': rc or {}}
+    for package in ('matplotlib', 'seaborn'):
+        try:
+            signature[package] = version(package)
+        except PackageNotFoundError:
+            signature[package] = None
+    return signature
+
+def _render_job(job):
+    """Executa um trabalho (função, argumentos) com o estilo inicial do processo"""
+    function, args = job
+    args = [arg.unpack() if isinstance(arg, PackedFrame) else arg for arg in args]
+    plt, _ = load_plotting()
+    with plt.rc_context():
+        function(*args)
+        plt.close('all')
+    return function.__name__
+
+def render(jobs, workers=1, initializer=None, cache=None, style=None, rebuild=False):
+    """Renderiza os trabalhos (função, argumentos, saídas) em `workers` processos
+
+    `initializer` prepara cada processo (ex.: o use_plotting() do script,
+    que aplica o estilo e os parâmetros das figuras). Com um processo ou um
+    trabalho, tudo roda no processo atual. Com `cache` (ArtifactCache), os
+    trabalhos cujas saídas estão atualizadas para a chave de dados, código
+    e `style` são pulados (todos são renderizados com `rebuild`) e os
+    renderizados são registrados. Retorna os nomes das funções renderizadas.
+    """
+    jobs = list(jobs)
+    keys = [None] * len(jobs)
+    if cache is not None:
+        from artifact_cache import artifact_key
+
+        keys = [artifact_key(function, args, style) for function, args, _ in jobs]
+        pending = [i for i, (job, key) in enumerate(zip(jobs, keys))
+                   if rebuild or not cache.fresh(key, job[2])]
+        jobs, keys = [jobs[i] for i in pending], [keys[i] for i in pending]
+    if not jobs:
+        return []
+
+    # Prepara também o processo atual: com fork, os processos herdam os módulos já importados
+    if initializer:
+        initializer()
+    work = [(function, args) for function, args, _ in jobs]
+    if workers <= 1 or len(work) <= 1:
+        names = [_render_job(job) for job in work]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(work)), initializer=initializer) as executor:
+            names = list(executor.map(_render_job, work))
+
+    if cache is not None:
+        for (_, _, outputs), key in zip(jobs, keys):
+            cache.record(key, outputs)
+    return names
+
+def plotting_loaded():
+    """Se matplotlib já foi importado neste processo"""
+    return 'matplotlib' in sys.modules
+
+# Tempo máximo (s) dos modos só de estatísticas, da partida do script à saída
+STATS_BUDGET_S = 1.0
+
+def check_stats_budget(started, budget=STATS_BUDGET_S):
+    """Relata no stderr o tempo do modo só de estatísticas
+
+    `started` é um time.perf_counter() tomado antes das importações pesadas.
+    Avisa se o orçamento foi excedido ou se matplotlib foi importado (o
+    que indica uma importação de gráficos fora do lugar). Retorna se o
+    modo ficou dentro do orçamento.
+    """
+    elapsed = time.perf_counter() - started
+    print(f"Estatísticas em {elapsed:.2f}s (orçamento {budget:.1f}s)", file=sys.stderr)
+    if plotting_loaded():
+        print("Aviso: matplotlib foi importado no modo só de estatísticas", file=sys.stderr)
+    if elapsed > budget:
+        print(f"Aviso: orçamento de partida excedido em {elapsed - budget:.2f}s", file=sys.stderr)
+    return elapsed <= budget
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+"""
+Detecção de regressões de desempenho entre baterias
+Depois de mudanças de kernel ou sysctl, a bateria mais recente de cada
+cenário é comparada com o histórico das baterias anteriores do mesmo
+cenário (Welch e Mann–Whitney, correção para comparações múltiplas por
+métrica, via significance.against_baseline). Uma regressão é uma piora
+significativa e maior que MIN_CHANGE: queda de throughput ou aumento de
+retransmissões.
+
+Além disso, a linha do tempo completa de cada cenário (execuções em ordem
+de timestamp e repetição) passa por detecção de pontos de mudança na média
+por segmentação binária com penalidade 3σ² log n, em que σ é estimado pelo
+MAD das diferenças sucessivas. As mudanças só são procuradas entre
+baterias, nunca entre repetições da mesma bateria.
+
+O script termina com código 1 quando há regressão, para bloquear a
+implantação em um pipeline.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from significance import ALPHA, CORRECTIONS, against_baseline
+
+# Métrica -> sentido desejado ('max' ou 'min'); piorar no sentido oposto é regressão
+CHECKS = {
+    'throughput_mbps': 'max',
+    'retransmits': 'min',
+}
+
+# Piora mínima (% da média histórica) para declarar regressão
+MIN_CHANGE = 5.0
+# Menor número de execuções em cada lado de um ponto de mudança
+MIN_SEGMENT = 2
+# Penalidade por ponto de mudança, em σ² log n (3: ~2% de falsos positivos
+# em 30 execuções sem mudança)
+PENALTY_FACTOR = 3.0
+# Ruído mínimo assumido (fração da mediana) ao estimar σ para a penalidade
+NOISE_FLOOR = 0.01
+
+HISTORY = 'histórico'
+
+def split_history(df, timestamp, history=None):
+    """Execuções da bateria `timestamp` e as anteriores dos mesmos cenários
+
+    Com `history`, só as `history` baterias anteriores mais recentes de
+    cada cenário entram no histórico.
+    """
+    current = df[df['timestamp'] == timestamp]
+    past = df[(df['timestamp'] < timestamp) & df['scenario'].isin(current['scenario'].unique())]
+    if history:
+        rank = past.groupby('scenario')['timestamp'].rank(method='dense', ascending=False)
+        past = past[rank <= history]
+    return current, past
+
+def detect_regressions(df, timestamp, history=None, checks=None, min_change=MIN_CHANGE,
+                       correction='holm', alpha=ALPHA):
+    """Cada cenário da bateria `timestamp` contra o seu histórico, por métrica
+
+    Retorna uma linha por (métrica, cenário) com as colunas de
+    significance.compare_codes mais `metric` e `regression` (piora
+    significativa maior que `min_change` %). Cenários sem histórico ficam
+    de fora.
+    """
+    checks = CHECKS if checks is None else checks
+    current, past = split_history(df, timestamp, history)
+    runs = pd.concat([current.assign(batch=timestamp), past.assign(batch=HISTORY)], ignore_index=True)
+
+    tables = []
+    for metric, sense in checks.items():
+        if metric not in runs.columns:
+            continue
+        valid = runs.dropna(subset=[metric])
+        table = against_baseline(valid, 'batch', (valid['batch'] == HISTORY).to_numpy(),
+                                 within='scenario', value=metric, correction=correction, alpha=alpha)
+        table = table.rename(columns={'context': 'scenario'})
+        table['reference'] = HISTORY
+        table.insert(0, 'metric', metric)
+        worse = table['diff_pct'] < -min_change if sense == 'max' else table['diff_pct'] > min_change
+        table['regression'] = table['significant'] & worse
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+def default_penalty(values):
+    """Penalidade PENALTY_FACTOR·σ² log n, com σ pelo MAD das diferenças sucessivas
+
+    As diferenças cancelam mudanças de nível (só o salto entra em uma
+    diferença), então σ reflete o ruído entre execuções. NOISE_FLOOR evita
+    penalidade nula em séries quase constantes.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    diffs = np.diff(x)
+    sigma = 1.4826 * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2) if len(diffs) else 0.0
+    sigma = max(sigma, NOISE_FLOOR * abs(np.median(x)))
+    return PENALTY_FACTOR * sigma ** 2 * np.log(len(x))
+
+def _best_split(x, allowed, min_size):
+    """Melhor divisão de um segmento: (índice, redução da soma de quadrados)"""
+    n = len(x)
+    k = np.arange(min_size, n - min_size + 1)
+    k = k[allowed[k]]
+    if len(k) == 0:
+        return None
+    cumulative = np.cumsum(x)
+    total = cumulative[-1]
+    left = cumulative[k - 1]
+    gain = left ** 2 / k + (total - left) ** 2 / (n - k) - total ** 2 / n
+    best = int(np.argmax(gain))
+    return int(k[best]), float(gain[best])
+
+def change_points(values, boundaries=None, penalty=None, min_size=MIN_SEGMENT):
+    """Índices em que a média da série muda (segmentação binária)
+
+    `boundaries` marca (máscara de tamanho n) os índices onde uma mudança
+    pode começar; por padrão, qualquer um. Cada divisão é aceita se reduz
+    a soma de quadrados em mais que `penalty`.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n < 2 * min_size:
+        return []
+    if boundaries is None:
+        allowed = np.ones(n + 1, dtype=bool)
+    else:
+        allowed = np.append(np.asarray(boundaries, dtype=bool), False)
+    penalty = default_penalty(x) if penalty is None else penalty
+
+    points = []
+    segments = [(0, n)]
+    while segments:
+        start, end = segments.pop()
+        split = _best_split(x[start:end], allowed[start:end + 1], min_size)
+        if split is None or split[1] <= penalty:
+            continue
+        points.append(start + split[0])
+        segments += [(start, start + split[0]), (start + split[0], end)]
+    return sorted(points)
+
+def timeline_changes(df, checks=None, min_size=MIN_SEGMENT):
+    """Pontos de mudança da linha do tempo de cada cenário, por métrica
+
+    Uma linha por mudança: cenário, métrica, bateria em que a nova média
+    começa, médias do segmento anterior e do seguinte e variação em %.
+    """
+    checks = CHECKS if checks is None else checks
+    rows = []
+    ordered = df.sort_values(['scenario', 'timestamp', 'repetition'], kind='stable')
+    for scenario, runs in ordered.groupby('scenario', sort=True):
+        for metric in checks:
+            if metric not in runs.columns:
+                continue
+            series = runs.dropna(subset=[metric])
+            values = series[metric].to_numpy(dtype=np.float64)
+            timestamps = series['timestamp'].to_numpy()
+            boundaries = np.concatenate([[False], timestamps[1:] != timestamps[:-1]])
+            points = change_points(values, boundaries, min_size=min_size)
+            edges = [0] + points + [len(values)]
+            for i, point in enumerate(points):
+                before = values[edges[i]:point].mean()
+                after = values[point:edges[i + 2]].mean()
+                rows.append({
+                    'scenario': scenario,
+                    'metric': metric,
+                    'timestamp': timestamps[point],
+                    'previous': timestamps[point - 1],
+                    'before': before,
+                    'after': after,
+                    'change_pct': (after - before) / abs(before) * 100 if before else np.nan,
+                })
+    return pd.DataFrame(rows, columns=['scenario', 'metric', 'timestamp', 'previous',
+                                       'before', 'after', 'change_pct'])
+
+def format_regressions(table, correction='holm'):
+    """Comparações com o histórico em texto alinhado"""
+    lines = [f"{'cenário':<36} {'métrica':<16} {'n':>3} {'n hist.':>7} {'média':>12} "
+             f"{'hist.':>12} {'Δ %':>8} {'p ajust.':>9}  situação"]
+    for _, row in table.iterrows():
+        if row['regression']:
+            status = "REGRESSÃO"
+        elif row['significant']:
+            status = "mudança significativa"
+        else:
+            status = "ok"
+        lines.append(f"{row['scenario']:<36} {row['metric']:<16} {row['n']:>3} {row['n_ref']:>7} "
+                     f"{row['mean']:>12.2f} {row['mean_ref']:>12.2f} {row['diff_pct']:>+8.1f} "
+                     f"{row[f'p_welch_{correction}']:>9.4f}  {status}")
+    return '\n'.join(lines)
+
+def format_changes(changes):
+    """Pontos de mudança em texto alinhado"""
+    lines = [f"{'cenário':<36} {'métrica':<16} {'entre':<33} {'antes':>12} {'depois':>12} {'Δ %':>8}"]
+    for _, row in changes.iterrows():
+        lines.append(f"{row['scenario']:<36} {row['metric']:<16} {row['previous']} -> {row['timestamp']} "
+                     f"{row['before']:>12.2f} {row['after']:>12.2f} {row['change_pct']:>+8.1f}")
+    return '\n'.join(lines)
+
+def load_runs(raw_dir):
+    """Execuções válidas de todas as baterias pelo índice"""
+    from run_index import query_runs, sync_index
+
+    db = sync_index(Path(raw_dir))
+    columns = ['timestamp', 'scenario', 'repetition'] + list(CHECKS)
+    return pd.DataFrame(query_runs(db, columns=columns), columns=columns)
+
+def main():
+    """Compara a bateria mais recente com o histórico; código 1 se houver regressão"""
+    parser = argparse.ArgumentParser(description="Detecção de regressões entre baterias e pontos de mudança")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--timestamp', help="Bateria avaliada (padrão: a mais recente)")
+    parser.add_argument('--history', type=int, help="Baterias anteriores consideradas por cenário (padrão: todas)")
+    parser.add_argument('--min-change', type=float, default=MIN_CHANGE,
+                        help=f"Piora mínima em %% para declarar regressão (padrão: {MIN_CHANGE})")
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--correction', choices=CORRECTIONS, default='holm',
+                        help="Correção para comparações múltiplas (padrão: holm)")
+    parser.add_argument('--json', action='store_true', help="Resultado em JSON na saída padrão")
+    args = parser.parse_args()
+
+    df = load_runs(args.raw_dir)
+    if df.empty:
+        print(f"Nenhuma execução válida em {args.raw_dir}", file=sys.stderr)
+        sys.exit(2)
+    timestamp = args.timestamp or df['timestamp'].max()
+    if timestamp not in set(df['timestamp']):
+        parser.error(f"Bateria sem execuções válidas: {timestamp}")
+
+    table = detect_regressions(df, timestamp, args.history, min_change=args.min_change,
+                               correction=args.correction, alpha=args.alpha)
+    changes = timeline_changes(df[df['timestamp'] <= timestamp])
+    regressions = table[table['regression']] if not table.empty else table
+
+    if args.json:
+        print(json.dumps({
+            'timestamp': timestamp,
+            'regressions': len(regressions),
+            'comparisons': json.loads(table.to_json(orient='records')),
+            'change_points': json.loads(changes.to_json(orient='records')),
+        }, indent=2, ensure_ascii=False))
+    else:
+        print(f"=== Bateria {timestamp} vs histórico ({args.correction}, α = {args.alpha}, "
+              f"piora mínima {args.min_change:.1f}%) ===\n")
+        print(format_regressions(table, args.correction) if not table.empty
+              else "Nenhum cenário desta bateria tem histórico")
+        print("\n=== Pontos de mudança na linha do tempo ===\n")
+        print(format_changes(changes) if not changes.empty else "Nenhuma mudança detectada")
+        print(f"\n{len(regressions)} regressão(ões) em {len(table)} comparações")
+
+    sys.exit(1 if len(regressions) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+"""
+Armazenamento colunar dos resultados (Parquet particionado)
+Os registros do catálogo são gravados em /results/store particionados por
+timestamp da bateria e cenário (layout hive: timestamp=<ts>/scenario=<nome>/).
+As leituras selecionam colunas e partições com filtros empurrados para o
+pyarrow, de modo que uma análise lê apenas o que precisa, mesmo com meses de
+baterias acumuladas.
+"""
+
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from catalog import load_catalog
+from manifest import manifest_dir
+
+STORE_DIR = Path("/results/store")
+
+PARTITION_COLS = ('timestamp', 'scenario')
+
+SCHEMA = pa.schema([
+    ('timestamp', pa.string()),
+    ('scenario', pa.string()),
+    ('repetition', pa.int32()),
+    ('algorithm', pa.string()),
+    ('test_type', pa.string()),
+    ('condition', pa.string()),
+    ('throughput_mbps', pa.float64()),
+    ('retransmits', pa.int64()),
+    ('cpu_sender', pa.float64()),
+    ('cpu_receiver', pa.float64()),
+    ('rtt_ms', pa.float64()),
+    ('num_streams', pa.int32()),
+    ('congestion', pa.string()),
+    ('sock_bufsize', pa.int64()),
+    ('duration', pa.float64()),
+    ('path', pa.string()),
+    ('error', pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([SCHEMA.field(name) for name in PARTITION_COLS]), flavor='hive'
+)
+
+def records_table(records):
+    """Converte registros do catálogo em uma tabela Arrow tipada"""
+    columns = {
+        field.name: [record.get(field.name) for record in records]
+        for field in SCHEMA
+    }
+    return pa.table(columns, schema=SCHEMA)
+
+def write_partitions(records, store_dir=STORE_DIR):
+    """Grava (substituindo) as partições timestamp/cenário dos registros"""
+    if not records:
+        return
+    pq.write_to_dataset(
+        records_table(records),
+        root_path=str(store_dir),
+        partitioning=PARTITIONING,
+        existing_data_behavior='delete_matching',
+        basename_template='part-{i}.parquet',
+    )
+
+def _partition_dir(store_dir, timestamp):
+    return Path(store_dir) / f"timestamp={timestamp}"
+
+def _mtime_ns(path):
+    """mtime de um arquivo, ou None se não existe"""
+    try:
+        return Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+
+def sync_store(raw_dir, store_dir=STORE_DIR, timestamp=None):
+    """Atualiza o armazenamento a partir dos JSONs de `raw_dir`
+
+    Uma bateria é regravada apenas se ainda não existe no armazenamento ou se
+    algum JSON dela (ou o seu manifesto) é mais recente que a partição.
+    Execuções do manifesto sem arquivo de saída não têm mtime e são
+    ignoradas na comparação. Retorna os timestamps regravados.
+    """
+    catalog = load_catalog(raw_dir, timestamp)
+    written = []
+
+    for ts in catalog.values('timestamp', include_errors=True):
+        records = catalog.query(include_errors=True, timestamp=ts)
+        partition = _partition_dir(store_dir, ts)
+        if partition.exists():
+            sources = [r['path'] for r in records] + [manifest_dir(raw_dir) / f"{ts}.jsonl"]
+            newest_raw = max((m for m in map(_mtime_ns, sources) if m is not None), default=0)
+            stored = min((p.stat().st_mtime_ns for p in partition.rglob('*.parquet')), default=0)
+            if stored >= newest_raw:
+                continue
+        write_partitions(records, store_dir)
+        written.append(ts)
+
+    return written
+
+def _criteria_filter(criteria):
+    expression = None
+    for field, wanted in criteria.items():
+        if field not in SCHEMA.names:
+            raise ValueError(f"Coluna inexistente: {field}")
+        if isinstance(wanted, (list, tuple, set, frozenset)):
+            condition = ds.field(field).isin(list(wanted))
+        else:
+            condition = ds.field(field) == wanted
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def read_store(store_dir=STORE_DIR, columns=None, include_errors=False, **criteria):
+    """Lê o armazenamento como DataFrame do pandas
+
+    `columns` limita as colunas lidas e cada critério (valor ou coleção de
+    valores, como em Catalog.query) vira um filtro do pyarrow; filtros sobre
+    timestamp/cenário descartam partições inteiras sem abri-las.
+    """
+    if not Path(store_dir).exists():
+        return SCHEMA.empty_table().select(list(columns or SCHEMA.names)).to_pandas()
+
+    dataset = ds.dataset(str(store_dir), format='parquet', schema=SCHEMA,
+                         partitioning=PARTITIONING)
+    expression = _criteria_filter(criteria)
+    if not include_errors:
+        error_free = ds.field('error').is_null()
+        expression = error_free if expression is None else expression & error_free
+
+    table = dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+    return table.to_pandas()
+
+def main():
+    """Sincroniza o armazenamento com um diretório de JSONs"""
+    raw_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("/results/raw")
+    store_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else STORE_DIR
+
+    written = sync_store(raw_dir, store_dir)
+    print(f"Armazenamento {store_dir}: {len(written)} bateria(s) gravada(s)")
+    for ts in written:
+        print(f"  - {ts}")
+
+if __name__ == "__main__":
+    main()
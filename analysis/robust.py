@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+Estimadores robustos e quarentena de repetições atípicas
+Com 3 repetições por cenário, uma única execução ruim (erro de buffer de
+socket, pico de um vizinho barulhento) desloca média, desvio e CV. Este
+módulo calcula, por grupo e de uma vez sobre a matriz (grupo, amostra):
+- mediana e MAD (escalado por 1,4826, comparável ao desvio padrão);
+- média aparada (TRIM de cada lado);
+- estimador de Hodges–Lehmann (mediana das médias de Walsh);
+- CV robusto (MAD / mediana).
+
+As repetições atípicas são marcadas pelo escore z modificado
+(0,6745·|x - mediana| / MAD, limiar 3,5 de Iglewicz e Hoaglin), com a
+média dos desvios absolutos no lugar do MAD quando este é zero. Só entram
+em quarentena desvios acima de MIN_DEVIATION da mediana e apenas quando
+são minoria no grupo; cada exclusão registra o motivo.
+"""
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import group_matrix
+
+# Fração aparada de cada lado na média aparada (com 3 amostras, nenhuma)
+TRIM = 0.2
+# Limiar do escore z modificado
+THRESHOLD = 3.5
+# Desvio mínimo da mediana (fração) para uma repetição ir para a quarentena; com
+# 3 repetições o MAD é a menor das duas distâncias à mediana e, sozinho,
+# marcaria qualquer trio assimétrico
+MIN_DEVIATION = 0.05
+# Menor grupo em que se procuram repetições atípicas
+MIN_SAMPLES = 3
+
+MAD_SCALE = 1.4826
+
+def _sorted_matrix(df, by, column, sort=True):
+    """Matriz (grupo, amostra) ordenada por linha (NaN no fim), n e códigos"""
+    grouper = df.groupby(by, sort=sort, dropna=False)
+    codes = grouper.ngroup().to_numpy()
+    matrix, n = group_matrix(codes, grouper.ngroups, df[column].to_numpy())
+    return np.sort(matrix, axis=1), n, codes, grouper.size().index
+
+def _median_mad(matrix):
+    """Mediana e MAD (sem escala) por linha, ignorando NaN"""
+    with warnings.catch_warnings():
+        # Grupos sem valores válidos resultam em NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(matrix, axis=1)
+        mad = np.nanmedian(np.abs(matrix - median[:, None]), axis=1)
+    return median, mad
+
+def trimmed_means(matrix, n, trim=TRIM):
+    """Média aparada por linha de uma matriz já ordenada"""
+    cut = np.floor(trim * n).astype(np.int64)
+    position = np.arange(matrix.shape[1])
+    keep = (position >= cut[:, None]) & (position < (n - cut)[:, None])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(keep, matrix, 0.0).sum(axis=1) / keep.sum(axis=1)
+
+def hodges_lehmann(matrix):
+    """Mediana das médias de Walsh (x_i + x_j) / 2, i <= j, por linha"""
+    i, j = np.triu_indices(matrix.shape[1])
+    walsh = (matrix[:, i] + matrix[:, j]) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(walsh, axis=1)
+
+def robust_stats(df, by, columns=('throughput_mbps',), trim=TRIM, sort=True):
+    """Estimadores robustos por grupo
+
+    Retorna um DataFrame com um grupo por linha (mesma ordem de
+    grouped_stats), `samples` e, por coluna, `<coluna>_median`, `_mad`,
+    `_trimmed`, `_hl` e `_rcv` (CV robusto em %).
+    """
+    result, index = {}, None
+    for column in columns:
+        if column not in df.columns:
+            continue
+        matrix, n, _, index = _sorted_matrix(df, by, column, sort)
+        median, mad = _median_mad(matrix)
+        result.setdefault('samples', n)
+        result[f"{column}_median"] = median
+        result[f"{column}_mad"] = MAD_SCALE * mad
+        result[f"{column}_trimmed"] = trimmed_means(matrix, n, trim)
+        result[f"{column}_hl"] = hodges_lehmann(matrix)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[f"{column}_rcv"] = MAD_SCALE * mad / np.abs(median) * 100
+    return pd.DataFrame(result, index=index)
+
+def outlier_scores(df, by, column='throughput_mbps'):
+    """Escore z modificado de cada execução, mediana e tamanho do seu grupo
+    e o código do grupo"""
+    matrix, n, codes, _ = _sorted_matrix(df, by, column)
+    median, mad = _median_mad(matrix)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean_deviation = np.nanmean(np.abs(matrix - median[:, None]), axis=1)
+    # MAD nulo (mais da metade dos valores iguais): média dos desvios (Iglewicz e Hoaglin)
+    scale = np.where(mad > 0, mad / 0.6745, 1.253314 * mean_deviation)
+
+    values = df[column].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score = np.where(scale[codes] > 0, (values - median[codes]) / scale[codes], 0.0)
+    return score, median[codes], n[codes], codes
+
+def flag_outliers(df, by='scenario', columns=('throughput_mbps',), threshold=THRESHOLD,
+                  min_deviation=MIN_DEVIATION):
+    """Máscara das execuções atípicas e o motivo de cada uma
+
+    Uma execução é atípica em uma coluna se |z modificado| > `threshold`,
+    se difere da mediana do grupo em mais que `min_deviation` e se o grupo
+    tem ao menos MIN_SAMPLES valores. Se as atípicas de uma coluna não
+    forem minoria no grupo, nenhuma é marcada (distribuição bimodal, não
+    ruído).
+    """
+    flagged = np.zeros(len(df), dtype=bool)
+    reasons = [[] for _ in range(len(df))]
+    for column in columns:
+        if column not in df.columns:
+            continue
+        score, median, n, codes = outlier_scores(df, by, column)
+        values = df[column].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            far = np.abs(values - median) > min_deviation * np.abs(median)
+        outlier = (np.abs(score) > threshold) & far & (n >= MIN_SAMPLES)
+        count = np.bincount(codes[outlier], minlength=codes.max(initial=-1) + 1)
+        outlier &= 2 * count[codes] < n
+        for i in np.flatnonzero(outlier):
+            side = "acima" if score[i] > 0 else "abaixo"
+            reasons[i].append(f"{column} = {values[i]:.2f}, {abs(score[i]):.1f} MAD {side} "
+                              f"da mediana {median[i]:.2f}")
+        flagged |= outlier
+    return flagged, ['; '.join(reason) for reason in reasons]
+
+def quarantine(df, by='scenario', columns=('throughput_mbps',), threshold=THRESHOLD,
+               min_deviation=MIN_DEVIATION):
+    """Separa as execuções atípicas: (mantidas, quarentena com `reason`)"""
+    flagged, reasons = flag_outliers(df, by, columns, threshold, min_deviation)
+    excluded = df[flagged].assign(reason=[reason for reason, bad in zip(reasons, flagged) if bad])
+    return df[~flagged].reset_index(drop=True), excluded.reset_index(drop=True)
+
+def main():
+    """Estimadores robustos e quarentena das execuções de um diretório"""
+    parser = argparse.ArgumentParser(description="Estimadores robustos e quarentena de repetições atípicas")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--timestamp', help="Somente esta bateria (padrão: todas)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f"Limiar do escore z modificado (padrão: {THRESHOLD})")
+    args = parser.parse_args()
+
+    from run_index import query_runs, sync_index
+
+    db = sync_index(args.raw_dir)
+    filters = {'timestamp': args.timestamp} if args.timestamp else {}
+    columns = ['timestamp', 'scenario', 'repetition', 'throughput_mbps']
+    df = pd.DataFrame(query_runs(db, columns=columns, **filters), columns=columns)
+    if df.empty:
+        print(f"Nenhuma execução válida em {args.raw_dir}")
+        sys.exit(1)
+
+    kept, excluded = quarantine(df, ['timestamp', 'scenario'], threshold=args.threshold)
+    stats = robust_stats(kept, ['timestamp', 'scenario'])
+    print(f"{'bateria':<16} {'cenário':<36} {'n':>3} {'mediana':>12} {'MAD':>10} "
+          f"{'aparada':>12} {'HL':>12} {'CV rob. %':>9}")
+    for (timestamp, scenario), row in stats.iterrows():
+        print(f"{timestamp:<16} {scenario:<36} {row['samples']:>3.0f} {row['throughput_mbps_median']:>12.2f} "
+              f"{row['throughput_mbps_mad']:>10.2f} {row['throughput_mbps_trimmed']:>12.2f} "
+              f"{row['throughput_mbps_hl']:>12.2f} {row['throughput_mbps_rcv']:>9.1f}")
+
+    print(f"\n{len(excluded)} execução(ões) em quarentena de {len(df)}")
+    for _, row in excluded.iterrows():
+        print(f"  {row['timestamp']} {row['scenario']} rep{row['repetition']}: {row['reason']}")
+
+if __name__ == "__main__":
+    main()
@@ -27,12 +27,9 @@ fi
 # Mudar para o diretório da aplicação
 cd /app
 
-# Executar coleta de resultados
-print_info "Coletando resultados..."
-bash ./collect-results.sh "$@"
-
-# Executar análise e geração de gráficos
-print_info "Gerando análises e visualizações..."
-uv run python analyze.py "$@"
+# Coleta e análise pelo grafo de etapas (pipeline.py): só as etapas
+# cujas entradas mudaram são executadas
+print_info "Coletando resultados e gerando análises e visualizações..."
+uv run python pipeline.py ${1:+--timestamp "$1"} collect analyze
 
 print_success "Análise completa! Verifique os resultados em /results/"
\ No newline at end of file
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""
+Índice SQLite das execuções de todas as baterias
+Guarda, para cada JSON, os parâmetros do teste (algoritmo, janela, fluxos,
+latência, banda, perda) e as métricas principais, de modo que consultas como
+"todas as execuções BBR com janela de 256K sob 100 ms de latência" e seus
+agregados saem em milissegundos, sem varrer diretórios nem reinterpretar
+nomes de arquivo.
+
+O índice é alimentado na ingestão (ingest.py) e pelo próprio CLI, que
+reindexa o diretório antes de cada consulta (exceto com --no-sync).
+Usa apenas a biblioteca padrão.
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from catalog import load_catalog
+
+INDEX_NAME = "index.sqlite"
+
+# Coluna -> tipo SQLite (a ordem define a ordem das colunas da tabela)
+COLUMNS = {
+    'path': 'TEXT PRIMARY KEY',
+    'timestamp': 'TEXT',
+    'scenario': 'TEXT',
+    'repetition': 'INTEGER',
+    'algorithm': 'TEXT',
+    'test_type': 'TEXT',
+    'condition': 'TEXT',
+    # Parâmetros
+    'window_kb': 'REAL',
+    'streams': 'INTEGER',
+    'latency_ms': 'REAL',
+    'bandwidth_mbit': 'REAL',
+    'loss_pct': 'REAL',
+    'duration': 'REAL',
+    # Métricas
+    'throughput_mbps': 'REAL',
+    'retransmits': 'INTEGER',
+    'cpu_sender': 'REAL',
+    'cpu_receiver': 'REAL',
+    'rtt_ms': 'REAL',
+    'congestion': 'TEXT',
+    'error': 'TEXT',
+}
+
+# Parâmetros codificados nos nomes dos cenários (window_256K, latency_50ms,
+# bandwidth_10mbit, vegas_band10mbps, packet_loss_1%, reno_loss0.5, bbr_8streams...)
+PARAM_PATTERNS = {
+    'window_kb': re.compile(r'(?:^|_|window)(\d+)k(?:b)?(?=_|$)'),
+    'streams': re.compile(r'(\d+)_?streams|streams_?(\d+)'),
+    'latency_ms': re.compile(r'(\d+(?:\.\d+)?)ms(?=_|$)'),
+    'bandwidth_mbit': re.compile(r'(\d+(?:\.\d+)?)(?:mbit|mbps)(?=_|$)'),
+    'loss_pct': re.compile(r'loss_?(\d+(?:\.\d+)?)%?(?=_|$)'),
+}
+
+SCENARIO_ID_RE = re.compile(r'^(scenario_\d+)_')
+
+_OPERATORS = {'min': '>=', 'max': '<=', 'like': 'LIKE'}
+
+def default_index_path(raw_dir):
+    """Índice padrão de um diretório de resultados brutos"""
+    return Path(raw_dir).resolve().parent / INDEX_NAME
+
+_SIZE_UNITS = {'k': 1, 'm': 1024, 'g': 1024 * 1024}
+
+def _window_kb(size):
+    """Tamanho de janela no formato do iperf3 (64K, 1M...) em KB"""
+    if not size:
+        return None
+    size = str(size).strip().lower()
+    if size[-1] in _SIZE_UNITS:
+        return float(size[:-1]) * _SIZE_UNITS[size[-1]]
+    return float(size) / 1024
+
+def load_scenario_params(scenarios_dir):
+    """Parâmetros das definições scenario_N_*.json, indexados por 'scenario_N'"""
+    params = {}
+    for scenario_file in sorted(Path(scenarios_dir).glob("scenario_*.json")):
+        with open(scenario_file) as f:
+            config = json.load(f)
+        match = SCENARIO_ID_RE.match(config['name'])
+        if not match:
+            continue
+        tcp = config.get('tcp_settings', {})
+        network = config.get('network_conditions', {})
+        params[match.group(1)] = {
+            'algorithm': tcp.get('congestion_control'),
+            'window_kb': _window_kb(tcp.get('window_size')),
+            'streams': tcp.get('parallel_streams'),
+            'latency_ms': network.get('latency_ms'),
+            'bandwidth_mbit': network.get('bandwidth_mbps'),
+            'loss_pct': network.get('packet_loss_percent'),
+        }
+    return params
+
+def scenario_params(scenario, scenario_configs=None):
+    """Deriva os parâmetros do teste a partir do nome do cenário"""
+    name = scenario.lower()
+    params = {}
+    for column, pattern in PARAM_PATTERNS.items():
+        match = pattern.search(name)
+        if match:
+            value = next(g for g in match.groups() if g is not None)
+            params[column] = int(value) if column == 'streams' else float(value)
+
+    match = SCENARIO_ID_RE.match(name)
+    if match and scenario_configs and match.group(1) in scenario_configs:
+        params.update({k: v for k, v in scenario_configs[match.group(1)].items() if v is not None})
+    return params
+
+def index_row(record, scenario_configs=None):
+    """Linha do índice para um registro do catálogo"""
+    row = {column: record.get(column) for column in COLUMNS}
+    params = scenario_params(record['scenario'], scenario_configs)
+    row.update(params)
+    if row['streams'] is None:
+        row['streams'] = record.get('num_streams') or None
+    return row
+
+def connect(index_path):
+    """Abre (criando se necessário) o índice"""
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(index_path)
+    db.row_factory = sqlite3.Row
+    columns = ', '.join(f"{name} {kind}" for name, kind in COLUMNS.items())
+    db.execute(f"CREATE TABLE IF NOT EXISTS runs ({columns})")
+    for column in ('timestamp', 'algorithm', 'test_type', 'scenario'):
+        db.execute(f"CREATE INDEX IF NOT EXISTS runs_{column} ON runs ({column})")
+    return db
+
+def index_records(db, records, scenario_configs=None):
+    """Insere ou atualiza as execuções no índice"""
+    names = list(COLUMNS)
+    placeholders = ', '.join('?' for _ in names)
+    with db:
+        db.executemany(
+            f"INSERT OR REPLACE INTO runs ({', '.join(names)}) VALUES ({placeholders})",
+            ([index_row(r, scenario_configs)[n] for n in names] for r in records),
+        )
+
+def sync_index(raw_dir, index_path=None, scenarios_dir=None, timestamp=None):
+    """Indexa os JSONs de `raw_dir` (via catálogo/cache) e retorna a conexão
+
+    Com `timestamp`, só aquela bateria é (re)indexada, resolvida pelo
+    manifesto quando houver. Entradas de arquivos removidos são apagadas.
+    """
+    raw_dir = Path(raw_dir).resolve()
+    db = connect(index_path or default_index_path(raw_dir))
+    catalog = load_catalog(raw_dir, timestamp)
+    configs = load_scenario_params(scenarios_dir) if scenarios_dir else None
+
+    index_records(db, catalog.records, configs)
+    current = {r['path'] for r in catalog.records}
+    where, params = "substr(path, 1, ?) = ?", [len(str(raw_dir)) + 1, f"{raw_dir}/"]
+    if timestamp:
+        where += " AND timestamp = ?"
+        params.append(timestamp)
+    stale = [
+        row['path'] for row in db.execute(f"SELECT path FROM runs WHERE {where}", params)
+        if row['path'] not in current
+    ]
+    with db:
+        db.executemany("DELETE FROM runs WHERE path = ?", ((p,) for p in stale))
+    return db
+
+def _where(include_errors, filters):
+    """Cláusula WHERE a partir de filtros campo=valor, campo=(valores),
+    campo__min, campo__max e campo__like"""
+    clauses, params = [], []
+    if not include_errors:
+        clauses.append("error IS NULL")
+    for key, value in filters.items():
+        column, _, op = key.partition('__')
+        if column not in COLUMNS:
+            raise ValueError(f"Coluna inexistente: {column}")
+        if op:
+            if op not in _OPERATORS:
+                raise ValueError(f"Operador desconhecido: {op}")
+            clauses.append(f"{column} {_OPERATORS[op]} ?")
+            params.append(value)
+        elif value is None:
+            clauses.append(f"{column} IS NULL")
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+def query_runs(db, columns=None, include_errors=False, **filters):
+    """Execuções que atendem aos filtros, como lista de dicionários
+
+    Exemplo: query_runs(db, algorithm='bbr', window_kb=256, latency_ms__min=100)
+    """
+    selected = ', '.join(columns) if columns else '*'
+    where, params = _where(include_errors, filters)
+    rows = db.execute(
+        f"SELECT {selected} FROM runs{where} ORDER BY timestamp, scenario, repetition", params
+    )
+    return [dict(row) for row in rows]
+
+def aggregate(db, group_by=('scenario',), metric='throughput_mbps', **filters):
+    """Contagem, média, desvio padrão, mínimo e máximo de uma métrica por grupo"""
+    for column in (metric, *group_by):
+        if column not in COLUMNS:
+            raise ValueError(f"Coluna inexistente: {column}")
+    groups = ', '.join(group_by)
+    where, params = _where(False, filters)
+    rows = db.execute(
+        f"SELECT {groups}, COUNT({metric}) AS n, AVG({metric}) AS mean, "
+        f"SUM({metric} * {metric}) AS sumsq, MIN({metric}) AS min, MAX({metric}) AS max "
+        f"FROM runs{where} GROUP BY {groups} ORDER BY {groups}", params
+    )
+
+    result = []
+    for row in rows:
+        row = dict(row)
+        n, mean, sumsq = row.pop('n'), row['mean'], row.pop('sumsq')
+        variance = (sumsq - n * mean * mean) / (n - 1) if n > 1 else 0.0
+        row['count'] = n
+        row['std'] = math.sqrt(max(variance, 0.0))
+        result.append(row)
+    return result
+
+def latest_timestamp(db, **filters):
+    """Timestamp mais recente entre as execuções que atendem aos filtros"""
+    where, params = _where(False, filters)
+    row = db.execute(f"SELECT MAX(timestamp) FROM runs{where}", params).fetchone()
+    return row[0]
+
+def _parse_value(text):
+    # int()/float() aceitam '_' como separador, o que quebraria timestamps
+    if '_' in text:
+        return text
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def main():
+    """Sincroniza o índice e consulta execuções por parâmetros"""
+    parser = argparse.ArgumentParser(
+        description="Índice SQLite das execuções do iperf3",
+        epilog="Filtros: campo=valor, campo=v1,v2, campo__min=x, campo__max=x, campo__like=padrão. "
+               f"Campos: {', '.join(COLUMNS)}",
+    )
+    parser.add_argument('filters', nargs='*', help="Filtros da consulta")
+    parser.add_argument('--raw-dir', type=Path, default=Path("/results/raw"))
+    parser.add_argument('--index', type=Path, help="Arquivo do índice (padrão: <raw-dir>/../index.sqlite)")
+    parser.add_argument('--scenarios-dir', type=Path, help="Definições scenario_N_*.json")
+    parser.add_argument('--no-sync', action='store_true', help="Consultar sem reindexar o diretório")
+    parser.add_argument('--group-by', help="Agregar por estas colunas (separadas por vírgula)")
+    parser.add_argument('--metric', default='throughput_mbps', help="Métrica agregada")
+    args = parser.parse_args()
+
+    index_path = args.index or default_index_path(args.raw_dir)
+    if args.no_sync:
+        db = connect(index_path)
+    else:
+        db = sync_index(args.raw_dir, index_path, args.scenarios_dir)
+
+    filters = {}
+    for item in args.filters:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"Filtro inválido: {item}")
+        values = [_parse_value(v) for v in value.split(',')]
+        filters[key] = values if len(values) > 1 else values[0]
+
+    if args.group_by:
+        try:
+            rows = aggregate(db, tuple(args.group_by.split(',')), args.metric, **filters)
+        except ValueError as e:
+            parser.error(str(e))
+        for row in rows:
+            keys = ' '.join(f"{g}={row[g]}" for g in args.group_by.split(','))
+            print(f"{keys}: n={row['count']} média={row['mean']:.2f} dp={row['std']:.2f} "
+                  f"min={row['min']:.2f} max={row['max']:.2f}")
+        return
+
+    rows = query_runs(db, columns=('timestamp', 'scenario', 'repetition', 'algorithm', 'window_kb',
+                                   'streams', 'latency_ms', 'bandwidth_mbit', 'loss_pct',
+                                   'throughput_mbps', 'retransmits'), **filters)
+    for row in rows:
+        print(' '.join(f"{k}={v}" for k, v in row.items() if v is not None))
+    print(f"{len(rows)} execução(ões)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
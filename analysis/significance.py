@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+"""
+Testes de significância entre cenários
+"+20% sobre o baseline" com 3 repetições pode ser só ruído. Este módulo
+compara grupos de execuções (cenário contra o baseline do mesmo algoritmo,
+ou cada par de algoritmos sob a mesma condição) com:
+- teste t de Welch (variâncias diferentes);
+- Mann–Whitney U (exato para grupos pequenos sem empates; aproximação
+  normal com correção de empates e de continuidade nos demais);
+- tamanhos de efeito: g de Hedges e delta de Cliff;
+- correção para comparações múltiplas (Holm e Benjamini–Hochberg) dentro
+  de cada família de comparações.
+
+Todos os pares são avaliados de uma vez sobre a matriz (grupo, amostra),
+sem laço por par. Uma diferença só é declarada significativa quando o
+p-valor do teste de Welch corrigido fica abaixo de ALPHA.
+"""
+
+import argparse
+import sys
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, stdtr
+
+from stats_engine import group_matrix
+
+ALPHA = 0.05
+CORRECTIONS = ('holm', 'bh')
+# O Mann–Whitney usa a distribuição exata (sem empates) quando o menor
+# grupo tem até EXACT_MAX execuções, como o scipy
+EXACT_MAX = 8
+
+def holm(p):
+    """P-valores ajustados por Holm–Bonferroni (NaN é ignorado)"""
+    p = np.asarray(p, dtype=np.float64)
+    adjusted = np.full_like(p, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    if len(valid):
+        order = valid[np.argsort(p[valid], kind='stable')]
+        m = len(order)
+        steps = (m - np.arange(m)) * p[order]
+        adjusted[order] = np.minimum(np.maximum.accumulate(steps), 1.0)
+    return adjusted
+
+def benjamini_hochberg(p):
+    """P-valores ajustados por Benjamini–Hochberg (taxa de falsas descobertas)"""
+    p = np.asarray(p, dtype=np.float64)
+    adjusted = np.full_like(p, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    if len(valid):
+        order = valid[np.argsort(p[valid], kind='stable')]
+        m = len(order)
+        steps = p[order] * m / np.arange(1, m + 1)
+        adjusted[order] = np.minimum(np.minimum.accumulate(steps[::-1])[::-1], 1.0)
+    return adjusted
+
+def adjust(p, method='holm'):
+    """P-valores ajustados por 'holm' ou 'bh'"""
+    if method == 'holm':
+        return holm(p)
+    if method == 'bh':
+        return benjamini_hochberg(p)
+    raise ValueError(f"Correção desconhecida: {method}")
+
+@lru_cache(maxsize=None)
+def _u_cdf(m, n):
+    """Distribuição acumulada exata de U para grupos de tamanhos m e n
+
+    Conta as ordenações pela recorrência f(u; m, n) = f(u - n; m - 1, n) +
+    f(u; m, n - 1).
+    """
+    counts = [[None] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        for j in range(n + 1):
+            if i == 0 or j == 0:
+                counts[i][j] = np.ones(1)
+                continue
+            current = np.zeros(i * j + 1)
+            previous = counts[i][j - 1]
+            current[:len(previous)] += previous
+            shifted = counts[i - 1][j]
+            current[j:j + len(shifted)] += shifted
+            counts[i][j] = current
+    total = counts[m][n]
+    return np.cumsum(total) / total.sum()
+
+def _welch(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """Estatística t, graus de liberdade e p-valor bilateral de Welch"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se_a, se_b = var_a / n_a, var_b / n_b
+        se = np.sqrt(se_a + se_b)
+        t = (mean_a - mean_b) / se
+        dof = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+        p = 2 * stdtr(dof, -np.abs(t))
+    # Sem variância nos dois grupos: médias iguais (p = 1) ou diferentes (p = 0)
+    constant = (se == 0) & (n_a > 1) & (n_b > 1)
+    p = np.where(constant, np.where(mean_a == mean_b, 1.0, 0.0), p)
+    return t, dof, p
+
+def _mann_whitney(a, b, n_a, n_b):
+    """U do primeiro grupo e p-valor bilateral para matrizes (par, amostra)"""
+    greater = (a[:, :, None] > b[:, None, :]).sum(axis=(1, 2))
+    equal = (a[:, :, None] == b[:, None, :]).sum(axis=(1, 2))
+    u = greater + 0.5 * equal
+
+    # Empates no grupo combinado: Σ(t³ - t) por valor = Σ(t² - 1) por elemento
+    combined = np.concatenate([a, b], axis=1)
+    repeats = (combined[:, :, None] == combined[:, None, :]).sum(axis=2)
+    ties = np.where(np.isnan(combined), 0, repeats ** 2 - 1).sum(axis=1)
+
+    total = n_a + n_b
+    mu = n_a * n_b / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(n_a * n_b / 12 * ((total + 1) - ties / (total * (total - 1))))
+        z = np.maximum(np.abs(u - mu) - 0.5, 0) / sigma
+    p = np.minimum(2 * ndtr(-z), 1.0)
+
+    # Distribuição exata por combinação de tamanhos (poucas combinações distintas)
+    exact = (ties == 0) & (n_a > 0) & (n_b > 0) & (np.minimum(n_a, n_b) <= EXACT_MAX)
+    for m, n in set(zip(n_a[exact].tolist(), n_b[exact].tolist())):
+        rows = exact & (n_a == m) & (n_b == n)
+        cdf = _u_cdf(m, n)
+        k = u[rows].astype(np.int64)
+        lower = cdf[k]
+        upper = 1 - np.where(k > 0, cdf[np.maximum(k - 1, 0)], 0.0)
+        p[rows] = np.minimum(2 * np.minimum(lower, upper), 1.0)
+
+    p = np.where((n_a == 0) | (n_b == 0), np.nan, p)
+    return u, p
+
+def compare_codes(codes, groups, values, first, second, correction='holm', alpha=ALPHA):
+    """Compara os pares de grupos (first[i], second[i]) de uma vez
+
+    `codes` associa cada valor a um grupo em [0, groups). Retorna um
+    DataFrame com uma linha por par, na mesma ordem de `first`/`second`.
+    """
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    matrix, n = group_matrix(codes, groups, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(matrix, axis=1) if groups else np.empty(0)
+        var = np.where(n > 1, np.nansum((matrix - mean[:, None]) ** 2, axis=1) / (n - 1), np.nan)
+
+    a, b = matrix[first], matrix[second]
+    n_a, n_b = n[first], n[second]
+    mean_a, mean_b = mean[first], mean[second]
+    var_a, var_b = var[first], var[second]
+
+    t, dof, p_welch = _welch(mean_a, var_a, n_a, mean_b, var_b, n_b)
+    u, p_mw = _mann_whitney(a, b, n_a, n_b)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled = np.sqrt(((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2))
+        hedges = (1 - 3 / (4 * (n_a + n_b) - 9)) * (mean_a - mean_b) / pooled
+        cliffs = 2 * u / (n_a * n_b) - 1
+        diff_pct = (mean_a - mean_b) / np.abs(mean_b) * 100
+
+    table = pd.DataFrame({
+        'n': n_a, 'n_ref': n_b,
+        'mean': mean_a, 'mean_ref': mean_b,
+        'diff_pct': diff_pct,
+        't': t, 'dof': dof, 'p_welch': p_welch,
+        'u': u, 'p_mw': p_mw,
+        'hedges_g': hedges, 'cliffs_delta': cliffs,
+    })
+    for method in CORRECTIONS:
+        table[f'p_welch_{method}'] = adjust(p_welch, method)
+        table[f'p_mw_{method}'] = adjust(p_mw, method)
+    table['significant'] = table[f'p_welch_{correction}'] < alpha
+    return table
+
+def _label(key):
+    """Rótulo legível de uma chave de grupo (tupla -> 'a/b')"""
+    if isinstance(key, tuple):
+        return '/'.join(str(part) for part in key)
+    return str(key)
+
+def against_baseline(df, by, is_baseline, within=(), value='throughput_mbps',
+                     correction='holm', alpha=ALPHA):
+    """Cada grupo de `by` contra as execuções de baseline com os mesmos `within`
+
+    `is_baseline` marca (máscara booleana) as execuções de referência; elas
+    formam um grupo de referência por chave `within` e não são comparadas
+    consigo mesmas. Ex.: cada cenário contra o baseline do seu algoritmo com
+    by='scenario', within=('algorithm',).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    within = [within] if isinstance(within, str) else list(within)
+    is_baseline = np.asarray(is_baseline, dtype=bool)
+    tested, reference = df[~is_baseline], df[is_baseline]
+
+    tested_groups = tested.groupby(within + by, sort=True, dropna=False)
+    reference_groups = reference.groupby(within, sort=True, dropna=False) if within else None
+    tested_keys = list(tested_groups.size().index)
+    if within:
+        reference_keys = list(reference_groups.size().index)
+        reference_codes = reference_groups.ngroup().to_numpy()
+    else:
+        reference_keys = [()]
+        reference_codes = np.zeros(len(reference), dtype=np.int64)
+
+    # Códigos: grupos testados primeiro, referências depois
+    offset = len(tested_keys)
+    codes = np.concatenate([tested_groups.ngroup().to_numpy(), offset + reference_codes])
+    values = np.concatenate([tested[value].to_numpy(dtype=np.float64),
+                             reference[value].to_numpy(dtype=np.float64)])
+
+    position = {key if isinstance(key, tuple) else (key,): i for i, key in enumerate(reference_keys)}
+    first, second, labels, contexts = [], [], [], []
+    for i, key in enumerate(tested_keys):
+        key = key if isinstance(key, tuple) else (key,)
+        j = position.get(key[:len(within)])
+        if j is None:
+            continue
+        first.append(i)
+        second.append(offset + j)
+        labels.append(_label(key[len(within):] if len(by) > 1 else key[len(within)]))
+        contexts.append(_label(key[:len(within)]))
+
+    table = compare_codes(codes, offset + len(reference_keys), values, first, second, correction, alpha)
+    table.insert(0, 'reference', 'baseline')
+    table.insert(0, 'group', labels)
+    table.insert(0, 'context', contexts)
+    return table
+
+def pairwise(df, key, within=(), value='throughput_mbps', correction='holm', alpha=ALPHA):
+    """Todos os pares de valores de `key` (ex.: algoritmos) com os mesmos `within`
+
+    Cada par é orientado de modo que `group` tenha a maior média.
+    """
+    within = [within] if isinstance(within, str) else list(within)
+    grouper = df.groupby(within + [key], sort=True, dropna=False)
+    keys = [k if isinstance(k, tuple) else (k,) for k in grouper.size().index]
+    codes = grouper.ngroup().to_numpy()
+    values = df[value].to_numpy(dtype=np.float64)
+
+    by_context = {}
+    for i, k in enumerate(keys):
+        by_context.setdefault(k[:-1], []).append(i)
+    pairs = [pair for members in by_context.values() for pair in combinations(members, 2)]
+
+    first = np.array([i for i, _ in pairs], dtype=np.int64)
+    second = np.array([j for _, j in pairs], dtype=np.int64)
+    if len(pairs):
+        means = grouped_means(codes, len(keys), values)
+        swap = means[second] > means[first]
+        first, second = np.where(swap, second, first), np.where(swap, first, second)
+
+    table = compare_codes(codes, len(keys), values, first, second, correction, alpha)
+    table.insert(0, 'reference', [_label(keys[j][-1]) for j in second])
+    table.insert(0, 'group', [_label(keys[i][-1]) for i in first])
+    table.insert(0, 'context', [_label(keys[i][:-1]) for i in first])
+    return table
+
+def grouped_means(codes, groups, values):
+    """Média por grupo ignorando NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    count = np.bincount(codes[valid], minlength=groups)
+    total = np.bincount(codes[valid], weights=values[valid], minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+def ranked(table, correction='holm'):
+    """Comparações ordenadas: significativas primeiro, depois pela diferença"""
+    return table.sort_values(['significant', 'diff_pct', f'p_welch_{correction}'],
+                             ascending=[False, False, True], kind='stable').reset_index(drop=True)
+
+def verdict(row):
+    """Conclusão de uma comparação em texto curto"""
+    if not row['significant']:
+        return "sem diferença significativa"
+    return "maior" if row['diff_pct'] > 0 else "menor"
+
+def format_table(table, correction='holm', context=False):
+    """Tabela de comparações em texto alinhado"""
+    prefix = (lambda text: f"{text:<14} ") if context else (lambda text: "")
+    lines = [prefix('contexto') +
+             f"{'grupo':<28} {'referência':<12} {'n':>3} {'Δ %':>8} {'p Welch':>9} "
+             f"{'p ajust.':>9} {'p MW':>7} {'g':>7} {'δ':>6}  conclusão"]
+    for _, row in table.iterrows():
+        lines.append(prefix(row['context'] if context else '') +
+                     f"{row['group']:<28} {row['reference']:<12} {row['n']:>3} {row['diff_pct']:>+8.1f} "
+                     f"{row['p_welch']:>9.4f} {row[f'p_welch_{correction}']:>9.4f} {row['p_mw']:>7.3f} "
+                     f"{row['hedges_g']:>7.2f} {row['cliffs_delta']:>+6.2f}  {verdict(row)}")
+    return '\n'.join(lines)
+
+def load_runs(raw_dir, timestamp=None, value='throughput_mbps'):
+    """Execuções válidas (algoritmo, tipo de teste, cenário e métrica) pelo índice"""
+    from run_index import query_runs, sync_index
+
+    db = sync_index(Path(raw_dir))
+    filters = {'timestamp': timestamp} if timestamp else {}
+    columns = ['timestamp', 'scenario', 'algorithm', 'test_type', value]
+    return pd.DataFrame(query_runs(db, columns=columns, **filters), columns=columns)
+
+def main():
+    """Cenários contra o baseline do seu algoritmo e algoritmos par a par"""
+    parser = argparse.ArgumentParser(description="Testes de significância (Welch, Mann–Whitney, Holm/BH)")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/atv2/results/raw"))
+    parser.add_argument('--timestamp', help="Somente esta bateria (padrão: todas)")
+    parser.add_argument('--metric', default='throughput_mbps', help="Métrica comparada")
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--correction', choices=CORRECTIONS, default='holm',
+                        help="Correção para comparações múltiplas (padrão: holm)")
+    parser.add_argument('--csv', type=Path, help="Grava as duas tabelas neste CSV")
+    args = parser.parse_args()
+
+    df = load_runs(args.raw_dir, args.timestamp, args.metric)
+    df = df.dropna(subset=['algorithm', args.metric])
+    if df.empty:
+        print(f"Nenhuma execução válida em {args.raw_dir}")
+        sys.exit(1)
+
+    vs_baseline = ranked(against_baseline(df, 'scenario', (df['test_type'] == 'baseline').to_numpy(),
+                                          within='algorithm', value=args.metric,
+                                          correction=args.correction, alpha=args.alpha), args.correction)
+    algorithms = ranked(pairwise(df.dropna(subset=['test_type']), 'algorithm', within='test_type',
+                                 value=args.metric, correction=args.correction, alpha=args.alpha),
+                        args.correction)
+
+    print(f"=== Cenários vs baseline do algoritmo ({args.metric}, {args.correction}, α = {args.alpha}) ===\n")
+    print(format_table(vs_baseline, args.correction, context=True))
+    print(f"\n=== Algoritmos par a par por tipo de teste ({args.correction}, α = {args.alpha}) ===\n")
+    print(format_table(algorithms, args.correction, context=True))
+
+    if args.csv:
+        combined = pd.concat([vs_baseline.assign(family='baseline'),
+                              algorithms.assign(family='algorithms')], ignore_index=True)
+        combined.to_csv(args.csv, index=False)
+        print(f"\nComparações salvas em: {args.csv}")
+
+if __name__ == "__main__":
+    main()
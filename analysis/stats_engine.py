@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Estatísticas agrupadas vetorizadas
+Calcula média, desvio padrão, mínimo, máximo, soma, percentis e coeficiente
+de variação de várias colunas para qualquer chave de agrupamento, sem
+filtrar o DataFrame por grupo. Somas e momentos saem de np.bincount sobre
+os códigos de grupo. Mínimo, máximo e percentis saem de uma única ordenação
+por (grupo, valor), feita apenas quando algum deles é pedido.
+
+Usado por analyze.py, analyze-atv2.py, analyze-complete.py, pelo resumo
+gerado em collect-results.sh (ingest.py) e, pela matriz (grupo, amostra),
+por bootstrap.py e significance.py.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Estatísticas aceitas além dos percentis 'pNN' (ex.: 'p95', 'p99.9')
+STATS = ('count', 'mean', 'std', 'min', 'max', 'sum', 'cv', 'median')
+
+# Resumo padrão das execuções do iperf3
+DEFAULT_SPEC = {
+    'throughput_mbps': ('mean', 'std', 'min', 'max', 'p50', 'p95', 'cv'),
+    'retransmits': ('mean', 'sum'),
+    'cpu_sender': ('mean',),
+    'cpu_receiver': ('mean',),
+    'rtt_ms': ('mean',),
+}
+
+_PERCENTILE = re.compile(r'p(\d+(?:\.\d+)?)$')
+
+def percentile_rank(stat):
+    """Percentil (0-100) de uma estatística 'pNN' ou 'median', ou None"""
+    if stat == 'median':
+        return 50.0
+    match = _PERCENTILE.match(stat)
+    return float(match.group(1)) if match else None
+
+def _group_order(codes, groups, values):
+    """Permutação que ordena por (grupo, valor), com NaN no fim de cada grupo
+
+    Ordena os valores e depois os grupos com ordenação estável; com menos de
+    65536 grupos os códigos cabem em 16 bits e o NumPy usa radix sort nessa
+    segunda etapa, bem mais rápido que np.lexsort.
+    """
+    if groups >= 1 << 16:
+        return np.lexsort((values, codes))
+    order = np.argsort(values)
+    return order[np.argsort(codes[order].astype(np.uint16), kind='stable')]
+
+def _column_stats(codes, groups, values, stats):
+    """Estatísticas de uma coluna já associada aos códigos de grupo
+
+    NaN é ignorado, como no pandas; grupos sem valores resultam em NaN
+    (soma e contagem em 0).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+
+    size = np.bincount(codes, minlength=groups)
+    start = np.cumsum(size) - size
+    count = np.bincount(codes, weights=valid, minlength=groups)
+    total = np.bincount(codes, weights=np.where(valid, values, 0.0), minlength=groups)
+
+    n = count.astype(np.int64)
+    empty = n == 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+
+    ordered = None
+
+    def at(offset):
+        """Valor ordenado em start + offset (NaN nos grupos vazios)"""
+        nonlocal ordered
+        if ordered is None:
+            # Ordenação única por (grupo, valor), só se algum pedido depender dela
+            ordered = values[_group_order(codes, groups, values)]
+        index = np.where(empty, 0, start + offset)
+        result = ordered[index] if len(ordered) else np.full(groups, np.nan)
+        return np.where(empty, np.nan, result)
+
+    std = None
+    out = {}
+    for stat in stats:
+        if stat == 'count':
+            out[stat] = n
+        elif stat == 'mean':
+            out[stat] = mean
+        elif stat == 'sum':
+            out[stat] = total
+        elif stat == 'min':
+            out[stat] = at(0)
+        elif stat == 'max':
+            out[stat] = at(n - 1)
+        elif stat in ('std', 'cv'):
+            if std is None:
+                # Duas passadas (média, depois desvios): estável numericamente
+                deviation = np.where(valid, values - mean[codes], 0.0)
+                squares = np.bincount(codes, weights=deviation ** 2, minlength=groups)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    std = np.where(n > 1, np.sqrt(squares / (n - 1)), np.nan)
+            if stat == 'std':
+                out[stat] = std
+            else:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    out[stat] = std / mean * 100
+        else:
+            q = percentile_rank(stat)
+            if q is None or not 0 <= q <= 100:
+                raise ValueError(f"Estatística desconhecida: {stat}")
+            # Interpolação linear entre vizinhos (mesmo método do pandas)
+            position = q / 100 * np.maximum(n - 1, 0)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            fraction = position - lower
+            out[stat] = at(lower) + (at(upper) - at(lower)) * fraction
+    return out
+
+def group_matrix(codes, groups, values):
+    """Valores válidos de cada grupo em uma matriz (grupo, amostra) com NaN
+
+    Retorna a matriz e o número de valores de cada grupo; as linhas mantêm a
+    ordem de aparição dentro do grupo.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    n = np.bincount(codes, minlength=groups)
+    order = np.argsort(codes, kind='stable')
+    start = np.cumsum(n) - n
+    position = np.arange(len(codes)) - start[codes[order]]
+
+    matrix = np.full((groups, max(n.max(initial=0), 1)), np.nan)
+    matrix[codes[order], position] = values[order]
+    return matrix, n
+
+def grouped_stats(df, by, spec=None, sort=True):
+    """Estatísticas por grupo em uma passada vetorizada
+
+    `by` é uma coluna ou lista de colunas; `spec` mapeia coluna -> tupla de
+    estatísticas (STATS ou 'pNN'). O resultado tem um grupo por linha
+    (índice = chaves), a coluna `samples` com o tamanho do grupo e uma
+    coluna `<coluna>_<estatística>` para cada pedido. Com sort=False, os
+    grupos seguem a ordem de aparição, como em df[col].unique().
+    """
+    spec = DEFAULT_SPEC if spec is None else spec
+    spec = {column: stats for column, stats in spec.items() if column in df.columns}
+
+    grouper = df.groupby(by, sort=sort, dropna=False)
+    codes = grouper.ngroup().to_numpy()
+    groups = grouper.ngroups
+    index = grouper.size().index
+
+    columns = {'samples': np.bincount(codes, minlength=groups)}
+    for column, stats in spec.items():
+        for stat, values in _column_stats(codes, groups, df[column].to_numpy(), stats).items():
+            columns[f"{column}_{stat}"] = values
+
+    return pd.DataFrame(columns, index=index)
+
+def summarize(values, stats=('mean', 'std', 'min', 'max', 'p95', 'cv')):
+    """Estatísticas de uma única série (um só grupo), como dicionário"""
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.zeros(len(values), dtype=np.int64)
+    return {stat: result[0] for stat, result in _column_stats(codes, 1, values, stats).items()}
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""
+Detecção de aquecimento e regime permanente nas séries por intervalo
+O throughput final do iperf3 (`end.sum_sent`) mistura o slow-start com o
+regime permanente. Para cada execução, a série de throughput por intervalo
+é truncada pela regra MSER: o ponto d que minimiza a variância da média
+do restante da série, Σ(x - média)² / (n - d)². Isso dá a duração do
+aquecimento e a média em regime permanente.
+
+Por cenário, recomenda:
+- o valor de -O (omit) que cobre o aquecimento de todas as execuções;
+- a menor duração (-t) após o aquecimento em que a média acumulada já fica,
+  e permanece, dentro de uma tolerância da média em regime permanente.
+
+Com --write, as recomendações são gravadas em <resultados>/steady_state.json,
+que os scripts de teste aplicam com STEADY_STATE=1 (scripts/timing.sh).
+"""
+
+import argparse
+import json
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from catalog import load_catalog
+from intervals import load_intervals
+
+RECOMMENDATIONS_NAME = "steady_state.json"
+
+# Desvio relativo máximo da média acumulada em relação à média em regime
+TOLERANCE = 0.02
+# Fração máxima da série que pode ser descartada como aquecimento
+MAX_TRUNCATION = 0.5
+# Duração mínima recomendada (s)
+MIN_DURATION = 5
+
+def default_path(raw_dir):
+    """Arquivo de recomendações de um diretório de resultados brutos"""
+    return Path(raw_dir).parent / RECOMMENDATIONS_NAME
+
+def mser(series, max_truncation=MAX_TRUNCATION):
+    """Ponto de truncamento MSER de uma série (número de intervalos descartados)
+
+    A estatística é calculada para todos os pontos de uma vez com somas
+    acumuladas do fim para o início.
+    """
+    x = np.asarray(series, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    n = len(x)
+    if n < 4:
+        return 0
+
+    tail_sum = np.cumsum(x[::-1])[::-1]
+    tail_squares = np.cumsum(x[::-1] ** 2)[::-1]
+    remaining = n - np.arange(n)
+    deviations = np.maximum(tail_squares - tail_sum ** 2 / remaining, 0.0)
+    statistic = deviations / remaining ** 2
+
+    limit = int(n * max_truncation)
+    return int(np.argmin(statistic[:limit + 1]))
+
+def settling_intervals(series, tolerance=TOLERANCE):
+    """Menor número de intervalos a partir do qual a média acumulada fica
+    dentro de `tolerance` da média da série inteira"""
+    x = np.asarray(series, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return 0
+    running = np.cumsum(x) / np.arange(1, len(x) + 1)
+    final = running[-1]
+    outside = np.flatnonzero(np.abs(running - final) > tolerance * abs(final))
+    return int(outside[-1]) + 2 if len(outside) else 1
+
+def analyze_run(path, tolerance=TOLERANCE):
+    """Aquecimento e regime permanente de uma execução"""
+    run = load_intervals(path)
+    keep = ~run.omitted
+    time = run.time[keep]
+    throughput = run.total('throughput_mbps')[keep]
+    if len(throughput) == 0:
+        return None
+
+    # Intervalos arredondados a ms (os tempos do iperf3 têm resíduos de µs)
+    step = round(float(np.median(np.diff(time))) if len(time) > 1 else float(time[0]), 3)
+    warmup = mser(throughput)
+    truncated = np.mean(throughput[warmup:])
+    if abs(truncated - np.mean(throughput)) <= tolerance * abs(truncated):
+        # Truncamento que não muda a média além da tolerância: ruído, não aquecimento
+        warmup = 0
+    steady = throughput[warmup:]
+    settle = settling_intervals(steady, tolerance)
+
+    return {
+        'path': str(path),
+        'intervals': len(throughput),
+        'interval_s': step,
+        'duration_s': round(float(time[-1] - time[0]) + step, 3),
+        'warmup_intervals': warmup,
+        'warmup_s': warmup * step,
+        'mean_mbps': float(np.mean(throughput)),
+        'steady_mean_mbps': float(np.mean(steady)),
+        'bias_pct': float((np.mean(throughput) - np.mean(steady)) / np.mean(steady) * 100)
+                    if np.mean(steady) else 0.0,
+        'settle_s': settle * step,
+        # Estável se a média assentou antes dos últimos 20% do regime permanente
+        'stable': settle <= 0.8 * len(steady),
+    }
+
+def recommend(runs):
+    """Duração e omit recomendados para um cenário a partir das suas execuções"""
+    omit = math.ceil(max(r['warmup_s'] for r in runs))
+    stable = all(r['stable'] for r in runs)
+    current = max(r['duration_s'] for r in runs)
+    if stable:
+        duration = max(MIN_DURATION, math.ceil(max(r['settle_s'] for r in runs)))
+    else:
+        # Sem assentar dentro do teste atual, não há base para encurtar
+        duration = math.ceil(current)
+    return {
+        'duration': duration,
+        'omit': omit,
+        'stable': stable,
+        'runs': len(runs),
+        'current_duration': round(current, 1),
+        'warmup_s': round(max(r['warmup_s'] for r in runs), 1),
+        'steady_mean_mbps': round(float(np.mean([r['steady_mean_mbps'] for r in runs])), 2),
+        'bias_pct': round(float(np.mean([r['bias_pct'] for r in runs])), 2),
+    }
+
+def analyze_catalog(raw_dir, timestamp=None, tolerance=TOLERANCE):
+    """Execuções analisadas e recomendações por cenário"""
+    catalog = load_catalog(raw_dir, timestamp)
+    by_scenario = {}
+    for record in catalog.query():
+        result = analyze_run(record['path'], tolerance)
+        if result is not None:
+            by_scenario.setdefault(record['scenario'], []).append(result)
+    recommendations = {scenario: recommend(runs) for scenario, runs in sorted(by_scenario.items())}
+    return by_scenario, recommendations
+
+def write_recommendations(path, recommendations, tolerance):
+    """Grava as recomendações (substituição atômica)"""
+    path = Path(path)
+    payload = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'tolerance': tolerance,
+        'scenarios': recommendations,
+    }
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+    tmp.replace(path)
+
+def main():
+    """Mostra aquecimento e regime permanente por execução e as recomendações"""
+    parser = argparse.ArgumentParser(description="Detecção de regime permanente (MSER) nas séries do iperf3")
+    parser.add_argument('raw_dir', type=Path, nargs='?', default=Path("/results/raw"))
+    parser.add_argument('--timestamp', help="Somente esta bateria (padrão: todas)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Desvio relativo máximo da média acumulada (padrão: 0.02)")
+    parser.add_argument('--runs', action='store_true', help="Mostra também cada execução")
+    parser.add_argument('--write', action='store_true',
+                        help=f"Grava as recomendações em <resultados>/{RECOMMENDATIONS_NAME}")
+    args = parser.parse_args()
+
+    by_scenario, recommendations = analyze_catalog(args.raw_dir, args.timestamp, args.tolerance)
+    if not recommendations:
+        print(f"Nenhuma execução com intervalos em {args.raw_dir}")
+        sys.exit(1)
+
+    if args.runs:
+        print(f"{'execução':<50} {'aquec. (s)':>10} {'média':>12} {'regime':>12} {'viés %':>8} {'assenta (s)':>12}")
+        for runs in by_scenario.values():
+            for r in runs:
+                print(f"{Path(r['path']).stem:<50} {r['warmup_s']:>10.0f} {r['mean_mbps']:>12.2f} "
+                      f"{r['steady_mean_mbps']:>12.2f} {r['bias_pct']:>+8.2f} {r['settle_s']:>12.0f}")
+        print()
+
+    print(f"{'cenário':<36} {'exec.':>5} {'atual (s)':>9} {'-O':>4} {'-t':>4} {'viés %':>8}  estável")
+    for scenario, rec in recommendations.items():
+        print(f"{scenario:<36} {rec['runs']:>5} {rec['current_duration']:>9.0f} {rec['omit']:>4} "
+              f"{rec['duration']:>4} {rec['bias_pct']:>+8.2f}  {'sim' if rec['stable'] else 'não'}")
+
+    current = sum(rec['current_duration'] * rec['runs'] for rec in recommendations.values())
+    proposed = sum((rec['omit'] + rec['duration']) * rec['runs'] for rec in recommendations.values())
+    print(f"\nTempo de teste: {current:.0f}s atual -> {proposed:.0f}s recomendado (por repetição do conjunto)")
+
+    if args.write:
+        path = default_path(args.raw_dir)
+        write_recommendations(path, recommendations, args.tolerance)
+        print(f"Recomendações salvas em: {path}")
+
+if __name__ == "__main__":
+    main()
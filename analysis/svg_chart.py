@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+"""
+Gráficos SVG gerados em fluxo, só com a biblioteca padrão
+Os elementos são escritos direto no buffer do arquivo à medida que são
+gerados, sem montar o documento em uma string, então o custo é linear no
+número de pontos. Gráficos de linha/séries temporais reduzem cada série à
+largura da área do gráfico (primeiro, mínimo, máximo e último ponto de cada
+coluna de pixels, como o M4), o que mantém picos e travamentos visíveis e o
+arquivo com tamanho limitado mesmo para séries com milhões de pontos.
+
+Usa apenas a biblioteca padrão para rodar também no container cliente
+(scripts/generate-plots.py), sem a imagem do analyzer.
+"""
+
+import math
+from xml.sax.saxutils import escape, quoteattr
+
+WIDTH = 800
+HEIGHT = 600
+MARGIN = {"top": 80, "right": 50, "bottom": 100, "left": 100}
+GRID_LINES = 5
+
+STYLE = """
+    .title { font: bold 24px sans-serif; }
+    .label { font: 14px sans-serif; }
+    .axis { font: 12px sans-serif; }
+    .bar { opacity: 0.8; }
+    .bar:hover { opacity: 1; }
+    .error-bar { stroke: #333; stroke-width: 2; }
+    .grid { stroke: #ddd; stroke-width: 1; opacity: 0.5; }
+    .series { fill: none; stroke-width: 1.5; stroke-linejoin: round; }
+    .legend { font: 12px sans-serif; }
+"""
+
+# Cores das séries dos gráficos de linha, em ordem
+COLORS = ('#4CAF50', '#2196F3', '#FF5722', '#9C27B0', '#FFC107', '#009688', '#795548', '#607D8B')
+
+# Altura de uma linha e largura de uma coluna da legenda
+LEGEND_ROW = 15
+LEGEND_COLUMN = 150
+
+# Pontos por chamada de write() ao escrever uma polilinha
+POINTS_PER_WRITE = 1024
+
+def _number(value):
+    """Coordenada com até duas casas, sem zeros à direita"""
+    text = f"{value:.2f}".rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+def _attributes(attrs):
+    """Atributos SVG; `class_` vira `class` e `_` nos nomes vira `-`"""
+    parts = []
+    for name, value in attrs.items():
+        if value is None:
+            continue
+        name = 'class' if name == 'class_' else name.replace('_', '-')
+        value = _number(value) if isinstance(value, float) else str(value)
+        parts.append(f' {name}={quoteattr(value)}')
+    return ''.join(parts)
+
+class SvgWriter:
+    """Documento SVG escrito em fluxo em um arquivo
+
+    Uso como gerenciador de contexto: o cabeçalho e o estilo são escritos
+    na abertura e o fechamento do <svg> na saída.
+    """
+
+    def __init__(self, path, width=WIDTH, height=HEIGHT, style=STYLE):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.style = style
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         f'<svg width="{self.width}" height="{self.height}" '
+                         f'xmlns="http://www.w3.org/2000/svg">\n')
+        if self.style:
+            self._file.write(f'<style>{self.style}</style>\n')
+        return self
+
+    def __exit__(self, *exc):
+        self._file.write('</svg>\n')
+        self._file.close()
+        self._file = None
+        return False
+
+    def element(self, tag, text=None, **attrs):
+        """Elemento completo, com texto opcional (escapado)"""
+        if text is None:
+            self._file.write(f'<{tag}{_attributes(attrs)}/>\n')
+        else:
+            self._file.write(f'<{tag}{_attributes(attrs)}>{escape(str(text))}</{tag}>\n')
+
+    def open(self, tag, **attrs):
+        self._file.write(f'<{tag}{_attributes(attrs)}>\n')
+
+    def close(self, tag):
+        self._file.write(f'</{tag}>\n')
+
+    def comment(self, text):
+        self._file.write(f'<!-- {escape(text)} -->\n')
+
+    def text(self, x, y, content, **attrs):
+        self.element('text', content, x=float(x), y=float(y), **attrs)
+
+    def line(self, x1, y1, x2, y2, **attrs):
+        self.element('line', x1=float(x1), y1=float(y1), x2=float(x2), y2=float(y2), **attrs)
+
+    def polyline(self, points, **attrs):
+        """Polilinha de um iterável de (x, y), escrita em blocos de pontos"""
+        self._file.write(f'<polyline{_attributes(attrs)} points="')
+        block = []
+        for x, y in points:
+            block.append(f"{_number(x)},{_number(y)}")
+            if len(block) == POINTS_PER_WRITE:
+                self._file.write(' '.join(block) + ' ')
+                block = []
+        self._file.write(' '.join(block) + '"/>\n')
+
+class Frame:
+    """Área do gráfico e conversão de valores para coordenadas"""
+
+    def __init__(self, svg, x_range, y_range, margin=MARGIN):
+        self.left = margin["left"]
+        self.top = margin["top"]
+        self.width = svg.width - margin["left"] - margin["right"]
+        self.height = svg.height - margin["top"] - margin["bottom"]
+        self.bottom = self.top + self.height
+        self.x_min, self.x_max = x_range
+        self.y_min, self.y_max = y_range
+
+    def x(self, value):
+        span = self.x_max - self.x_min
+        return self.left + ((value - self.x_min) / span * self.width if span else self.width / 2)
+
+    def y(self, value):
+        span = self.y_max - self.y_min
+        return self.bottom - ((value - self.y_min) / span * self.height if span else 0)
+
+def _header(svg, title, x_label, y_label):
+    """Título e rótulos dos eixos"""
+    svg.text(svg.width / 2, 40, title, text_anchor='middle', class_='title')
+    svg.text(svg.width / 2, svg.height - 20, x_label, text_anchor='middle', class_='label')
+    svg.text(40, svg.height / 2, y_label, text_anchor='middle', class_='label',
+             transform=f"rotate(-90 40 {_number(svg.height / 2)})")
+
+def _grid(svg, frame, fmt="{:.0f}"):
+    """Linhas de grade horizontais com os valores do eixo Y"""
+    for i in range(GRID_LINES + 1):
+        value = frame.y_min + (frame.y_max - frame.y_min) * i / GRID_LINES
+        y = frame.y(value)
+        svg.line(frame.left, y, frame.left + frame.width, y, class_='grid')
+        svg.text(frame.left - 10, y + 5, fmt.format(value), text_anchor='end', class_='axis')
+
+def _axes(svg, frame):
+    svg.line(frame.left, frame.top, frame.left, frame.bottom, stroke='#333', stroke_width=2)
+    svg.line(frame.left, frame.bottom, frame.left + frame.width, frame.bottom, stroke='#333', stroke_width=2)
+
+def bar_chart(path, data, title, y_label, x_label="Configuração", color='#4CAF50', unit='',
+              value_labels=False, fmt="{:.1f}"):
+    """Gráfico de barras com barras de erro (`std`) opcionais
+
+    `data` é uma lista de {'label', 'value', 'std' (opcional)}; `unit`
+    aparece na dica de cada barra e `value_labels` escreve o valor acima dela.
+    """
+    with SvgWriter(path) as svg:
+        top = max((d["value"] for d in data), default=0)
+        frame = Frame(svg, (0, len(data)), (0, top if top > 0 else 1))
+        _header(svg, title, x_label, y_label)
+        svg.comment("Grade")
+        _grid(svg, frame)
+
+        svg.comment("Barras")
+        slot = frame.width / len(data) if data else 0
+        bar_width = slot * 0.8
+        for i, item in enumerate(data):
+            x = frame.left + i * slot + slot * 0.1
+            y = frame.y(item["value"])
+            center = x + bar_width / 2
+            svg.open('rect', x=float(x), y=float(y), width=float(bar_width),
+                     height=float(frame.bottom - y), class_='bar', fill=color)
+            svg.element('title', f"{item['label']}: {fmt.format(item['value'])}{unit}")
+            svg.close('rect')
+
+            std = item.get("std", 0)
+            if std > 0:
+                low, high = frame.y(item["value"] - std), frame.y(item["value"] + std)
+                svg.line(center, high, center, low, class_='error-bar')
+                svg.line(center - 5, high, center + 5, high, class_='error-bar')
+                svg.line(center - 5, low, center + 5, low, class_='error-bar')
+            if value_labels:
+                svg.text(center, y - 5, fmt.format(item["value"]), text_anchor='middle', class_='axis')
+
+            label_y = frame.bottom + 20
+            svg.text(center, label_y, item["label"], text_anchor='middle', class_='label',
+                     transform=f"rotate(-45 {_number(center)} {_number(label_y)})")
+
+        svg.comment("Eixos")
+        _axes(svg, frame)
+
+def reduce_points(xs, ys, columns, x_range):
+    """Primeiro, mínimo, máximo e último ponto de cada coluna de pixels (M4)
+
+    Gera (x, y) na ordem original; séries com até 4 pontos por coluna
+    passam inteiras. Pontos com y não finito são descartados.
+    """
+    x_min, x_max = x_range
+    span = (x_max - x_min) or 1.0
+    current, bucket = None, []
+
+    def flush(points):
+        if len(points) <= 4:
+            return points
+        low = min(points, key=lambda p: p[1])
+        high = max(points, key=lambda p: p[1])
+        keep = {id(points[0]): points[0], id(low): low, id(high): high, id(points[-1]): points[-1]}
+        return sorted(keep.values(), key=lambda p: p[0])
+
+    for x, y in zip(xs, ys):
+        if not math.isfinite(y):
+            continue
+        column = min(int((x - x_min) / span * columns), columns - 1)
+        if column != current and bucket:
+            yield from flush(bucket)
+            bucket = []
+        current = column
+        bucket.append((x, y))
+    yield from flush(bucket)
+
+def line_chart(path, series, title, y_label, x_label="Tempo (s)", fmt="{:.0f}"):
+    """Gráfico de linhas (séries temporais) com legenda
+
+    `series` é uma lista de (rótulo, xs, ys) com xs crescente. Cada série é
+    reduzida à largura da área do gráfico antes de ser escrita. A legenda é
+    disposta em colunas, da direita para a esquerda, dentro da área do
+    gráfico; entradas que não cabem são omitidas. As cores se repetem a
+    partir de len(COLORS) séries.
+    """
+    with SvgWriter(path) as svg:
+        xs_all = [x for _, xs, _ in series for x in (xs[0], xs[-1]) if len(xs)]
+        ys_finite = [(min(v), max(v)) for v in
+                     ([y for y in ys if math.isfinite(y)] for _, _, ys in series) if v]
+        x_range = (min(xs_all), max(xs_all)) if xs_all else (0, 1)
+        y_max = max((high for _, high in ys_finite), default=1)
+        y_min = min(0, min((low for low, _ in ys_finite), default=0))
+        frame = Frame(svg, x_range, (y_min, y_max if y_max > y_min else y_min + 1))
+
+        _header(svg, title, x_label, y_label)
+        svg.comment("Grade")
+        _grid(svg, frame, fmt)
+        for i in range(GRID_LINES + 1):
+            value = frame.x_min + (frame.x_max - frame.x_min) * i / GRID_LINES
+            svg.text(frame.x(value), frame.bottom + 20, f"{value:.0f}", text_anchor='middle', class_='axis')
+
+        svg.comment("Séries")
+        columns = int(frame.width)
+        rows = max(1, int(frame.height // LEGEND_ROW))
+        for i, (label, xs, ys) in enumerate(series):
+            color = COLORS[i % len(COLORS)]
+            points = reduce_points(xs, ys, columns, x_range)
+            svg.open('g')
+            svg.element('title', label)
+            svg.polyline(((frame.x(x), frame.y(y)) for x, y in points), class_='series', stroke=color)
+            svg.close('g')
+
+            column, row = divmod(i, rows)
+            legend_x = frame.left + frame.width - LEGEND_COLUMN * (column + 1)
+            if legend_x < frame.left:
+                continue
+            legend_y = frame.top + LEGEND_ROW * row
+            svg.line(legend_x, legend_y, legend_x + 20, legend_y, stroke=color, stroke_width=3)
+            svg.text(legend_x + 25, legend_y + 4, label, class_='legend')
+
+        svg.comment("Eixos")
+        _axes(svg, frame)
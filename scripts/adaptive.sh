@@ -0,0 +1,136 @@
+#!/bin/bash
+
+# Repetições adaptativas (parada sequencial)
+# Com ADAPTIVE=1, cada cenário é repetido até que a semiamplitude do
+# intervalo de confiança de 95% da média do throughput fique abaixo de
+# ADAPTIVE_TARGET (% da média) ou até ADAPTIVE_MAX repetições, com pelo
+# menos ADAPTIVE_MIN. Cenários estáveis param cedo; cenários ruidosos
+# recebem mais amostras. Sem ADAPTIVE, o número fixo de repetições de cada
+# script é mantido.
+#
+# O throughput é lido com jq e o intervalo (t de Student) é calculado com
+# awk, sem iniciar um interpretador Python a cada repetição. A decisão de
+# parada de cada cenário é gravada em
+# <resultados>/manifests/<TIMESTAMP>_stopping.jsonl.
+#
+# Uso (após manifest_init):
+#   source "$(dirname "$0")/adaptive.sh"
+#   adaptive_reset
+#   rep=0
+#   while true; do
+#       rep=$((rep + 1))
+#       iperf3 ... > "$output_file" && adaptive_add "$output_file"
+#       adaptive_stop $rep 3 && break
+#   done
+#   adaptive_record "$test_name" $rep
+
+ADAPTIVE="${ADAPTIVE:-0}"
+ADAPTIVE_TARGET="${ADAPTIVE_TARGET:-5}"
+ADAPTIVE_MIN="${ADAPTIVE_MIN:-3}"
+ADAPTIVE_MAX="${ADAPTIVE_MAX:-10}"
+
+ADAPTIVE_SAMPLES=()
+ADAPTIVE_REASON=""
+ADAPTIVE_MEAN=""
+ADAPTIVE_HALF_WIDTH=""
+
+adaptive_reset() {
+    ADAPTIVE_SAMPLES=()
+    ADAPTIVE_REASON=""
+    ADAPTIVE_MEAN=""
+    ADAPTIVE_HALF_WIDTH=""
+}
+
+# Número máximo de repetições (fixo sem ADAPTIVE)
+adaptive_limit() {
+    if [ "$ADAPTIVE" = "1" ]; then
+        echo "$ADAPTIVE_MAX"
+    else
+        echo "$1"
+    fi
+}
+
+# Acrescenta o throughput (Mbps) de uma saída do iperf3 às amostras
+adaptive_add() {
+    local bps
+    bps=$(jq -r '.end.sum_sent.bits_per_second // empty' "$1" 2>/dev/null) || return 0
+    if [ -n "$bps" ]; then
+        ADAPTIVE_SAMPLES+=("$(awk -v bps="$bps" 'BEGIN { printf "%.6f", bps / 1e6 }')")
+    fi
+}
+
+# Atualiza ADAPTIVE_MEAN e ADAPTIVE_HALF_WIDTH (% da média) com as amostras
+adaptive_interval() {
+    local result
+    result=$(printf '%s\n' "${ADAPTIVE_SAMPLES[@]}" | awk '
+        NF { x[++n] = $1; sum += $1 }
+        END {
+            if (n == 0) { print "null inf"; exit }
+            if (n < 2) { printf "%.6f inf\n", sum; exit }
+            split("12.706 4.303 3.182 2.776 2.571 2.447 2.365 2.306 2.262 2.228 " \
+                  "2.201 2.179 2.160 2.145 2.131 2.120 2.110 2.101 2.093 2.086 " \
+                  "2.080 2.074 2.069 2.064 2.060 2.056 2.052 2.048 2.045 2.042", t, " ")
+            mean = sum / n
+            for (i = 1; i <= n; i++) ss += (x[i] - mean) ^ 2
+            q = (n - 1 <= 30) ? t[n - 1] : 1.960
+            half = q * sqrt(ss / (n - 1)) / sqrt(n)
+            if (mean > 0) printf "%.6f %.4f\n", mean, half / mean * 100
+            else printf "%.6f inf\n", mean
+        }')
+    ADAPTIVE_MEAN="${result% *}"
+    ADAPTIVE_HALF_WIDTH="${result#* }"
+}
+
+# adaptive_stop <repetição> <repetições fixas>
+# Retorna 0 quando o cenário deve parar e define ADAPTIVE_REASON
+# (fixed, ci, failed ou max). Um cenário sem nenhuma amostra válida após
+# ADAPTIVE_MIN repetições (ex.: erro do iperf3 em todas) para como failed.
+adaptive_stop() {
+    local rep="$1"
+    local fixed="$2"
+
+    if [ "$ADAPTIVE" != "1" ]; then
+        ADAPTIVE_REASON="fixed"
+        [ "$rep" -ge "$fixed" ]
+        return
+    fi
+
+    adaptive_interval
+    if [ "$rep" -ge "$ADAPTIVE_MIN" ] && [ ${#ADAPTIVE_SAMPLES[@]} -eq 0 ]; then
+        ADAPTIVE_REASON="failed"
+        return 0
+    fi
+    if [ "$rep" -ge "$ADAPTIVE_MIN" ] && [ "$ADAPTIVE_HALF_WIDTH" != "inf" ] && \
+       awk -v h="$ADAPTIVE_HALF_WIDTH" -v t="$ADAPTIVE_TARGET" 'BEGIN { exit !(h <= t) }'; then
+        ADAPTIVE_REASON="ci"
+        return 0
+    fi
+    if [ "$rep" -ge "$ADAPTIVE_MAX" ]; then
+        ADAPTIVE_REASON="max"
+        return 0
+    fi
+    return 1
+}
+
+# adaptive_record <teste> <repetições executadas>
+# Grava a decisão de parada (somente com ADAPTIVE=1)
+adaptive_record() {
+    [ "$ADAPTIVE" = "1" ] || return 0
+
+    local half_width="$ADAPTIVE_HALF_WIDTH"
+    [ "$half_width" = "inf" ] && half_width="null"
+
+    echo "Parada de $1 após $2 repetição(ões): ${ADAPTIVE_REASON} (IC 95% ±${ADAPTIVE_HALF_WIDTH}%, alvo ±${ADAPTIVE_TARGET}%)"
+    printf '{"timestamp": "%s", "test_name": "%s", "repetitions": %d, "valid_samples": %d, "reason": "%s", "mean_mbps": %s, "half_width_pct": %s, "target_pct": %s, "min": %d, "max": %d}\n' \
+        "$TIMESTAMP" \
+        "$(manifest_escape "$1")" \
+        "$2" \
+        "${#ADAPTIVE_SAMPLES[@]}" \
+        "$ADAPTIVE_REASON" \
+        "${ADAPTIVE_MEAN:-null}" \
+        "$half_width" \
+        "$ADAPTIVE_TARGET" \
+        "$ADAPTIVE_MIN" \
+        "$ADAPTIVE_MAX" \
+        >> "${MANIFEST_DIR}/${TIMESTAMP}_stopping.jsonl"
+}
@@ -1,14 +1,35 @@
 #!/usr/bin/env python3
 
-import json
 import os
+import sys
 from pathlib import Path
 from collections import defaultdict
 import statistics
 
+# Módulos compartilhados ficam em analysis/ (montado em /analysis nos containers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'analysis'))
+from catalog import load_catalog
+
+def significance_vs_baseline(categories):
+    """Teste de Welch (Holm) de cada categoria contra o baseline
+
+    Retorna {categoria: linha da comparação}, ou {} sem numpy/scipy.
+    """
+    try:
+        import pandas as pd
+        from significance import against_baseline
+    except ImportError:
+        return {}
+    
+    rows = [(cat, throughput) for cat, results in categories.items() for throughput, _ in results]
+    df = pd.DataFrame(rows, columns=['category', 'throughput'])
+    if not (df['category'] == 'baseline').any():
+        return {}
+    table = against_baseline(df, 'category', (df['category'] == 'baseline').to_numpy(), value='throughput')
+    return {row['group']: row for _, row in table.iterrows()}
+
 def analyze_final_results():
-    results_dir = '/results/raw'
-    files = list(Path(results_dir).glob('*.json'))
+    catalog = load_catalog('/results/raw')
     
     print('=== ANÁLISE FINAL DOS RESULTADOS DE DESEMPENHO TCP ===\n')
     
@@ -23,37 +44,19 @@ def analyze_final_results():
         'combined': []
     }
     
-    errors = []
+    errors = [f'{Path(r["path"]).name}: {r["error"]}' for r in catalog.errors()]
     
-    # Processar arquivos
-    for f in files:
-        try:
-            with open(f, 'r') as file:
-                data = json.load(file)
-            
-            if 'end' in data and 'sum_sent' in data['end']:
-                throughput_gbps = data['end']['sum_sent'].get('bits_per_second', 0) / 1e9
-                retrans = data['end']['sum_sent'].get('retransmits', 0)
-                
-                # Categorizar
-                filename = f.name.lower()
-                if 'baseline' in filename:
-                    categories['baseline'].append((throughput_gbps, retrans))
-                elif 'window_64k' in filename:
-                    categories['window_64k'].append((throughput_gbps, retrans))
-                elif 'window_128k' in filename:
-                    categories['window_128k'].append((throughput_gbps, retrans))
-                elif 'window_256k' in filename:
-                    categories['window_256k'].append((throughput_gbps, retrans))
-                elif 'window_512k' in filename:
-                    categories['window_512k'].append((throughput_gbps, retrans))
-                elif 'streams_4' in filename:
-                    categories['streams_4'].append((throughput_gbps, retrans))
-                elif 'combined' in filename:
-                    categories['combined'].append((throughput_gbps, retrans))
-                    
-        except Exception as e:
-            errors.append(f'{f.name}: {str(e)}')
+    # Processar execuções do catálogo
+    for record in catalog.query():
+        throughput_gbps = record['throughput_mbps'] / 1e3
+        retrans = record['retransmits']
+        
+        # Categorizar
+        name = record['scenario'].lower()
+        for cat in categories:
+            if cat in name:
+                categories[cat].append((throughput_gbps, retrans))
+                break
     
     # Calcular estatísticas
     print('=== RESULTADOS POR CATEGORIA ===\n')
@@ -82,6 +85,7 @@ def analyze_final_results():
     
     # Análise comparativa
     print('\n=== ANÁLISE COMPARATIVA (% em relação ao baseline) ===\n')
+    tests = significance_vs_baseline(categories)
     
     if 'baseline' in summary and summary['baseline']['avg'] > 0:
         baseline_avg = summary['baseline']['avg']
@@ -95,12 +99,18 @@ def analyze_final_results():
         # Ordenar por melhoria
         comparisons.sort(key=lambda x: x[2], reverse=True)
         
-        print(f'{"Configuração":<20} {"Throughput (Gbps)":<20} {"Melhoria (%)":<15}')
-        print('-' * 55)
+        print(f'{"Configuração":<20} {"Throughput (Gbps)":<20} {"Melhoria (%)":<15} {"p (Holm)":<10}')
+        print('-' * 70)
         
         for cat, throughput, improvement in comparisons:
             sign = '+' if improvement >= 0 else ''
-            print(f'{cat:<20} {throughput:<20.2f} {sign}{improvement:<14.1f}')
+            test = tests.get(cat)
+            p_value = f'{test["p_welch_holm"]:.4f}' if test is not None else 'N/A'
+            note = '' if test is None or test['significant'] else ' (n.s.)'
+            print(f'{cat:<20} {throughput:<20.2f} {sign}{improvement:<14.1f} {p_value}{note}')
+        
+        if tests:
+            print('\nTeste t de Welch com correção de Holm (α = 0,05); n.s. = diferença não significativa')
     
     # Identificar configuração ótima
     print('\n=== CONFIGURAÇÃO ÓTIMA IDENTIFICADA ===\n')
@@ -110,6 +120,8 @@ def analyze_final_results():
     print(f'Throughput médio: {best_cat[1]["avg"]:.2f} Gbps')
     print(f'Desvio padrão: {best_cat[1]["std"]:.2f} Gbps')
     print(f'Retransmissões médias: {best_cat[1]["retrans"]:.1f}')
+    if best_cat[0] in tests and not tests[best_cat[0]]['significant']:
+        print('Atenção: a diferença para o baseline não é estatisticamente significativa')
     
     # Recomendações
     print('\n=== RECOMENDAÇÕES ===\n')
@@ -7,7 +7,8 @@ echo "Limpando resultados anteriores..."
 
 # Limpar arquivos de resultado
 rm -f results/raw/*.json 2>/dev/null
-rm -f results/processed/*.csv 2>/dev/null
+rm -f results/processed/*.csv results/processed/*.parquet 2>/dev/null
+rm -rf results/store results/cache results/intervals results/manifests results/index.sqlite results/online_state.json 2>/dev/null
 rm -f results/plots/*.png 2>/dev/null
 rm -f results/*.log 2>/dev/null
 
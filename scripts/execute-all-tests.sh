@@ -4,11 +4,27 @@
 
 echo "=== Executando Testes Completos da Atividade 2 ==="
 
-cd /results/atv2/results/raw
+# Manifesto das execuções (manifest_init / manifest_record), antes do cd
+source "$(dirname "$0")/manifest.sh"
+
+RESULTS_DIR="/results/atv2/results/raw"
+cd "$RESULTS_DIR"
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
+manifest_init
 
 echo "Timestamp: $TIMESTAMP"
 
+# Executa uma repetição e a registra no manifesto
+run_rep() {
+    local name=$1
+    local params=$2
+    local rep=$3
+    local started=$(manifest_now)
+    local status=0
+    iperf3 -c 10.5.0.10 -t 10 $params -J > ${TIMESTAMP}_${name}_rep${rep}.json 2>&1 || status=$?
+    manifest_record "$name" "$params" "$rep" "${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json" "$status" "$started"
+}
+
 # Função auxiliar
 test_algorithm() {
     local algo=$1
@@ -19,7 +35,7 @@ test_algorithm() {
     
     for i in 1 2 3; do
         echo "  Rep $i/3..."
-        iperf3 -c 10.5.0.10 -t 10 -J > ${TIMESTAMP}_${name}_baseline_rep${i}.json 2>&1
+        run_rep "${name}_baseline" "" $i
         sleep 2
     done
 }
@@ -44,7 +60,7 @@ echo "CUBIC com latência 50ms..."
 sysctl -w net.ipv4.tcp_congestion_control=cubic
 tc qdisc add dev eth0 root netem delay 50ms
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -J > ${TIMESTAMP}_cubic_latency50ms_rep${i}.json 2>&1
+    run_rep "cubic_latency50ms" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root
@@ -54,7 +70,7 @@ echo "BBR com latência 100ms..."
 sysctl -w net.ipv4.tcp_congestion_control=bbr
 tc qdisc add dev eth0 root netem delay 100ms
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -J > ${TIMESTAMP}_bbr_latency100ms_rep${i}.json 2>&1
+    run_rep "bbr_latency100ms" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root
@@ -64,7 +80,7 @@ echo "Vegas com banda 10Mbps..."
 sysctl -w net.ipv4.tcp_congestion_control=vegas
 tc qdisc add dev eth0 root tbf rate 10mbit burst 32kbit latency 400ms
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -J > ${TIMESTAMP}_vegas_band10mbps_rep${i}.json 2>&1
+    run_rep "vegas_band10mbps" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root
@@ -74,7 +90,7 @@ echo "Reno com perda 0.5%..."
 sysctl -w net.ipv4.tcp_congestion_control=reno
 tc qdisc add dev eth0 root netem loss 0.5%
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -J > ${TIMESTAMP}_reno_loss0.5_rep${i}.json 2>&1
+    run_rep "reno_loss0.5" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root
@@ -86,7 +102,7 @@ echo -e "\n=== Fase 3: Testes com múltiplos fluxos ==="
 echo "CUBIC com 4 fluxos..."
 sysctl -w net.ipv4.tcp_congestion_control=cubic
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -P 4 -J > ${TIMESTAMP}_cubic_4streams_rep${i}.json 2>&1
+    run_rep "cubic_4streams" "-P 4" $i
     sleep 2
 done
 
@@ -94,7 +110,7 @@ done
 echo "BBR com 8 fluxos..."
 sysctl -w net.ipv4.tcp_congestion_control=bbr
 for i in 1 2 3; do
-    iperf3 -c 10.5.0.10 -t 10 -P 8 -J > ${TIMESTAMP}_bbr_8streams_rep${i}.json 2>&1
+    run_rep "bbr_8streams" "-P 8" $i
     sleep 2
 done
 
@@ -4,35 +4,35 @@ Script simplificado para gerar gráficos dos resultados
 Usa apenas bibliotecas padrão do Python para máxima compatibilidade
 """
 
-import json
-import glob
 import os
+import sys
 from pathlib import Path
 import statistics
 
+# Módulos compartilhados ficam em analysis/ (montado em /analysis nos containers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'analysis'))
+from catalog import load_catalog
+from iperf_stream import iter_intervals
+from svg_chart import COLORS, bar_chart, line_chart
+
+# Séries por gráfico de intervalos (uma cor para cada)
+MAX_SERIES = len(COLORS)
+
 def load_test_results():
-    """Carrega todos os resultados JSON"""
-    results = []
-    json_files = glob.glob("results/raw/*.json")
-    
-    for file in json_files:
-        try:
-            with open(file) as f:
-                content = f.read()
-                if content.strip():  # Verificar se não está vazio
-                    data = json.loads(content)
-                    if "end" in data and "sum_sent" in data["end"]:
-                        result = {
-                            "file": os.path.basename(file),
-                            "test_name": os.path.basename(file).split("_", 2)[2].replace(".json", ""),
-                            "throughput_mbps": data["end"]["sum_sent"]["bits_per_second"] / 1e6,
-                            "retransmits": data["end"]["sum_sent"].get("retransmits", 0)
-                        }
-                        results.append(result)
-        except:
-            continue
-    
-    return results
+    """Carrega todos os resultados JSON (via catálogo, lido uma vez por processo)"""
+    catalog = load_catalog("results/raw")
+    return [
+        {
+            "file": Path(record["path"]).name,
+            "path": record["path"],
+            "scenario": record["scenario"],
+            "repetition": record["repetition"],
+            "test_name": f"{record['scenario']}_rep{record['repetition']}",
+            "throughput_mbps": record["throughput_mbps"],
+            "retransmits": record["retransmits"]
+        }
+        for record in catalog.query()
+    ]
 
 def categorize_results(results):
     """Organiza resultados por categoria"""
@@ -62,92 +62,8 @@ def categorize_results(results):
     
     return categories
 
-def create_svg_chart(data, title, output_file):
-    """Cria um gráfico de barras em SVG"""
-    # Configurações
-    width = 800
-    height = 600
-    margin = {"top": 80, "right": 50, "bottom": 100, "left": 100}
-    chart_width = width - margin["left"] - margin["right"]
-    chart_height = height - margin["top"] - margin["bottom"]
-    
-    # Encontrar valores máximos
-    max_value = max([d["value"] for d in data])
-    
-    # Calcular largura das barras
-    bar_width = chart_width / len(data) * 0.8
-    spacing = chart_width / len(data) * 0.2
-    
-    # Criar SVG
-    svg = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
-  <style>
-    .title {{ font: bold 24px sans-serif; }}
-    .label {{ font: 14px sans-serif; }}
-    .axis {{ font: 12px sans-serif; }}
-    .bar {{ fill: #4CAF50; opacity: 0.8; }}
-    .bar:hover {{ opacity: 1; }}
-    .error-bar {{ stroke: #333; stroke-width: 2; }}
-    .grid {{ stroke: #ddd; stroke-width: 1; opacity: 0.5; }}
-  </style>
-  
-  <!-- Título -->
-  <text x="{width/2}" y="40" text-anchor="middle" class="title">{title}</text>
-  
-  <!-- Grid -->
-"""
-    
-    # Adicionar linhas de grade
-    for i in range(0, 6):
-        y_pos = margin["top"] + chart_height - (i * chart_height / 5)
-        value = (max_value / 5) * i
-        svg += f'  <line x1="{margin["left"]}" y1="{y_pos}" x2="{margin["left"] + chart_width}" y2="{y_pos}" class="grid"/>\n'
-        svg += f'  <text x="{margin["left"] - 10}" y="{y_pos + 5}" text-anchor="end" class="axis">{value:.0f}</text>\n'
-    
-    svg += "\n  <!-- Barras -->\n"
-    
-    # Desenhar barras
-    for i, item in enumerate(data):
-        x = margin["left"] + i * (bar_width + spacing) + spacing/2
-        bar_height = (item["value"] / max_value) * chart_height
-        y = margin["top"] + chart_height - bar_height
-        
-        # Barra
-        svg += f'  <rect x="{x}" y="{y}" width="{bar_width}" height="{bar_height}" class="bar">\n'
-        svg += f'    <title>{item["label"]}: {item["value"]:.1f} Gbps</title>\n'
-        svg += f'  </rect>\n'
-        
-        # Barra de erro se existir
-        if "std" in item and item["std"] > 0:
-            error_height = (item["std"] / max_value) * chart_height
-            svg += f'  <line x1="{x + bar_width/2}" y1="{y - error_height}" x2="{x + bar_width/2}" y2="{y + error_height}" class="error-bar"/>\n'
-            svg += f'  <line x1="{x + bar_width/2 - 5}" y1="{y - error_height}" x2="{x + bar_width/2 + 5}" y2="{y - error_height}" class="error-bar"/>\n'
-            svg += f'  <line x1="{x + bar_width/2 - 5}" y1="{y + error_height}" x2="{x + bar_width/2 + 5}" y2="{y + error_height}" class="error-bar"/>\n'
-        
-        # Rótulo
-        label_y = margin["top"] + chart_height + 20
-        svg += f'  <text x="{x + bar_width/2}" y="{label_y}" text-anchor="middle" class="label" transform="rotate(-45 {x + bar_width/2} {label_y})">{item["label"]}</text>\n'
-    
-    # Eixos
-    svg += f"""
-  <!-- Eixos -->
-  <line x1="{margin["left"]}" y1="{margin["top"]}" x2="{margin["left"]}" y2="{margin["top"] + chart_height}" stroke="#333" stroke-width="2"/>
-  <line x1="{margin["left"]}" y1="{margin["top"] + chart_height}" x2="{margin["left"] + chart_width}" y2="{margin["top"] + chart_height}" stroke="#333" stroke-width="2"/>
-  
-  <!-- Labels dos eixos -->
-  <text x="{width/2}" y="{height - 20}" text-anchor="middle" class="label">Configuração</text>
-  <text x="40" y="{height/2}" text-anchor="middle" class="label" transform="rotate(-90 40 {height/2})">Throughput (Gbps)</text>
-</svg>"""
-    
-    with open(output_file, "w") as f:
-        f.write(svg)
-    print(f"Gráfico salvo em: {output_file}")
-
-def generate_comparison_chart():
+def generate_comparison_chart(categories):
     """Gera gráfico comparativo principal"""
-    results = load_test_results()
-    categories = categorize_results(results)
-    
     # Preparar dados para o gráfico
     chart_data = []
     
@@ -189,13 +105,12 @@ def generate_comparison_chart():
             "std": statistics.stdev(values) / 1000 if len(values) > 1 else 0
         })
     
-    create_svg_chart(chart_data, "Comparação de Throughput por Configuração", "results/plots/throughput_comparison.svg")
+    bar_chart("results/plots/throughput_comparison.svg", chart_data, "Comparação de Throughput por Configuração",
+              "Throughput (Gbps)", unit=" Gbps")
+    print("Gráfico salvo em: results/plots/throughput_comparison.svg")
 
-def generate_retransmission_chart():
+def generate_retransmission_chart(categories):
     """Gera gráfico de retransmissões"""
-    results = load_test_results()
-    categories = categorize_results(results)
-    
     chart_data = []
     
     # Processar cada categoria
@@ -217,73 +132,48 @@ def generate_retransmission_chart():
                 "std": statistics.stdev(values) if len(values) > 1 else 0
             })
     
-    # Ajustar escala para retransmissões
-    max_retrans = max([d["value"] for d in chart_data]) if chart_data else 100
-    
-    # Criar gráfico específico para retransmissões
-    create_retransmission_svg(chart_data, "Retransmissões TCP por Configuração", "results/plots/retransmissions.svg", max_retrans)
+    # Escala própria, com o valor acima de cada barra
+    bar_chart("results/plots/retransmissions.svg", chart_data, "Retransmissões TCP por Configuração",
+              "Retransmissões", color="#FF5722", unit=" retransmissões", value_labels=True, fmt="{:.0f}")
+    print("Gráfico salvo em: results/plots/retransmissions.svg")
 
-def create_retransmission_svg(data, title, output_file, max_value):
-    """Cria gráfico de barras para retransmissões (escala diferente)"""
-    width = 800
-    height = 600
-    margin = {"top": 80, "right": 50, "bottom": 100, "left": 100}
-    chart_width = width - margin["left"] - margin["right"]
-    chart_height = height - margin["top"] - margin["bottom"]
-    
-    bar_width = chart_width / len(data) * 0.8
-    spacing = chart_width / len(data) * 0.2
-    
-    svg = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
-  <style>
-    .title {{ font: bold 24px sans-serif; }}
-    .label {{ font: 14px sans-serif; }}
-    .axis {{ font: 12px sans-serif; }}
-    .bar {{ fill: #FF5722; opacity: 0.8; }}
-    .bar:hover {{ opacity: 1; }}
-    .grid {{ stroke: #ddd; stroke-width: 1; opacity: 0.5; }}
-  </style>
-  
-  <text x="{width/2}" y="40" text-anchor="middle" class="title">{title}</text>
-"""
-    
-    # Grid e eixo Y
-    for i in range(0, 6):
-        y_pos = margin["top"] + chart_height - (i * chart_height / 5)
-        value = (max_value / 5) * i
-        svg += f'  <line x1="{margin["left"]}" y1="{y_pos}" x2="{margin["left"] + chart_width}" y2="{y_pos}" class="grid"/>\n'
-        svg += f'  <text x="{margin["left"] - 10}" y="{y_pos + 5}" text-anchor="end" class="axis">{value:.0f}</text>\n'
-    
-    # Barras
-    for i, item in enumerate(data):
-        x = margin["left"] + i * (bar_width + spacing) + spacing/2
-        bar_height = (item["value"] / max_value) * chart_height if max_value > 0 else 0
-        y = margin["top"] + chart_height - bar_height
-        
-        svg += f'  <rect x="{x}" y="{y}" width="{bar_width}" height="{bar_height}" class="bar">\n'
-        svg += f'    <title>{item["label"]}: {item["value"]:.0f} retransmissões</title>\n'
-        svg += f'  </rect>\n'
-        
-        # Valor acima da barra
-        svg += f'  <text x="{x + bar_width/2}" y="{y - 5}" text-anchor="middle" class="axis">{item["value"]:.0f}</text>\n'
-        
-        # Rótulo
-        label_y = margin["top"] + chart_height + 20
-        svg += f'  <text x="{x + bar_width/2}" y="{label_y}" text-anchor="middle" class="label" transform="rotate(-45 {x + bar_width/2} {label_y})">{item["label"]}</text>\n'
-    
-    # Eixos
-    svg += f"""
-  <line x1="{margin["left"]}" y1="{margin["top"]}" x2="{margin["left"]}" y2="{margin["top"] + chart_height}" stroke="#333" stroke-width="2"/>
-  <line x1="{margin["left"]}" y1="{margin["top"] + chart_height}" x2="{margin["left"] + chart_width}" y2="{margin["top"] + chart_height}" stroke="#333" stroke-width="2"/>
-  
-  <text x="{width/2}" y="{height - 20}" text-anchor="middle" class="label">Configuração</text>
-  <text x="40" y="{height/2}" text-anchor="middle" class="label" transform="rotate(-90 40 {height/2})">Retransmissões</text>
-</svg>"""
-    
-    with open(output_file, "w") as f:
-        f.write(svg)
-    print(f"Gráfico salvo em: {output_file}")
+def interval_throughput(path):
+    """Tempo e throughput (Mbps) de cada intervalo, lidos um a um do JSON"""
+    times, values = [], []
+    for interval in iter_intervals(path):
+        summary = interval.get("sum") or {}
+        if "end" in summary and "bits_per_second" in summary:
+            times.append(summary["end"])
+            values.append(summary["bits_per_second"] / 1e6)
+    return times, values
+
+def generate_interval_chart(results):
+    """Gera gráficos da evolução do throughput por intervalo (1ª repetição de cada cenário)
+
+    Os cenários são divididos em arquivos de até MAX_SERIES séries:
+    interval_throughput.svg, interval_throughput_2.svg, ...
+    """
+    first = {}
+    for r in sorted(results, key=lambda r: r["repetition"]):
+        first.setdefault(r["scenario"], r)
+
+    series = []
+    for scenario in sorted(first):
+        times, values = interval_throughput(first[scenario]["path"])
+        if times:
+            series.append((scenario, times, values))
+    if not series:
+        return
+
+    parts = [series[i:i + MAX_SERIES] for i in range(0, len(series), MAX_SERIES)]
+    for number, part in enumerate(parts, 1):
+        suffix = f"_{number}" if number > 1 else ""
+        title = "Throughput por Intervalo (1ª repetição)"
+        if len(parts) > 1:
+            title += f" - parte {number}/{len(parts)}"
+        path = f"results/plots/interval_throughput{suffix}.svg"
+        line_chart(path, part, title, "Throughput (Mbps)")
+        print(f"Gráfico salvo em: {path}")
 
 def main():
     """Função principal"""
@@ -292,9 +182,14 @@ def main():
     # Criar diretório de saída
     os.makedirs("results/plots", exist_ok=True)
     
+    # Resultados lidos uma vez e compartilhados por todos os gráficos
+    results = load_test_results()
+    categories = categorize_results(results)
+    
     # Gerar gráficos
-    generate_comparison_chart()
-    generate_retransmission_chart()
+    generate_comparison_chart(categories)
+    generate_retransmission_chart(categories)
+    generate_interval_chart(results)
     
     print("\nGráficos gerados com sucesso!")
     print("Visualize os arquivos SVG em qualquer navegador web.")
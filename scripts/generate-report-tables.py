@@ -5,11 +5,70 @@ Gera tabelas formatadas para o relatório baseado nos resultados da análise
 
 import json
 import os
+import sys
 from pathlib import Path
 
+# Módulos compartilhados ficam em analysis/ (montado em /analysis nos containers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'analysis'))
+from catalog import load_catalog
+
+# Semiamplitude relativa do IC 95% da média para cada nível de confiabilidade
+CONFIDENCE_LEVELS = (("Alta", 0.02), ("Média", 0.05))
+
+def load_samples():
+    """Throughput (Gbps) e retransmissões de cada execução, por cenário"""
+    samples = {}
+    for record in load_catalog("results/raw").query():
+        samples.setdefault(record["scenario"], []).append(
+            (record["throughput_mbps"] / 1000, record["retransmits"]))
+    return samples
+
+def bootstrap_summary(samples):
+    """Média e IC 95% bootstrap da média por cenário (módulo analysis/bootstrap.py)"""
+    import pandas as pd
+    from bootstrap import bootstrap_ci
+
+    rows = [(scenario, throughput, retrans)
+            for scenario, values in samples.items() for throughput, retrans in values]
+    df = pd.DataFrame(rows, columns=["scenario", "throughput", "retransmits"])
+    ci = bootstrap_ci(df, "scenario", columns=("throughput", "retransmits"), statistics=("mean",),
+                      sort=False)
+    std = df.groupby("scenario", sort=False)["throughput"].std().fillna(0)
+
+    return {
+        scenario: {
+            "throughput": row["throughput_mean"],
+            "std": std[scenario],
+            "retrans": row["retransmits_mean"],
+            "samples": int(row["samples"]),
+            "ci": (row["throughput_mean_low"], row["throughput_mean_high"]),
+        }
+        for scenario, row in ci.iterrows()
+    }
+
+def confidence_level(metrics):
+    """Confiabilidade pela largura do IC 95% (ou pelo número de amostras, sem IC)"""
+    if "ci" not in metrics:
+        return "Alta" if metrics["samples"] >= 3 else "Baixa" if metrics["samples"] == 1 else "Média"
+    if metrics["samples"] < 2:
+        return "Baixa"
+    low, high = metrics["ci"]
+    half_width = (high - low) / 2 / metrics["throughput"] if metrics["throughput"] else float("inf")
+    for level, limit in CONFIDENCE_LEVELS:
+        if half_width <= limit:
+            return level
+    return "Baixa"
+
 def load_analysis_results():
-    """Carrega os resultados da última análise"""
-    results_file = Path("/home/arthur/Documents/UNIVERSIDADE/REDES/ATIVIDADES/tcp-performance-evaluation/results/analysis_summary.json")
+    """Carrega os resultados da última análise
+
+    Com os JSONs em results/raw, as médias e os intervalos de confiança
+    bootstrap são calculados das execuções; sem eles, usa o resumo abaixo
+    (sem IC).
+    """
+    samples = load_samples()
+    if samples:
+        return bootstrap_summary(samples)
     
     # Se não existir, criar dados baseados na saída da análise
     analysis_data = {
@@ -23,32 +82,44 @@ def load_analysis_results():
     
     return analysis_data
 
-def generate_markdown_table():
+def baseline_scenario(data):
+    """Cenário de referência: "baseline" ou o primeiro que começa com ele
+    (run-tests.sh grava baseline_default)"""
+    if "baseline" in data:
+        return "baseline"
+    return next((scenario for scenario in data if scenario.startswith("baseline")), None)
+
+def generate_markdown_table(data):
     """Gera tabela em formato Markdown"""
-    data = load_analysis_results()
-    
     print("### Tabela de Resultados Completa\n")
-    print("| Cenário | Throughput (Gbps) | Desvio Padrão | Retransmissões | Amostras | Confiabilidade |")
-    print("|---------|-------------------|---------------|----------------|----------|----------------|")
+    print("| Cenário | Throughput (Gbps) | IC 95% (Gbps) | Desvio Padrão | Retransmissões | Amostras | Confiabilidade |")
+    print("|---------|-------------------|---------------|---------------|----------------|----------|----------------|")
     
+    levels = {}
     for scenario, metrics in data.items():
         scenario_name = scenario.replace("_", " ").title()
-        confidence = "Alta" if metrics["samples"] >= 3 else "Baixa" if metrics["samples"] == 1 else "Média"
+        confidence = confidence_level(metrics)
+        levels.setdefault(confidence, []).append(scenario)
+        interval = f"[{metrics['ci'][0]:.2f}, {metrics['ci'][1]:.2f}]" if "ci" in metrics else "-"
         
-        print(f"| {scenario_name:<15} | {metrics['throughput']:>17.2f} | {metrics['std']:>13.2f} | "
-              f"{metrics['retrans']:>14.1f} | {metrics['samples']:>8} | {confidence:<14} |")
+        print(f"| {scenario_name:<15} | {metrics['throughput']:>17.2f} | {interval:>13} | "
+              f"{metrics['std']:>13.2f} | {metrics['retrans']:>14.1f} | {metrics['samples']:>8} | "
+              f"{confidence:<14} |")
     
     print("\n### Análise de Confiabilidade Estatística\n")
-    print("- **Alta confiabilidade**: ≥ 3 amostras (baseline, window_64k, window_128k)")
-    print("- **Média confiabilidade**: 2 amostras (streams_4)")
-    print("- **Baixa confiabilidade**: 1 amostra (combined, window_256k)")
+    if any("ci" in metrics for metrics in data.values()):
+        criteria = {"Alta": "IC 95% bootstrap da média dentro de ±2%",
+                    "Média": "IC 95% dentro de ±5%",
+                    "Baixa": "IC mais largo ou amostra única"}
+    else:
+        criteria = {"Alta": "≥ 3 amostras", "Média": "2 amostras", "Baixa": "1 amostra"}
+    for level in ("Alta", "Média", "Baixa"):
+        scenarios = ", ".join(levels.get(level, [])) or "nenhum"
+        print(f"- **{level} confiabilidade**: {criteria[level]} ({scenarios})")
     print("\n**Recomendação**: Repetir testes com baixa confiabilidade para validação estatística.")
 
-def generate_comparison_chart():
+def generate_comparison_chart(data):
     """Gera um gráfico ASCII de comparação"""
-    data = load_analysis_results()
-    baseline = data["baseline"]["throughput"]
-    
     print("\n### Gráfico de Comparação de Desempenho\n")
     print("```")
     print("Throughput (Gbps)")
@@ -63,10 +134,16 @@ def generate_comparison_chart():
     print("      64K    Base   128K   256K   4-str  Combined")
     print("```")
     
+    reference = baseline_scenario(data)
+    if reference is None:
+        print("\nSem cenário baseline: melhoria percentual não calculada.")
+        return
+    baseline = data[reference]["throughput"]
+    
     print("\n### Melhoria Percentual vs Baseline\n")
     print("```")
     for scenario, metrics in data.items():
-        if scenario != "baseline":
+        if scenario != reference:
             improvement = ((metrics["throughput"] - baseline) / baseline) * 100
             bar_length = int(abs(improvement) / 2)
             bar = "█" * bar_length
@@ -79,5 +156,6 @@ def generate_comparison_chart():
     print("```")
 
 if __name__ == "__main__":
-    generate_markdown_table()
-    generate_comparison_chart()
\ No newline at end of file
+    data = load_analysis_results()
+    generate_markdown_table(data)
+    generate_comparison_chart(data)
\ No newline at end of file
@@ -0,0 +1,66 @@
+#!/bin/bash
+
+# Manifesto das execuções de uma bateria
+# Cada execução do iperf3 acrescenta uma linha JSON em
+# <resultados>/manifests/<TIMESTAMP>.jsonl e o ponteiro
+# <resultados>/manifests/latest é atualizado de forma atômica (mv), para que
+# a análise encontre a bateria mais recente e as saídas com falha sem varrer
+# diretórios nem abrir os JSONs.
+#
+# Uso (após definir RESULTS_DIR e TIMESTAMP):
+#   source "$(dirname "$0")/manifest.sh"
+#   manifest_init
+#   start=$(manifest_now)
+#   iperf3 ... > "$output_file" 2>&1 && status=0 || status=$?
+#   manifest_record "$test_name" "$params" "$rep" "$output_file" "$status" "$start"
+
+# Data/hora UTC em ISO 8601
+manifest_now() {
+    date -u +%Y-%m-%dT%H:%M:%SZ
+}
+
+# Escapa uma string para uso em JSON
+manifest_escape() {
+    local value="$1"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    value="${value//$'\t'/\\t}"
+    value="${value//$'\n'/\\n}"
+    printf '%s' "$value"
+}
+
+manifest_init() {
+    MANIFEST_DIR="$(dirname "$RESULTS_DIR")/manifests"
+    MANIFEST_FILE="${MANIFEST_DIR}/${TIMESTAMP}.jsonl"
+    mkdir -p "$MANIFEST_DIR"
+    : > "$MANIFEST_FILE"
+}
+
+# manifest_record <teste> <parâmetros> <repetição> <arquivo> <status> <início> [algoritmo] [condições de rede]
+manifest_record() {
+    local test_name="$1"
+    local params="$2"
+    local repetition="$3"
+    local output_file="$4"
+    local status="$5"
+    local started="$6"
+    local congestion="${7:-$(sysctl -n net.ipv4.tcp_congestion_control 2>/dev/null)}"
+    local network="${8:-}"
+
+    printf '{"timestamp": "%s", "test_name": "%s", "params": "%s", "repetition": %d, "output": "%s", "exit_status": %d, "start": "%s", "end": "%s", "congestion": "%s", "network": "%s"}\n' \
+        "$TIMESTAMP" \
+        "$(manifest_escape "$test_name")" \
+        "$(manifest_escape "$params")" \
+        "$repetition" \
+        "$(manifest_escape "$output_file")" \
+        "$status" \
+        "$started" \
+        "$(manifest_now)" \
+        "$(manifest_escape "$congestion")" \
+        "$(manifest_escape "$network")" \
+        >> "$MANIFEST_FILE"
+
+    # Ponteiro para a bateria mais recente (substituição atômica)
+    printf '%s\n' "$TIMESTAMP" > "${MANIFEST_DIR}/.latest.$$"
+    mv -f "${MANIFEST_DIR}/.latest.$$" "${MANIFEST_DIR}/latest"
+}
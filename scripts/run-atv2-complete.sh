@@ -21,6 +21,14 @@ TEST_DURATION=20  # Reduzido para 20s para agilizar
 
 mkdir -p "$RESULTS_DIR"
 
+# Manifesto das execuções (manifest_init / manifest_record)
+source "$(dirname "$0")/manifest.sh"
+manifest_init
+# Repetições adaptativas (ADAPTIVE=1; padrão: 3 repetições fixas)
+source "$(dirname "$0")/adaptive.sh"
+# Duração e omit por cenário (STEADY_STATE=1; padrão: duração fixa, sem omit)
+source "$(dirname "$0")/timing.sh"
+
 # Salvar configurações
 echo -e "\n${BLUE}Salvando configurações do sistema...${NC}"
 {
@@ -44,11 +52,32 @@ run_test() {
     local params="$2"
     local rep="$3"
     
-    echo -e "${YELLOW}  Repetição $rep/3...${NC}"
-    iperf3 -c $SERVER_IP -t $TEST_DURATION -J $params > "${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json" 2>&1 || true
+    echo -e "${YELLOW}  Repetição $rep/$(adaptive_limit 3)...${NC}"
+    local output_file="${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json"
+    local started=$(manifest_now)
+    local status=0
+    iperf3 -c $SERVER_IP -t $TEST_TIME $TEST_OMIT_ARG -J $params > "$output_file" 2>&1 || status=$?
+    manifest_record "$name" "$params" "$rep" "$output_file" "$status" "$started"
+    [ $status -eq 0 ] && adaptive_add "$output_file"
     sleep 3
 }
 
+# Executa as repetições de um teste (fixas ou até o IC 95% atingir o alvo)
+run_repetitions() {
+    local name="$1"
+    local params="$2"
+    local rep=0
+    
+    test_timing "$name" $TEST_DURATION
+    adaptive_reset
+    while true; do
+        rep=$((rep + 1))
+        run_test "$name" "$params" $rep
+        adaptive_stop $rep 3 && break
+    done
+    adaptive_record "$name" $rep
+}
+
 # Função para limpar tc
 cleanup_tc() {
     tc qdisc del dev eth0 root 2>/dev/null || true
@@ -57,15 +86,11 @@ cleanup_tc() {
 # 1. CENÁRIO 1: Baseline (CUBIC)
 echo -e "\n${PURPLE}=== Cenário 1: Baseline (CUBIC) ===${NC}"
 sysctl -w net.ipv4.tcp_congestion_control=cubic >/dev/null 2>&1
-for i in 1 2 3; do
-    run_test "scenario_1_baseline" "" $i
-done
+run_repetitions "scenario_1_baseline" ""
 
 # 2. CENÁRIO 2: High Performance (CUBIC com janela grande)
 echo -e "\n${PURPLE}=== Cenário 2: High Performance (CUBIC, 512K, 8 streams) ===${NC}"
-for i in 1 2 3; do
-    run_test "scenario_2_high_performance" "-w 512K -P 8" $i || run_test "scenario_2_high_performance" "-w 256K -P 8" $i
-done
+run_repetitions "scenario_2_high_performance" "-w 512K -P 8"
 
 # 3. CENÁRIO 3: Rede Congestionada (Vegas)
 echo -e "\n${PURPLE}=== Cenário 3: Rede Congestionada (Vegas) ===${NC}"
@@ -73,9 +98,7 @@ if sysctl -w net.ipv4.tcp_congestion_control=vegas >/dev/null 2>&1; then
     cleanup_tc
     tc qdisc add dev eth0 root handle 1: netem delay 50ms
     tc qdisc add dev eth0 parent 1: handle 2: tbf rate 10mbit burst 32kbit latency 400ms
-    for i in 1 2 3; do
-        run_test "scenario_3_congested_vegas" "-w 128K -P 4" $i
-    done
+    run_repetitions "scenario_3_congested_vegas" "-w 128K -P 4"
     cleanup_tc
 else
     echo -e "${YELLOW}Vegas não disponível, usando Westwood${NC}"
@@ -83,9 +106,7 @@ else
     cleanup_tc
     tc qdisc add dev eth0 root handle 1: netem delay 50ms
     tc qdisc add dev eth0 parent 1: handle 2: tbf rate 10mbit burst 32kbit latency 400ms
-    for i in 1 2 3; do
-        run_test "scenario_3_congested_westwood" "-w 128K -P 4" $i
-    done
+    run_repetitions "scenario_3_congested_westwood" "-w 128K -P 4"
     cleanup_tc
 fi
 
@@ -94,9 +115,7 @@ echo -e "\n${PURPLE}=== Cenário 4: Rede com Perdas (Reno) ===${NC}"
 sysctl -w net.ipv4.tcp_congestion_control=reno >/dev/null 2>&1
 cleanup_tc
 tc qdisc add dev eth0 root netem delay 30ms loss 0.5%
-for i in 1 2 3; do
-    run_test "scenario_4_lossy_reno" "-w 256K -P 2" $i
-done
+run_repetitions "scenario_4_lossy_reno" "-w 256K -P 2"
 cleanup_tc
 
 # 5. CENÁRIO 5: Datacenter Legacy (CUBIC)
@@ -105,9 +124,7 @@ sysctl -w net.ipv4.tcp_congestion_control=cubic >/dev/null 2>&1
 cleanup_tc
 tc qdisc add dev eth0 root handle 1: netem delay 5ms
 tc qdisc add dev eth0 parent 1: handle 2: tbf rate 100mbit burst 32kbit latency 400ms
-for i in 1 2 3; do
-    run_test "scenario_5_legacy_cubic" "-w 64K" $i
-done
+run_repetitions "scenario_5_legacy_cubic" "-w 64K"
 cleanup_tc
 
 # 6. CENÁRIO 6: WAN Intercontinental (BBR)
@@ -115,18 +132,14 @@ echo -e "\n${PURPLE}=== Cenário 6: WAN Intercontinental (BBR) ===${NC}"
 if sysctl -w net.ipv4.tcp_congestion_control=bbr >/dev/null 2>&1; then
     cleanup_tc
     tc qdisc add dev eth0 root netem delay 100ms loss 0.1%
-    for i in 1 2 3; do
-        run_test "scenario_6_wan_bbr" "-w 256K -P 4" $i
-    done
+    run_repetitions "scenario_6_wan_bbr" "-w 256K -P 4"
     cleanup_tc
 else
     echo -e "${YELLOW}BBR não disponível, usando Illinois${NC}"
     sysctl -w net.ipv4.tcp_congestion_control=illinois >/dev/null 2>&1
     cleanup_tc
     tc qdisc add dev eth0 root netem delay 100ms loss 0.1%
-    for i in 1 2 3; do
-        run_test "scenario_6_wan_illinois" "-w 256K -P 4" $i
-    done
+    run_repetitions "scenario_6_wan_illinois" "-w 256K -P 4"
     cleanup_tc
 fi
 
@@ -138,9 +151,7 @@ if sysctl -w net.ipv4.tcp_congestion_control=htcp >/dev/null 2>&1; then
     echo -e "\n${BLUE}Extra: H-TCP com alta latência${NC}"
     cleanup_tc
     tc qdisc add dev eth0 root netem delay 75ms
-    for i in 1 2 3; do
-        run_test "extra_htcp_highlatency" "-w 256K" $i
-    done
+    run_repetitions "extra_htcp_highlatency" "-w 256K"
     cleanup_tc
 fi
 
@@ -149,9 +160,7 @@ if sysctl -w net.ipv4.tcp_congestion_control=westwood >/dev/null 2>&1; then
     echo -e "\n${BLUE}Extra: Westwood com perda de pacotes${NC}"
     cleanup_tc
     tc qdisc add dev eth0 root netem loss 0.3%
-    for i in 1 2 3; do
-        run_test "extra_westwood_loss" "-w 256K" $i
-    done
+    run_repetitions "extra_westwood_loss" "-w 256K"
     cleanup_tc
 fi
 
@@ -18,19 +18,27 @@ TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
 mkdir -p "$RESULTS_DIR"
 
+# Manifesto das execuções (manifest_init / manifest_record)
+source "$(dirname "$0")/manifest.sh"
+manifest_init
+
 # Função para executar teste
 run_test() {
     local name="$1"
     local params="$2"
     local rep="$3"
+    local output_file="${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json"
+    local started=$(manifest_now)
+    local status=0
     echo "  Rep $rep..."
     
     # Tentar com parâmetros originais
-    if ! iperf3 -c $SERVER_IP -t 15 -J $params > "${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json" 2>&1; then
+    if ! iperf3 -c $SERVER_IP -t 15 -J $params > "$output_file" 2>&1; then
         # Se falhar, tentar sem janela específica
         echo "    Retry sem janela..."
-        iperf3 -c $SERVER_IP -t 15 -J -P ${params##*-P } > "${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json" 2>&1
+        iperf3 -c $SERVER_IP -t 15 -J -P ${params##*-P } > "$output_file" 2>&1 || status=$?
     fi
+    manifest_record "$name" "$params" "$rep" "$output_file" "$status" "$started"
     sleep 2
 }
 
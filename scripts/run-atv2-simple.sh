@@ -17,11 +17,28 @@ TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
 mkdir -p "$RESULTS_DIR"
 
+# Manifesto das execuções (manifest_init / manifest_record)
+source "$(dirname "$0")/manifest.sh"
+manifest_init
+
+# Executa uma repetição e a registra no manifesto (interrompe em caso de erro)
+run_rep() {
+    local name="$1"
+    local params="$2"
+    local rep="$3"
+    local output_file="${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json"
+    local started=$(manifest_now)
+    local status=0
+    iperf3 -c $SERVER_IP -t 10 $params -J > "$output_file" 2>&1 || status=$?
+    manifest_record "$name" "$params" "$rep" "$output_file" "$status" "$started"
+    return $status
+}
+
 # Teste 1: Baseline
 echo -e "\n${BLUE}Cenário 1: Baseline${NC}"
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -J > "${RESULTS_DIR}/${TIMESTAMP}_baseline_rep${i}.json" 2>&1
+    run_rep "baseline" "" $i
     sleep 2
 done
 
@@ -29,7 +46,7 @@ done
 echo -e "\n${BLUE}Cenário 2: Window 256K${NC}"
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -w 256K -J > "${RESULTS_DIR}/${TIMESTAMP}_window256k_rep${i}.json" 2>&1
+    run_rep "window256k" "-w 256K" $i
     sleep 2
 done
 
@@ -37,7 +54,7 @@ done
 echo -e "\n${BLUE}Cenário 3: 4 Streams Paralelos${NC}"
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -P 4 -J > "${RESULTS_DIR}/${TIMESTAMP}_streams4_rep${i}.json" 2>&1
+    run_rep "streams4" "-P 4" $i
     sleep 2
 done
 
@@ -46,7 +63,7 @@ echo -e "\n${BLUE}Cenário 4: Latência 50ms${NC}"
 tc qdisc add dev eth0 root netem delay 50ms 2>/dev/null || true
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -J > "${RESULTS_DIR}/${TIMESTAMP}_latency50ms_rep${i}.json" 2>&1
+    run_rep "latency50ms" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root 2>/dev/null || true
@@ -56,7 +73,7 @@ echo -e "\n${BLUE}Cenário 5: Banda 10Mbps${NC}"
 tc qdisc add dev eth0 root tbf rate 10mbit burst 32kbit latency 400ms 2>/dev/null || true
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -J > "${RESULTS_DIR}/${TIMESTAMP}_bandwidth10mbps_rep${i}.json" 2>&1
+    run_rep "bandwidth10mbps" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root 2>/dev/null || true
@@ -66,7 +83,7 @@ echo -e "\n${BLUE}Cenário 6: Perda 0.5%${NC}"
 tc qdisc add dev eth0 root netem loss 0.5% 2>/dev/null || true
 for i in 1 2 3; do
     echo "Repetição $i/3..."
-    iperf3 -c $SERVER_IP -t 10 -J > "${RESULTS_DIR}/${TIMESTAMP}_loss0.5_rep${i}.json" 2>&1
+    run_rep "loss0.5" "" $i
     sleep 2
 done
 tc qdisc del dev eth0 root 2>/dev/null || true
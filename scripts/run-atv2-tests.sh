@@ -20,6 +20,13 @@ SCENARIOS_DIR="/results/atv2/scenarios"
 RESULTS_DIR="/results/atv2/results/raw"
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
+# Manifesto das execuções (manifest_init / manifest_record)
+source "$(dirname "$0")/manifest.sh"
+# Repetições adaptativas (ADAPTIVE=1; padrão: "repetitions" de cada cenário)
+source "$(dirname "$0")/adaptive.sh"
+# Duração e omit por cenário (STEADY_STATE=1; padrão: duração fixa, sem omit)
+source "$(dirname "$0")/timing.sh"
+
 # Criar diretório de resultados se não existir
 mkdir -p "$RESULTS_DIR"
 
@@ -147,7 +154,11 @@ run_scenario() {
     
     print_info "Descrição: $description"
     print_info "Parâmetros iperf3: $iperf_params"
-    print_info "Repetições: $repetitions"
+    if [ "$ADAPTIVE" = "1" ]; then
+        print_info "Repetições: adaptativas, IC 95% ±${ADAPTIVE_TARGET}% (${ADAPTIVE_MIN} a ${ADAPTIVE_MAX})"
+    else
+        print_info "Repetições: $repetitions"
+    fi
     
     # Configurar algoritmo de congestionamento
     if ! change_congestion_control "$cc"; then
@@ -157,21 +168,34 @@ run_scenario() {
     # Aplicar condições de rede
     apply_network_conditions "$latency" "$bandwidth" "$loss" "$jitter"
     
-    # Executar repetições
-    for rep in $(seq 1 $repetitions); do
+    # Executar repetições (fixas ou até o IC 95% atingir o alvo)
+    local limit=$(adaptive_limit $repetitions)
+    local rep=0
+    test_timing "$name" "$duration"
+    if [ "$STEADY_STATE" = "1" ]; then
+        print_info "Duração (regime permanente): ${TEST_TIME}s, omit ${TEST_OMIT}s"
+    fi
+    adaptive_reset
+    while true; do
+        rep=$((rep + 1))
         local output_file="${RESULTS_DIR}/${TIMESTAMP}_${name}_rep${rep}.json"
         
-        print_info "Executando repetição $rep/$repetitions..."
+        print_info "Executando repetição $rep/$limit..."
         
-        # Executar iperf3
+        # Executar iperf3 (o status vai para o manifesto; set -e não interrompe a bateria)
+        local started=$(manifest_now)
+        local status=0
         if [ -n "$iperf_params" ] && [ "$iperf_params" != "null" ]; then
-            iperf3 -c $SERVER_IP -t $duration -J $iperf_params > "$output_file" 2>&1
+            iperf3 -c $SERVER_IP -t $TEST_TIME $TEST_OMIT_ARG -J $iperf_params > "$output_file" 2>&1 || status=$?
         else
-            iperf3 -c $SERVER_IP -t $duration -J > "$output_file" 2>&1
+            iperf3 -c $SERVER_IP -t $TEST_TIME $TEST_OMIT_ARG -J > "$output_file" 2>&1 || status=$?
         fi
+        manifest_record "$name" "$iperf_params" "$rep" "$output_file" "$status" "$started" "" \
+            "latency_ms=$latency bandwidth_mbps=$bandwidth loss_percent=$loss jitter_ms=$jitter"
         
-        if [ $? -eq 0 ]; then
+        if [ $status -eq 0 ]; then
             print_success "Repetição $rep completada"
+            adaptive_add "$output_file"
             
             # Extrair e mostrar throughput
             local throughput=$(jq -r '.end.sum_sent.bits_per_second' "$output_file" 2>/dev/null || echo "N/A")
@@ -185,10 +209,12 @@ run_scenario() {
         fi
         
         # Aguardar entre repetições
-        if [ $rep -lt $repetitions ]; then
-            sleep 5
+        if adaptive_stop $rep $repetitions; then
+            break
         fi
+        sleep 5
     done
+    adaptive_record "$name" $rep
     
     # Limpar configurações após o cenário
     cleanup_tc
@@ -204,6 +230,8 @@ main() {
     print_info "Servidor: $SERVER_IP"
     echo ""
     
+    manifest_init
+    
     # Salvar configurações iniciais
     print_info "Salvando configurações do sistema..."
     {
@@ -18,6 +18,14 @@ TEST_DURATION=30
 RESULTS_DIR="/results/raw"
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
+# Manifesto das execuções (manifest_init / manifest_record)
+source "$(dirname "$0")/manifest.sh"
+# Repetições adaptativas (ADAPTIVE=1; padrão: 3 repetições fixas)
+source "$(dirname "$0")/adaptive.sh"
+# Duração e omit por cenário (STEADY_STATE=1; padrão: duração fixa, sem omit)
+source "$(dirname "$0")/timing.sh"
+REPETITIONS=3
+
 # Função para imprimir com cor
 print_info() {
     echo -e "${BLUE}[INFO]${NC} $1"
@@ -85,11 +93,15 @@ run_single_test() {
     print_info "Executando teste: $test_name (repetição $repetition)"
     print_info "Parâmetros: $params"
     
-    # Executar iperf3
-    iperf3 -c $SERVER_IP -t $TEST_DURATION -J $params > "$output_file" 2>&1
+    # Executar iperf3 (o status vai para o manifesto; set -e não interrompe a bateria)
+    local started=$(manifest_now)
+    local status=0
+    iperf3 -c $SERVER_IP -t $TEST_TIME $TEST_OMIT_ARG -J $params > "$output_file" 2>&1 || status=$?
+    manifest_record "$test_name" "$params" "$repetition" "$output_file" "$status" "$started"
     
-    if [ $? -eq 0 ]; then
+    if [ $status -eq 0 ]; then
         print_success "Teste $test_name completado"
+        adaptive_add "$output_file"
     else
         print_error "Teste $test_name falhou"
         cat "$output_file"
@@ -99,15 +111,35 @@ run_single_test() {
     sleep 5
 }
 
+# Executa as repetições de um teste (fixas ou até o IC 95% atingir o alvo)
+run_repetitions() {
+    local test_name="$1"
+    local params="$2"
+    local rep=0
+    
+    test_timing "$test_name" $TEST_DURATION
+    adaptive_reset
+    while true; do
+        rep=$((rep + 1))
+        run_single_test "$test_name" "$params" $rep
+        adaptive_stop $rep $REPETITIONS && break
+    done
+    adaptive_record "$test_name" $rep
+}
+
 # Função principal
 main() {
     print_info "=== Iniciando bateria de testes de desempenho TCP ==="
     print_info "Timestamp: $TIMESTAMP"
     print_info "Servidor: $SERVER_IP"
     print_info "Duração por teste: ${TEST_DURATION}s"
+    if [ "$ADAPTIVE" = "1" ]; then
+        print_info "Repetições adaptativas: IC 95% ±${ADAPTIVE_TARGET}% (${ADAPTIVE_MIN} a ${ADAPTIVE_MAX} repetições)"
+    fi
     
     # Criar diretório de resultados
     mkdir -p "$RESULTS_DIR"
+    manifest_init
     
     # Salvar configurações iniciais
     print_info "Salvando configurações do sistema..."
@@ -139,33 +171,25 @@ main() {
     
     # 1. TESTE BASELINE
     print_info "=== Executando testes baseline ==="
-    for rep in 1 2 3; do
-        run_single_test "baseline_default" "" $rep
-    done
+    run_repetitions "baseline_default" ""
     
     # 2. TESTES DE JANELA TCP
     print_info "=== Executando testes de janela TCP ==="
     for window in "64K" "128K" "256K" "512K"; do
-        for rep in 1 2 3; do
-            run_single_test "window_${window}" "-w ${window}" $rep
-        done
+        run_repetitions "window_${window}" "-w ${window}"
     done
     
     # 3. TESTES DE FLUXOS PARALELOS
     print_info "=== Executando testes de fluxos paralelos ==="
     for streams in 1 2 4 8; do
-        for rep in 1 2 3; do
-            run_single_test "streams_${streams}" "-P ${streams}" $rep
-        done
+        run_repetitions "streams_${streams}" "-P ${streams}"
     done
     
     # 4. TESTES DE ALGORITMOS DE CONGESTIONAMENTO
     print_info "=== Executando testes de algoritmos de congestionamento ==="
     for algorithm in "cubic" "reno" "vegas" "bbr"; do
         if change_congestion_control "$algorithm"; then
-            for rep in 1 2 3; do
-                run_single_test "cc_${algorithm}" "" $rep
-            done
+            run_repetitions "cc_${algorithm}" ""
         fi
     done
     
@@ -179,27 +203,21 @@ main() {
     for delay in "50ms" "100ms"; do
         cleanup_tc
         apply_tc "tc qdisc add dev eth0 root netem delay ${delay}"
-        for rep in 1 2 3; do
-            run_single_test "latency_${delay}" "" $rep
-        done
+        run_repetitions "latency_${delay}" ""
     done
     
     # Limitação de banda
     for rate in "10mbit" "100mbit"; do
         cleanup_tc
         apply_tc "tc qdisc add dev eth0 root tbf rate ${rate} burst 32kbit latency 400ms"
-        for rep in 1 2 3; do
-            run_single_test "bandwidth_${rate}" "" $rep
-        done
+        run_repetitions "bandwidth_${rate}" ""
     done
     
     # Perda de pacotes
     for loss in "0.1%" "1%"; do
         cleanup_tc
         apply_tc "tc qdisc add dev eth0 root netem loss ${loss}"
-        for rep in 1 2 3; do
-            run_single_test "packet_loss_${loss}" "" $rep
-        done
+        run_repetitions "packet_loss_${loss}" ""
     done
     
     # Limpar tc no final
@@ -207,16 +225,12 @@ main() {
     
     # 6. TESTES COMBINADOS
     print_info "=== Executando testes combinados ==="
-    for rep in 1 2 3; do
-        run_single_test "combined_256k_4streams" "-w 256K -P 4" $rep
-        run_single_test "combined_512k_2streams" "-w 512K -P 2" $rep
-    done
+    run_repetitions "combined_256k_4streams" "-w 256K -P 4"
+    run_repetitions "combined_512k_2streams" "-w 512K -P 2"
     
     # Teste com BBR + configurações otimizadas (se disponível)
     if change_congestion_control "bbr"; then
-        for rep in 1 2 3; do
-            run_single_test "combined_bbr_256k_4streams" "-w 256K -P 4" $rep
-        done
+        run_repetitions "combined_bbr_256k_4streams" "-w 256K -P 4"
     fi
     
     # Restaurar configurações originais
@@ -0,0 +1,44 @@
+#!/bin/bash
+
+# Duração e omit por cenário a partir da detecção de regime permanente
+# analysis/steady_state.py --write grava <resultados>/steady_state.json com,
+# para cada cenário, a menor duração (-t) que dá uma média estável e o
+# aquecimento a descartar (-O). Com STEADY_STATE=1, os scripts de teste
+# usam esses valores; cenários sem recomendação (ou sem STEADY_STATE)
+# mantêm a duração padrão do script e nenhum omit.
+#
+# Uso (após definir RESULTS_DIR):
+#   source "$(dirname "$0")/timing.sh"
+#   test_timing "$test_name" "$TEST_DURATION"
+#   iperf3 -c ... -t $TEST_TIME $TEST_OMIT_ARG ...
+
+STEADY_STATE="${STEADY_STATE:-0}"
+STEADY_STATE_FILE="${STEADY_STATE_FILE:-$(dirname "$RESULTS_DIR")/steady_state.json}"
+
+TEST_TIME=""
+TEST_OMIT=0
+TEST_OMIT_ARG=""
+
+# test_timing <teste> <duração padrão>
+# Define TEST_TIME, TEST_OMIT e TEST_OMIT_ARG ("-O N" ou vazio)
+test_timing() {
+    local test_name="$1"
+    TEST_TIME="$2"
+    TEST_OMIT=0
+    TEST_OMIT_ARG=""
+
+    if [ "$STEADY_STATE" != "1" ] || [ ! -f "$STEADY_STATE_FILE" ]; then
+        return 0
+    fi
+
+    local values
+    values=$(jq -r --arg name "$test_name" \
+        '.scenarios[$name] // empty | "\(.duration) \(.omit)"' "$STEADY_STATE_FILE" 2>/dev/null) || return 0
+    if [ -n "$values" ]; then
+        TEST_TIME="${values% *}"
+        TEST_OMIT="${values#* }"
+        if [ "$TEST_OMIT" -gt 0 ]; then
+            TEST_OMIT_ARG="-O $TEST_OMIT"
+        fi
+    fi
+}